@@ -0,0 +1,93 @@
+"""
+bench_attribute.py
+Documents/sec of attribute.attribute in-process vs over a process pool.
+
+Every book is cut into documents of --words words. The pooled rankings must equal
+the in-process ones, and the shared single tokenization must give the same
+log-likelihoods as scoring each document separately with NgramScorer.log_probs,
+and the pool may only have read a bounded window of input when the first
+result arrives.
+Accuracy is in-sample (the documents come from the books the models were
+built on), so it only checks that the ranking is the right way round.
+
+Run from the repository root after analyze:
+    python benchmarks/bench_attribute.py [--level word-3] [--words 200] [--workers 4]
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.corpus_store import load_corpus
+from src.attribute import attribute, load_scorers, CHUNK_DOCUMENTS, TASKS_PER_WORKER
+
+AUTHORS = ["austen", "twain", "doyle"]
+
+
+def make_documents(words_per_doc):
+    documents = []
+    for author in AUTHORS:
+        words = load_corpus(author).words()
+        for k, lo in enumerate(range(0, len(words) - words_per_doc + 1, words_per_doc)):
+            documents.append((f"{author}:{k}", " ".join(words[lo:lo + words_per_doc])))
+    return documents
+
+
+def timed(documents, scorers, workers):
+    start = time.perf_counter()
+    results = list(attribute(documents, scorers, workers))
+    return results, time.perf_counter() - start
+
+
+def check_backpressure(documents, scorers, workers):
+    # Documents pulled from the input by the time the first result is yielded
+    read = 0
+
+    def source():
+        nonlocal read
+        for doc in documents:
+            read += 1
+            yield doc
+
+    results = attribute(source(), scorers, workers)
+    next(results)
+    results.close()
+    limit = (TASKS_PER_WORKER * workers + 1) * CHUNK_DOCUMENTS
+    assert read <= limit, f"read {read} documents before the first result (window {limit})"
+    return read
+
+
+def main(level, words_per_doc, workers):
+    scorers = load_scorers(AUTHORS, level)
+    documents = make_documents(words_per_doc)
+    print(f" {len(documents)} documents of {words_per_doc} words, {len(scorers)} {level} models")
+
+    serial, serial_time = timed(documents, scorers, 1)
+    pooled, pooled_time = timed(documents, scorers, workers)
+    assert serial == pooled, "pooled rankings differ from in-process ones"
+
+    # Single shared tokenization vs each scorer normalizing the text itself
+    for (name, text), result in zip(documents[::97], serial[::97]):
+        for entry in result["ranking"]:
+            expected = float(scorers[entry["author"]].log_probs(text).sum())
+            assert np.isclose(entry["log2_likelihood"], expected, rtol=1e-12), (name, entry["author"])
+
+    read = check_backpressure(documents, scorers, workers)
+    print(f" {read} of {len(documents)} documents read when the first result arrived")
+
+    correct = sum(r["ranking"][0]["author"] == r["document"].split(":")[0] for r in serial)
+    print(f"{'workers':>8}{'seconds':>10}{'documents/s':>14}")
+    print(f"{1:>8}{serial_time:>10.2f}{len(documents) / serial_time:>14,.1f}")
+    print(f"{workers:>8}{pooled_time:>10.2f}{len(documents) / pooled_time:>14,.1f}")
+    print(f" in-sample accuracy {correct / len(documents):.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check and time batch author attribution.")
+    parser.add_argument("--level", default="word-3", help="char-3 | word-3 etc.")
+    parser.add_argument("--words", type=int, default=200, help="Words per document")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    args = parser.parse_args()
+    main(args.level, args.words, args.workers)
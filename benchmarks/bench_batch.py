@@ -0,0 +1,45 @@
+"""
+bench_batch.py
+Throughput of TextGenerator.generate (one sample per call) vs generate_batch.
+
+Run from the repository root:
+    python benchmarks/bench_batch.py --samples 2000 --length 100
+"""
+
+import os
+import sys
+import time
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.generator import TextGenerator
+
+AUTHORS = ["austen", "twain", "doyle"]
+LEVELS = ["char-1", "char-3", "word-1", "word-2", "word-3"]
+
+
+def main(samples, length, single_samples):
+    print(f"{'author':<8}{'level':<8}{'single/s':>11}{'batch/s':>11}{'speedup':>9}")
+    for author in AUTHORS:
+        for level in LEVELS:
+            generator = TextGenerator(author=author, level=level)
+            generator.generate_batch(1, length)  # warm the id model
+
+            start = time.perf_counter()
+            for i in range(single_samples):
+                generator.generate(length=length, seed=i)
+            single = single_samples / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            generator.generate_batch(samples, length, seed=0)
+            batch = samples / (time.perf_counter() - start)
+
+            print(f"{author:<8}{level:<8}{single:>11.0f}{batch:>11.0f}{batch / single:>8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark batched text generation.")
+    parser.add_argument("--samples", type=int, default=2000, help="Samples per generate_batch call")
+    parser.add_argument("--length", type=int, default=100, help="Tokens per sample")
+    parser.add_argument("--single-samples", type=int, default=200, help="Samples timed through generate()")
+    args = parser.parse_args()
+    main(args.samples, args.length, args.single_samples)
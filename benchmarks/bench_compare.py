@@ -0,0 +1,103 @@
+"""
+bench_compare.py
+Dict-and-loop author comparison vs compare.divergence_matrices.
+
+For the three books, char and word orders 1-3, the reference walks the
+union of the JSON tables' keys in Python for every pair of authors; both
+must give the same KL, JS and cosine values. A second run splits every
+book into --parts pieces (36 pseudo-authors by default) to time the
+vectorized path at scale.
+
+Run from the repository root after analyze:
+    python benchmarks/bench_compare.py [--parts 12]
+"""
+
+import os
+import sys
+import math
+import time
+import argparse
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from starter_preprocess import FrequencyAnalyzer
+from src.model_store import NgramModel
+from src.corpus_store import load_corpus
+from src.compare import divergence_matrices, load_models, DEFAULT_SMOOTHING
+
+AUTHORS = ["austen", "twain", "doyle"]
+
+
+def reference(tables, smoothing=DEFAULT_SMOOTHING):
+    # One pass over the union of keys per pair of authors
+    union = set()
+    for table in tables:
+        union.update(table)
+    uniform = smoothing / len(union)
+    totals = [sum(t.values()) for t in tables]
+    probs = [{k: v / total for k, v in t.items()} for t, total in zip(tables, totals)]
+    size = len(tables)
+    kl, js, cosine = np.zeros((size, size)), np.zeros((size, size)), np.zeros((size, size))
+    for i in range(size):
+        for j in range(size):
+            if i == j:
+                cosine[i, j] = 1.0
+                continue
+            dot = ni = nj = 0.0
+            for key in union:
+                p, q = probs[i].get(key, 0.0), probs[j].get(key, 0.0)
+                ps, qs = (1 - smoothing) * p + uniform, (1 - smoothing) * q + uniform
+                kl[i, j] += ps * math.log2(ps / qs)
+                m = (p + q) / 2
+                if p:
+                    js[i, j] += p * math.log2(p / m) / 2
+                if q:
+                    js[i, j] += q * math.log2(q / m) / 2
+                dot, ni, nj = dot + p * q, ni + p * p, nj + q * q
+            cosine[i, j] = dot / math.sqrt(ni * nj)
+    return {"kl": kl, "js": js, "cosine": cosine}
+
+
+def main(parts):
+    fa = FrequencyAnalyzer()
+    print(f"{'table':<8}{'union':>9}{'loops s':>10}{'vectorized s':>14}")
+    for ngram_type in ("char", "word"):
+        for n in (1, 2, 3):
+            tables = [fa.load_frequencies(f"data/freq_tables/{a}_{ngram_type}_{n}-gram.json") for a in AUTHORS]
+            start = time.perf_counter()
+            expected = reference(tables)
+            loop_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            result = divergence_matrices(load_models(AUTHORS, ngram_type, n))
+            vector_time = time.perf_counter() - start
+            for metric, matrix in expected.items():
+                assert np.allclose(result[metric], matrix, rtol=1e-9, atol=1e-12), (ngram_type, n, metric)
+            union = len(set().union(*tables))
+            print(f"{ngram_type + '-' + str(n):<8}{union:>9}{loop_time:>10.2f}{vector_time:>14.4f}")
+
+    # Dozens of authors: every book cut into `parts` pieces
+    models = {n: [] for n in (1, 2, 3)}
+    for author in AUTHORS:
+        corpus = load_corpus(author)
+        words = corpus.words()
+        for k in range(parts):
+            piece = words[len(words) * k // parts:len(words) * (k + 1) // parts]
+            for n, counts in fa.calculate_ngrams_multi(piece, (1, 2, 3)).items():
+                models[n].append(NgramModel.from_frequencies(counts, "word"))
+    for n, order_models in models.items():
+        start = time.perf_counter()
+        result = divergence_matrices(order_models)
+        elapsed = time.perf_counter() - start
+        # Pieces of the same book should be closer to each other than to other books
+        js = result["js"]
+        book = np.repeat(np.arange(len(AUTHORS)), parts)
+        same = js[(book[:, None] == book[None, :]) & ~np.eye(len(book), dtype=bool)].mean()
+        other = js[book[:, None] != book[None, :]].mean()
+        print(f" {len(order_models)} authors, word-{n}: {elapsed:.3f} s | mean JS same book {same:.3f}, other {other:.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check and time the vectorized author comparison.")
+    parser.add_argument("--parts", type=int, default=12, help="Pieces per book for the many-author run")
+    args = parser.parse_args()
+    main(args.parts)
@@ -0,0 +1,73 @@
+"""
+bench_counting.py
+Wall time and peak traced memory of n-gram counting on the bundled novels:
+six list-building calculate_ngrams calls (the old analyze loop) vs one
+calculate_ngrams_multi call per token stream.
+
+Run from the repository root:
+    python benchmarks/bench_counting.py
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from collections import Counter
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from starter_preprocess import TextPreprocessor, FrequencyAnalyzer
+
+AUTHOR_FILES = {
+    "austen": "data/austen_pride_prejudice.txt",
+    "twain": "data/twain_tom_sawyer.txt",
+    "doyle": "data/doyle_sherlock_holmes.txt",
+}
+ORDERS = [1, 2, 3]
+
+
+def list_ngrams(tokens, n):
+    # The old calculate_ngrams: materialize every n-gram, then count
+    if n == 1:
+        return dict(Counter(tokens))
+    ngrams = []
+    for i in range(len(tokens) - n + 1):
+        ngrams.append(tuple(tokens[i:i + n]))
+    return dict(Counter(ngrams))
+
+
+def old_counts(streams):
+    return [[list_ngrams(tokens, n) for n in ORDERS] for tokens in streams]
+
+
+def new_counts(streams):
+    fa = FrequencyAnalyzer()
+    return [fa.calculate_ngrams_multi(tokens, ORDERS) for tokens in streams]
+
+
+def measure(func, streams):
+    start = time.perf_counter()
+    func(streams)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(streams)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    pre = TextPreprocessor()
+    print(f"{'author':<8}{'old s':>8}{'new s':>8}{'old peak MB':>13}{'new peak MB':>13}")
+    for author, path in AUTHOR_FILES.items():
+        with open(path, "r", encoding="utf-8") as f:
+            normalized = pre.normalize_text(pre.clean_gutenberg_text(f.read()))
+        streams = [pre.tokenize_chars(normalized), pre.tokenize_words(normalized)]
+
+        old_time, old_peak = measure(old_counts, streams)
+        new_time, new_peak = measure(new_counts, streams)
+        print(f"{author:<8}{old_time:>8.2f}{new_time:>8.2f}"
+              f"{old_peak / 2**20:>13.1f}{new_peak / 2**20:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+bench_generate.py
+Compare the old full-table scan against the context index in TextGenerator.
+
+Run from the repository root:
+    python benchmarks/bench_generate.py --length 200
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.generator import TextGenerator
+
+AUTHORS = ["austen", "twain", "doyle"]
+LEVELS = ["char-1", "char-2", "char-3", "word-1", "word-2", "word-3"]
+
+
+def scan_step(generator, context):
+    # The pre-index lookup: one pass over the whole table per generated token
+    n = generator.n
+    return {k[-1]: v for k, v in generator.freq_data.items()
+            if (n == 1 and k == context) or (n > 1 and k[:-1] == context)}
+
+
+def time_scan(generator, steps):
+    keys = list(generator.freq_data.keys())
+    start = time.perf_counter()
+    for _ in range(steps):
+        key = random.choice(keys)
+        context = key[:-1] if isinstance(key, tuple) else key
+        scan_step(generator, context)
+    return (time.perf_counter() - start) / steps
+
+
+def time_indexed(generator, length):
+    start = time.perf_counter()
+    text = generator.generate(length=length, seed=0)
+    elapsed = time.perf_counter() - start
+    tokens = len(text) if generator.ngram_type == "char" else len(text.split())
+    return elapsed / max(tokens, 1)
+
+
+def main(length, scan_steps):
+    print(f"{'author':<8}{'level':<8}{'entries':>9}{'scan us/tok':>14}{'index us/tok':>14}{'speedup':>10}")
+    for author in AUTHORS:
+        for level in LEVELS:
+            generator = TextGenerator(author=author, level=level, prefer_binary=False)
+            scan = time_scan(generator, scan_steps)
+            indexed = time_indexed(generator, length)
+            print(f"{author:<8}{level:<8}{len(generator.freq_data):>9}"
+                  f"{scan * 1e6:>14.1f}{indexed * 1e6:>14.2f}{scan / indexed:>9.0f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark n-gram lookup in TextGenerator.")
+    parser.add_argument("--length", type=int, default=200, help="Tokens generated per indexed run")
+    parser.add_argument("--scan-steps", type=int, default=5, help="Tokens timed with the full-table scan")
+    args = parser.parse_args()
+    main(args.length, args.scan_steps)
@@ -0,0 +1,36 @@
+"""
+bench_load.py
+Time TextGenerator construction from the JSON tables vs the binary models.
+
+Run from the repository root after `python src/model_store.py`:
+    python benchmarks/bench_load.py
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.generator import TextGenerator
+
+AUTHORS = ["austen", "twain", "doyle"]
+LEVELS = ["char-1", "char-2", "char-3", "word-1", "word-2", "word-3"]
+
+
+def time_load(author, level, prefer_binary):
+    start = time.perf_counter()
+    TextGenerator(author=author, level=level, prefer_binary=prefer_binary)
+    return time.perf_counter() - start
+
+
+def main():
+    print(f"{'author':<8}{'level':<8}{'json ms':>10}{'binary ms':>11}{'speedup':>9}")
+    for author in AUTHORS:
+        for level in LEVELS:
+            json_time = time_load(author, level, prefer_binary=False)
+            binary_time = time_load(author, level, prefer_binary=True)
+            print(f"{author:<8}{level:<8}{json_time * 1e3:>10.1f}{binary_time * 1e3:>11.2f}"
+                  f"{json_time / binary_time:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+bench_normalize.py
+Throughput (MB/s) of the fused clean_gutenberg_text / normalize_text
+against the original chained-regex versions, asserting identical output
+for both preserve_sentences modes on the three bundled novels.
+
+Run from the repository root:
+    python benchmarks/bench_normalize.py --repeat 5
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from starter_preprocess import TextPreprocessor
+
+AUTHOR_FILES = {
+    "austen": "data/austen_pride_prejudice.txt",
+    "twain": "data/twain_tom_sawyer.txt",
+    "doyle": "data/doyle_sherlock_holmes.txt",
+}
+
+
+def legacy_clean(pre, raw_text):
+    lines = raw_text.split('\n')
+    start_idx = 0
+    end_idx = len(lines)
+    for i, line in enumerate(lines):
+        if any(marker in line for marker in pre.gutenberg_markers[:4]):
+            if "START" in line:
+                start_idx = i + 1
+            elif "END" in line:
+                end_idx = i
+                break
+    cleaned = '\n'.join(lines[start_idx:end_idx])
+    cleaned = re.sub(r'\n{3,}', '\n\n', cleaned)
+    cleaned = re.sub(r' {2,}', ' ', cleaned)
+    return cleaned.strip()
+
+
+def legacy_normalize(text, preserve_sentences=True):
+    text = text.lower()
+    text = re.sub(r'[“”"]', '"', text)
+    text = re.sub(r"[’‘']", "'", text)
+    text = re.sub(r'[—–]', '-', text)
+    if preserve_sentences:
+        text = re.sub(r'[^\w\s.!?\'-]', ' ', text)
+    else:
+        text = re.sub(r"(?<!\w)'(?!\w)|[^\w\s]", ' ', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+def throughput(func, text, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(text)
+    elapsed = (time.perf_counter() - start) / repeat
+    return len(text.encode("utf-8")) / 2**20 / elapsed
+
+
+def main(repeat):
+    pre = TextPreprocessor()
+    print(f"{'author':<8}{'stage':<22}{'old MB/s':>10}{'new MB/s':>10}{'speedup':>9}")
+    for author, path in AUTHOR_FILES.items():
+        with open(path, "r", encoding="utf-8") as f:
+            raw = f.read()
+
+        cleaned = pre.clean_gutenberg_text(raw)
+        assert cleaned == legacy_clean(pre, raw), f"{author}: clean_gutenberg_text differs"
+        for preserve in (True, False):
+            assert pre.normalize_text(cleaned, preserve) == legacy_normalize(cleaned, preserve), \
+                f"{author}: normalize_text(preserve_sentences={preserve}) differs"
+
+        stages = [
+            ("clean_gutenberg_text", lambda t: legacy_clean(pre, t), pre.clean_gutenberg_text, raw),
+            ("normalize (sentences)", legacy_normalize, pre.normalize_text, cleaned),
+            ("normalize (words)", lambda t: legacy_normalize(t, False),
+             lambda t: pre.normalize_text(t, False), cleaned),
+        ]
+        for stage, old, new, text in stages:
+            old_rate = throughput(old, text, repeat)
+            new_rate = throughput(new, text, repeat)
+            print(f"{author:<8}{stage:<22}{old_rate:>10.1f}{new_rate:>10.1f}{new_rate / old_rate:>8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the fused text normalizer.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per stage")
+    args = parser.parse_args()
+    main(args.repeat)
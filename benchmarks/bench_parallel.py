@@ -0,0 +1,59 @@
+"""
+bench_parallel.py
+Serial vs process-pool n-gram counting on the bundled novels.
+
+Asserts that count_parallel returns exactly the serial tables (same
+counts and key order) for every worker count, then reports the speedup.
+Correctness at small sizes and odd shard cuts is covered by tests/test_parallel.py.
+--repeat K concatenates each book K times so shards have real work.
+
+Run from the repository root:
+    python benchmarks/bench_parallel.py --workers 1 2 4 --repeat 4
+"""
+
+import os
+import sys
+import time
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from starter_preprocess import TextPreprocessor, FrequencyAnalyzer
+from src.analyze import AUTHOR_FILES, count_parallel
+
+ORDERS = [1, 2, 3]
+
+
+def main(worker_counts, repeat):
+    pre = TextPreprocessor()
+    fa = FrequencyAnalyzer()
+    print(f"{'author':<8}{'workers':>8}{'seconds':>10}{'speedup':>9}")
+    for author, path in AUTHOR_FILES.items():
+        with open(path, "r", encoding="utf-8") as f:
+            normalized = pre.normalize_text(pre.clean_gutenberg_text(f.read()))
+        normalized = " ".join([normalized] * repeat)
+        words = pre.tokenize_words(normalized)
+        streams = {"char": pre.encode_chars(normalized), "word": pre.encode_tokens(words)}
+
+        # Serial reference as analyze counts without workers
+        start = time.perf_counter()
+        serial = {"char": fa.calculate_ngrams_vectorized_multi(streams["char"][1], streams["char"][0], ORDERS),
+                  "word": fa.calculate_ngrams_multi(words, ORDERS)}
+        serial_time = time.perf_counter() - start
+        print(f"{author:<8}{'serial':>8}{serial_time:>10.2f}{1:>8.1f}x")
+
+        for workers in worker_counts:
+            start = time.perf_counter()
+            parallel = count_parallel(streams, ORDERS, workers)
+            elapsed = time.perf_counter() - start
+            for name in streams:
+                for n in ORDERS:
+                    assert parallel[name][n] == serial[name][n], f"{author} {name} {n}-gram counts differ"
+                    assert list(parallel[name][n]) == list(serial[name][n]), f"{author} {name} {n}-gram order differs"
+            print(f"{author:<8}{workers:>8}{elapsed:>10.2f}{serial_time / elapsed:>8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark parallel n-gram counting.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4], help="Worker counts to try")
+    parser.add_argument("--repeat", type=int, default=1, help="Copies of each book in the corpus")
+    args = parser.parse_args()
+    main(args.workers, args.repeat)
@@ -0,0 +1,63 @@
+"""
+bench_sampler.py
+Time weighted sampling from the largest context of each model:
+the old linear walk over the candidate dict vs CumulativeSampler.
+
+Run from the repository root:
+    python benchmarks/bench_sampler.py --draws 20000
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.generator import TextGenerator
+
+AUTHORS = ["austen", "twain", "doyle"]
+LEVELS = ["char-2", "char-3", "word-1", "word-2", "word-3"]
+
+
+def linear_choice(candidates, rng):
+    # The pre-sampler _choose_next: sum the weights, then walk the dict
+    total = sum(candidates.values())
+    r = rng.uniform(0, total)
+    upto = 0
+    for k, w in candidates.items():
+        upto += w
+        if upto >= r:
+            return k
+    return rng.choice(list(candidates.keys()))
+
+
+def main(draws):
+    rng = random.Random(0)
+    print(f"{'author':<8}{'level':<8}{'context':<20}{'k':>7}{'linear us':>12}{'sampler us':>12}")
+    for author in AUTHORS:
+        for level in LEVELS:
+            generator = TextGenerator(author=author, level=level, rng=rng, prefer_binary=False)
+            context, sampler = max(generator.index.items(), key=lambda item: len(item[1]))
+            candidates = dict(zip(sampler.tokens,
+                                  [b - a for a, b in zip([0] + sampler.cum_weights, sampler.cum_weights)]))
+
+            start = time.perf_counter()
+            for _ in range(draws):
+                linear_choice(candidates, rng)
+            linear = (time.perf_counter() - start) / draws
+
+            start = time.perf_counter()
+            for _ in range(draws):
+                sampler.sample(rng)
+            fast = (time.perf_counter() - start) / draws
+
+            sep = "" if generator.ngram_type == "char" else " "
+            label = repr(sep.join(context))[:18]
+            print(f"{author:<8}{level:<8}{label:<20}{len(sampler):>7}{linear * 1e6:>12.2f}{fast * 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark weighted successor sampling.")
+    parser.add_argument("--draws", type=int, default=20000, help="Samples drawn per context")
+    args = parser.parse_args()
+    main(args.draws)
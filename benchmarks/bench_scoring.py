@@ -0,0 +1,100 @@
+"""
+bench_scoring.py
+Tokens/sec of the vectorized scorer vs per-token dict probing, on held-out books.
+
+Each author's model scores the other two books. The dict reference
+computes the same interpolated Kneser-Ney probabilities one token at a
+time and must agree with NgramScorer.log_probs on its sample.
+
+Run from the repository root after analyze has written the tries:
+    python benchmarks/bench_scoring.py
+"""
+
+import os
+import sys
+import time
+import argparse
+from collections import Counter
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.scoring import NgramScorer
+from src.corpus_store import load_corpus
+
+AUTHORS = ["austen", "twain", "doyle"]
+LEVELS = ["char-3", "char-5", "word-2", "word-3", "word-5"]
+
+
+class DictKneserNey:
+    """Reference: the scorer's formula evaluated per token with dict lookups."""
+
+    def __init__(self, scorer):
+        trie, n = scorer.trie, scorer.n
+        self.n, self.base, self.discounts = n, scorer.base, scorer.discounts
+        self.counts, self.totals, self.types = {}, {}, {}
+        for k in range(1, n + 1):
+            if k == n:
+                counts = {key if isinstance(key, tuple) else (key,): c
+                          for key, c in trie.frequencies(k).items()}
+            else:
+                counts = Counter(key[1:] for key in trie.frequencies(k + 1))
+            for gram, c in counts.items():
+                self.counts[k, gram] = c
+                self.totals[k, gram[:-1]] = self.totals.get((k, gram[:-1]), 0) + c
+                self.types[k, gram[:-1]] = self.types.get((k, gram[:-1]), 0) + 1
+
+    def log_prob(self, history, token):
+        p = 1.0 / self.base
+        for k in range(1, min(self.n, len(history) + 1) + 1):
+            ctx = tuple(history[len(history) - k + 1:]) if k > 1 else ()
+            total = self.totals.get((k, ctx), 0)
+            if total:
+                d = self.discounts[k]
+                count = self.counts.get((k, ctx + (token,)), 0)
+                p = (max(count - d, 0) + d * self.types[k, ctx] * p) / total
+        return np.log2(p)
+
+    def log_probs(self, tokens):
+        return np.array([self.log_prob(tokens[max(0, i - self.n + 1):i], tok)
+                         for i, tok in enumerate(tokens)])
+
+
+def held_out(author, ngram_type):
+    # Token lists of the other authors' books, from their corpus artifacts
+    tokens = []
+    for other in AUTHORS:
+        corpus = load_corpus(other) if other != author else None
+        if corpus is not None:
+            tokens.extend(corpus.chars() if ngram_type == "char" else corpus.words())
+    return tokens
+
+
+def main(check_tokens):
+    print(f"{'model':<8}{'level':<8}{'tokens':>10}{'bits/tok':>10}{'ppl':>9}"
+          f"{'vector tok/s':>14}{'dict tok/s':>12}{'speedup':>9}")
+    for author in AUTHORS:
+        for level in LEVELS:
+            scorer = NgramScorer(author, level)
+            tokens = held_out(author, scorer.ngram_type)
+
+            start = time.perf_counter()
+            result = scorer.score(tokens)
+            vector_rate = result["tokens"] / (time.perf_counter() - start)
+
+            reference = DictKneserNey(scorer)
+            sample = tokens[:check_tokens]
+            start = time.perf_counter()
+            expected = reference.log_probs(sample)
+            dict_rate = len(sample) / (time.perf_counter() - start)
+            assert np.allclose(scorer.log_probs(sample), expected), f"{author} {level} scores differ"
+
+            print(f"{author:<8}{level:<8}{result['tokens']:>10}{result['cross_entropy']:>10.3f}"
+                  f"{result['perplexity']:>9.1f}{vector_rate:>14,.0f}{dict_rate:>12,.0f}"
+                  f"{vector_rate / dict_rate:>8.0f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark perplexity scoring.")
+    parser.add_argument("--check-tokens", type=int, default=20000,
+                        help="Tokens scored by the dict reference and compared")
+    args = parser.parse_args()
+    main(args.check_tokens)
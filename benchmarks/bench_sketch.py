@@ -0,0 +1,104 @@
+"""
+bench_sketch.py
+Validate approximate n-gram counting (sketch.SketchCounter) against exact counts.
+
+For every bundled book, char and word orders 4 and 5 are counted exactly
+(NgramCounter) and approximately, feeding both the same streaming chunks.
+The run fails when a guarantee is broken:
+
+    - a sketch estimate is below the exact count
+    - more than a delta fraction of n-grams is over by more than epsilon * N
+    - an n-gram with count > N / (heavy_hitters + 1) is missing from the heavy hitters
+    - a heavy-hitter count is below the exact count or over by more than the Misra-Gries error
+
+and reports the memory used and the overlap of the top 20 with the exact top 20.
+
+Run from the repository root:
+    python benchmarks/bench_sketch.py [--epsilon 1e-4] [--delta 0.01] [--heavy-hitters 10000]
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from starter_preprocess import TextPreprocessor, NgramCounter
+from src.analyze import AUTHOR_FILES, iter_normalized_chunks
+from src.sketch import SketchCounter, hash_rows
+
+ORDERS = [4, 5]
+CHUNK_SIZE = 1 << 18
+
+
+def check(counter, exact, n):
+    sketch = counter.sketches[n]
+    token_ids = counter.token_ids
+    ngrams = list(exact)
+    true = np.fromiter(exact.values(), dtype=np.int64, count=len(ngrams))
+    ids = np.array([[token_ids[tok] for tok in g] for g in ngrams], dtype=np.int64)
+    est = sketch.query(hash_rows(ids))
+    assert (est >= true).all(), "sketch estimate below the exact count"
+    over = float(np.mean(est - true > sketch.epsilon * sketch.total))
+    assert over <= counter.delta, f"{over:.2%} of estimates exceed epsilon * N"
+
+    heavy, counts = counter.heavy_hitters(n)
+    found = {tuple(row): c for row, c in zip(heavy.tolist(), counts.tolist())}
+    bound = sketch.total / (counter.heavy[n].capacity + 1)
+    for g, c in exact.items():
+        row = tuple(token_ids[tok] for tok in g)
+        if c > bound:
+            assert row in found, f"heavy hitter {g} ({c}) missing"
+        if row in found:
+            assert c <= found[row] <= c + counter.heavy[n].error, f"heavy-hitter count of {g} out of bounds"
+
+    exact_top = {g for g, _ in sorted(exact.items(), key=lambda x: x[1], reverse=True)[:20]}
+    vocab = counter.vocab
+    approx_top = {tuple(vocab[i] for i in heavy[row]) for row in np.argsort(-counts, kind="stable")[:20]}
+    return over, len(exact_top & approx_top)
+
+
+def main(epsilon, delta, heavy_hitters):
+    pre = TextPreprocessor()
+    print(f"{'book':<8}{'table':<8}{'distinct':>9}{'eps*N':>8}{'over':>7}{'top20':>7}"
+          f"{'sketch MB':>11}{'exact s':>9}{'sketch s':>10}")
+    for author, path in AUTHOR_FILES.items():
+        chunks = list(iter_normalized_chunks(path, pre, CHUNK_SIZE))
+        for ngram_type in ("char", "word"):
+            # Tokens of each chunk exactly as analyze --stream feeds them
+            token_chunks = [pre.tokenize_chars(c) if ngram_type == "char" else pre.tokenize_words(c)
+                            for c in chunks]
+            if ngram_type == "char":
+                for chunk in token_chunks[1:]:
+                    chunk.insert(0, " ")
+
+            start = time.perf_counter()
+            exact = NgramCounter(ORDERS)
+            for tokens in token_chunks:
+                exact.update(tokens)
+            exact_counts = exact.results()
+            exact_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            counter = SketchCounter(ORDERS, epsilon, delta, heavy_hitters)
+            for tokens in token_chunks:
+                counter.update(tokens)
+            sketch_time = time.perf_counter() - start
+
+            for n in ORDERS:
+                over, overlap = check(counter, exact_counts[n], n)
+                sketch = counter.sketches[n]
+                print(f"{author:<8}{ngram_type + '-' + str(n):<8}{len(exact_counts[n]):>9}"
+                      f"{sketch.epsilon * sketch.total:>8.1f}{over:>7.2%}{overlap:>7}"
+                      f"{(sketch.nbytes + counter.heavy[n].nbytes) / 2**20:>11.2f}"
+                      f"{exact_time:>9.2f}{sketch_time:>10.2f}")
+    print(" All sketch and heavy-hitter bounds hold.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate sketch counts against exact counts.")
+    parser.add_argument("--epsilon", type=float, default=1e-4)
+    parser.add_argument("--delta", type=float, default=0.01)
+    parser.add_argument("--heavy-hitters", type=int, default=10000)
+    args = parser.parse_args()
+    main(args.epsilon, args.delta, args.heavy_hitters)
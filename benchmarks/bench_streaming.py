@@ -0,0 +1,69 @@
+"""
+bench_streaming.py
+In-memory vs streaming analyze counting: checks that the n-gram tables are
+identical and reports wall time and peak traced memory.
+
+--repeat K concatenates each book body K times into a temporary corpus to
+show that streaming memory stays flat as the input grows.
+
+Run from the repository root:
+    python benchmarks/bench_streaming.py --repeat 4
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from starter_preprocess import TextPreprocessor, FrequencyAnalyzer
+from src.analyze import AUTHOR_FILES, count_streaming
+
+ORDERS = [1, 2, 3]
+
+
+def count_in_memory(path, pre):
+    fa = FrequencyAnalyzer()
+    with open(path, "r", encoding="utf-8") as f:
+        normalized = pre.normalize_text(pre.clean_gutenberg_text(f.read()))
+    return (fa.calculate_ngrams_multi(pre.tokenize_chars(normalized), ORDERS),
+            fa.calculate_ngrams_multi(pre.tokenize_words(normalized), ORDERS))
+
+
+def measure(func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main(repeat, chunk_size):
+    pre = TextPreprocessor()
+    print(f"{'author':<8}{'MB':>7}{'memory s':>10}{'stream s':>10}{'memory peak MB':>16}{'stream peak MB':>16}")
+    for author, path in AUTHOR_FILES.items():
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".txt", delete=False) as tmp:
+            with open(path, "r", encoding="utf-8") as f:
+                body = pre.clean_gutenberg_text(f.read())
+            for _ in range(repeat):
+                tmp.write(body + "\n")
+        try:
+            (char_ref, word_ref), mem_time, mem_peak = measure(count_in_memory, tmp.name, pre)
+            result, stream_time, stream_peak = measure(count_streaming, tmp.name, pre, ORDERS, chunk_size)
+            assert result[0] == char_ref and result[1] == word_ref, f"{author}: streaming counts differ"
+            size_mb = os.path.getsize(tmp.name) / 2**20
+        finally:
+            os.remove(tmp.name)
+        print(f"{author:<8}{size_mb:>7.1f}{mem_time:>10.2f}{stream_time:>10.2f}"
+              f"{mem_peak / 2**20:>16.1f}{stream_peak / 2**20:>16.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark streaming analyze counting.")
+    parser.add_argument("--repeat", type=int, default=1, help="Copies of each book in the test corpus")
+    parser.add_argument("--chunk-size", type=int, default=1 << 20, help="Characters per streamed chunk")
+    args = parser.parse_args()
+    main(args.repeat, args.chunk_size)
@@ -0,0 +1,198 @@
+"""
+bench_suite.py
+Performance regression suite: analyze, table load, generator construction and generation.
+
+Every case runs in a fresh interpreter so timings are cold and peak RSS
+belongs to that case alone:
+
+    analyze:<author>           analyze_text without the cache, in a temporary working
+                               copy so data/freq_tables and data/corpus are left alone
+    pipeline:<author>:<level>  load_frequencies, TextGenerator(...) and generate()
+                               on a freshly built generator (cold samplers)
+    startup:<command>          CLI import time (check_import_time.py)
+
+for the three bundled books and levels char-1 .. word-3. Each timing is
+the best of --repeats runs. Results are compared against a JSON baseline;
+the run fails (exit 1) when a time or peak RSS grows, or a tokens/sec
+rate drops, by more than --threshold. It also fails when CLI startup breaks
+the check_import_time budget (--budget-ms) or loads a forbidden module.
+
+The stored baseline is only meaningful for the code that produced it:
+re-record it with --save-baseline in the same commit as any change meant to
+move these numbers (analyze stages, table formats, generation), and when
+moving to a different machine.
+
+Run from the repository root:
+    python benchmarks/bench_suite.py                    # compare against benchmarks/baseline.json
+    python benchmarks/bench_suite.py --save-baseline    # record a new baseline
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import tempfile
+import argparse
+import subprocess
+import contextlib
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.metrics import peak_rss_mb
+from benchmarks.check_import_time import check_startup, CASES as STARTUP_CASES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+AUTHORS = ["austen", "twain", "doyle"]
+LEVELS = ["char-1", "char-2", "char-3", "word-1", "word-2", "word-3"]
+GENERATE_LENGTH = 1000
+
+# Time differences below this are noise, whatever the ratio
+MIN_TIME_DELTA = 0.005
+
+
+def best_time(fn, repeats):
+    best, result = float("inf"), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_analyze(author, repeats):
+    from src.analyze import analyze_text, AUTHOR_FILES
+    from src.corpus_store import load_corpus
+
+    # analyze writes to data/ relative to the working directory: give it a scratch one
+    # holding only the book, so the tracked tables and user artifacts are never touched
+    work = tempfile.mkdtemp(prefix="bench_analyze_")
+    try:
+        book = os.path.join(work, AUTHOR_FILES[author])
+        os.makedirs(os.path.dirname(book))
+        os.symlink(os.path.join(ROOT, AUTHOR_FILES[author]), book)
+        os.chdir(work)
+        with contextlib.redirect_stdout(io.StringIO()):
+            seconds, _ = best_time(lambda: analyze_text(author, use_cache=False), repeats)
+        n_words = len(load_corpus(author).word_ids)
+    finally:
+        os.chdir(ROOT)
+        shutil.rmtree(work)
+    return {"analyze_s": seconds, "analyze_tokens_per_s": n_words / seconds}
+
+
+def run_pipeline(author, level, repeats):
+    from starter_preprocess import FrequencyAnalyzer
+    from src.generator import TextGenerator
+
+    ngram_type, n = level.split("-")
+    json_path = f"data/freq_tables/{author}_{ngram_type}_{n}-gram.json"
+    load_s, _ = best_time(lambda: FrequencyAnalyzer().load_frequencies(json_path), repeats)
+    construct_s, _ = best_time(lambda: TextGenerator(author=author, level=level), repeats)
+
+    # A new generator per repeat, so every timed run builds its per-context samplers
+    generate_s = float("inf")
+    for _ in range(repeats):
+        generator = TextGenerator(author=author, level=level, rng=random.Random(0))
+        start = time.perf_counter()
+        n_tokens = len(generator._generate_tokens(GENERATE_LENGTH))
+        generate_s = min(generate_s, time.perf_counter() - start)
+    return {"load_frequencies_s": load_s, "construct_s": construct_s,
+            "generate_s": generate_s, "generate_tokens_per_s": n_tokens / generate_s}
+
+
+def run_case(case, repeats):
+    """Run one case in this process and return its metrics."""
+    kind, author, *rest = case.split(":")
+    metrics = run_analyze(author, repeats) if kind == "analyze" else run_pipeline(author, rest[0], repeats)
+    metrics["peak_rss_mb"] = peak_rss_mb()
+    return metrics
+
+
+def run_isolated(case, repeats):
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), "--case", case,
+                             "--repeats", str(repeats)],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def regressions(results, baseline, threshold):
+    """(case, metric, baseline, current) for every metric worse than threshold allows."""
+    found = []
+    for case, metrics in results.items():
+        for metric, value in metrics.items():
+            old = baseline.get(case, {}).get(metric)
+            if old is None:
+                continue
+            if metric.endswith("_per_s"):
+                # A rate is its timing inverted: apply that timing's noise floor too
+                timing = metric.replace("_tokens_per_s", "_s")
+                old_s, new_s = baseline.get(case, {}).get(timing), metrics.get(timing)
+                worse = value < old / (1 + threshold) and (
+                    old_s is None or new_s is None or new_s - old_s > MIN_TIME_DELTA)
+            elif metric.endswith("_s"):
+                worse = value > old * (1 + threshold) and value - old > MIN_TIME_DELTA
+            else:
+                worse = value > old * (1 + threshold)
+            if worse:
+                found.append((case, metric, old, value))
+    return found
+
+
+def main(args):
+    cases = [f"analyze:{a}" for a in AUTHORS] + [f"pipeline:{a}:{lv}" for a in AUTHORS for lv in LEVELS]
+    if args.only:
+        cases = [c for c in cases if args.only in c]
+
+    results = {}
+    print(f"{'case':<24}{'wall s':>9}{'tokens/s':>14}{'peak MB':>9}")
+    for case in cases:
+        metrics = results[case] = run_isolated(case, args.repeats)
+        wall = metrics.get("analyze_s", metrics.get("generate_s"))
+        rate = metrics.get("analyze_tokens_per_s", metrics.get("generate_tokens_per_s"))
+        print(f"{case:<24}{wall:>9.4f}{rate:>14,.0f}{metrics['peak_rss_mb']:>9.1f}")
+
+    startup_ms, startup_failures = {}, []
+    if not args.only or any(args.only in f"startup:{name}" for name in STARTUP_CASES):
+        startup_ms, startup_failures = check_startup(args.budget_ms, args.repeats)
+    for name, ms in startup_ms.items():
+        results[f"startup:{name}"] = {"import_s": ms / 1e3}
+        print(f"{'startup:' + name:<24}{ms / 1e3:>9.4f}")
+    for failure in startup_failures:
+        print(f" STARTUP FAIL {failure}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f" Saved baseline → {args.baseline}")
+        return 1 if startup_failures else 0
+    if not os.path.exists(args.baseline):
+        print(f" No baseline at {args.baseline}; run with --save-baseline first")
+        return 1 if startup_failures else 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    found = regressions(results, baseline, args.threshold)
+    for case, metric, old, new in found:
+        print(f" REGRESSION {case} {metric}: {old:.4g} → {new:.4g}")
+    print(f" {len(found)} regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 1 if found or startup_failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the performance suite against a stored baseline.")
+    parser.add_argument("--baseline", default=BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.3, help="Allowed relative regression")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per timing; the fastest counts")
+    parser.add_argument("--budget-ms", type=float, default=200, help="Import budget for the generate command")
+    parser.add_argument("--only", default=None, help="Only cases containing this text, e.g. twain")
+    parser.add_argument("--case", default=None, help=argparse.SUPPRESS)  # internal: run one case and print JSON
+    args = parser.parse_args()
+
+    if args.case:
+        os.chdir(ROOT)
+        print(json.dumps(run_case(args.case, args.repeats)))
+        sys.exit(0)
+    sys.exit(main(args))
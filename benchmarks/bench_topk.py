@@ -0,0 +1,52 @@
+"""
+bench_topk.py
+Time top-20 queries: JSON load + sorted() vs the binary model's rank index and prefix search.
+
+Run from the repository root after analyze:
+    python benchmarks/bench_topk.py
+"""
+
+import os
+import sys
+import json
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.model_store import NgramModel, model_path_for
+
+AUTHORS = ["austen", "twain", "doyle"]
+LEVELS = ["char-3", "word-1", "word-2", "word-3"]
+K = 20
+
+
+def legacy_top(json_path):
+    with open(json_path, "r", encoding="utf-8") as f:
+        freqs = json.load(f)
+    return sorted(freqs.items(), key=lambda x: x[1], reverse=True)[:K]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    print(f"{'author':<8}{'level':<8}{'rows':>8}{'json+sorted ms':>16}{'rank index ms':>15}{'prefix ms':>11}")
+    for author in AUTHORS:
+        for level in LEVELS:
+            ngram_type, n = level.split("-")
+            json_path = f"data/freq_tables/{author}_{ngram_type}_{n}-gram.json"
+            legacy, legacy_time = timed(legacy_top, json_path)
+            model, load_time = timed(NgramModel, model_path_for(json_path))
+            top, top_time = timed(model.top_k, K)
+            assert [c for _, c in top] == [c for _, c in legacy], f"{author} {level} top-k differs"
+
+            # Prefix query on the most frequent n-gram's first token
+            first = top[0][0][:1] if isinstance(top[0][0], tuple) else ()
+            _, prefix_time = timed(model.top_k, K, first)
+            print(f"{author:<8}{level:<8}{len(model):>8}{legacy_time * 1e3:>16.1f}"
+                  f"{(load_time + top_time) * 1e3:>15.2f}{prefix_time * 1e3:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
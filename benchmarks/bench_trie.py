@@ -0,0 +1,83 @@
+"""
+bench_trie.py
+Compare the n-gram trie with the per-order JSON dicts: memory, counts and query speed.
+
+Memory is the traced allocations of the three load_frequencies dicts
+(orders 1-3) against the trie's arrays for the same orders ("trie 1-3")
+and for every order it stores. Counts of every order 1-3 n-gram must match.
+
+Run from the repository root after `python src/shannon_gen.py analyze --author <name>`:
+    python benchmarks/bench_trie.py
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from starter_preprocess import FrequencyAnalyzer
+from src.ngram_trie import NgramTrie, trie_path_for
+
+AUTHORS = ["austen", "twain", "doyle"]
+TYPES = ["char", "word"]
+ORDERS = [1, 2, 3]
+
+
+def load_dicts(author, ngram_type):
+    fa = FrequencyAnalyzer()
+    tracemalloc.start()
+    tables = {n: fa.load_frequencies(f"data/freq_tables/{author}_{ngram_type}_{n}-gram.json")
+              for n in ORDERS}
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return tables, size
+
+
+def level_bytes(trie, max_order):
+    # Arrays needed to answer queries up to max_order
+    return sum(trie.tokens[k].nbytes + trie.counts[k].nbytes + trie.children[k - 1].nbytes
+               for k in range(1, max_order + 1))
+
+
+def time_successors(trie, prefixes):
+    start = time.perf_counter()
+    for prefix in prefixes:
+        trie.successors(prefix)
+    return (time.perf_counter() - start) / len(prefixes)
+
+
+def main(queries):
+    rng = random.Random(0)
+    print(f"{'author':<8}{'type':<6}{'dicts KB':>10}{'trie 1-3 KB':>13}{'ratio':>7}"
+          f"{'order':>7}{'trie KB':>9}{'succ us':>9}")
+    for author in AUTHORS:
+        for ngram_type in TYPES:
+            path = trie_path_for(author, ngram_type)
+            if not os.path.isdir(path):
+                print(f"{author:<8}{ngram_type:<6} no trie; run analyze first")
+                continue
+            tables, dict_bytes = load_dicts(author, ngram_type)
+            trie = NgramTrie.load(path)
+            for n in ORDERS:
+                assert trie.frequencies(n) == tables[n], f"{author} {ngram_type} {n}-gram counts differ"
+
+            # Prefixes of every stored order, drawn from real n-grams
+            prefixes = []
+            for _ in range(queries):
+                level = rng.randrange(1, trie.max_order)
+                ngram = trie.ngram_at(level, rng.randrange(len(trie.tokens[level])))
+                prefixes.append(ngram)
+
+            same_orders = level_bytes(trie, max(ORDERS))
+            print(f"{author:<8}{ngram_type:<6}{dict_bytes / 1024:>10.0f}{same_orders / 1024:>13.0f}"
+                  f"{dict_bytes / same_orders:>6.1f}x{trie.max_order:>7}{trie.nbytes / 1024:>9.0f}"
+                  f"{time_successors(trie, prefixes) * 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the n-gram trie against the JSON dicts.")
+    parser.add_argument("--queries", type=int, default=2000, help="successors() calls timed per trie")
+    args = parser.parse_args()
+    main(args.queries)
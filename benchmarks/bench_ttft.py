@@ -0,0 +1,95 @@
+"""
+bench_ttft.py
+Time to first token of TextGenerator.iter_generate vs generate() for growing lengths.
+
+Checks that the streamed tokens join to exactly the generate() text for the
+same seed, that time to first token does not grow with --length, and that
+agenerate() interleaves concurrent consumers and stops when cancelled.
+
+Run from the repository root after analyze:
+    python benchmarks/bench_ttft.py [--author austen] [--level word-3]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.generator import TextGenerator
+
+LENGTHS = [10, 1000, 100000]
+
+
+def first_token_time(generator, length, seed, repeats=5):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        tokens = generator.iter_generate(length, seed)
+        next(tokens)
+        best = min(best, time.perf_counter() - start)
+        tokens.close()
+    return best
+
+
+async def check_async(generator):
+    # Two consumers of separate generators advance in turns
+    order = []
+
+    async def consume(name, gen):
+        async for _ in gen.agenerate(50, seed=1):
+            order.append(name)
+
+    other = TextGenerator(generator.author, generator.level, smoothing="kn")
+    await asyncio.gather(consume("a", generator), consume("b", other))
+    switches = sum(1 for x, y in zip(order, order[1:]) if x != y)
+    assert switches > 10, f"consumers did not interleave ({switches} switches)"
+
+    # Cancelling the consumer stops sampling
+    produced = []
+
+    async def endless():
+        async for token in generator.agenerate(10 ** 9, seed=2):
+            produced.append(token)
+
+    task = asyncio.create_task(endless())
+    while len(produced) < 100:
+        await asyncio.sleep(0)
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    stopped_at = len(produced)
+    await asyncio.sleep(0.01)
+    assert len(produced) == stopped_at, "generation continued after cancellation"
+    return switches, stopped_at
+
+
+def main(author, level):
+    generator = TextGenerator(author, level, smoothing="kn")
+    sep = "" if generator.ngram_type == "char" else " "
+    generator.generate(10, seed=0)  # warm the per-context caches
+
+    print(f"{'length':>8}{'first token ms':>16}{'generate() ms':>15}")
+    ttfts = []
+    for length in LENGTHS:
+        streamed = sep.join(generator.iter_generate(length, seed=3))
+        start = time.perf_counter()
+        text = generator.generate(length, seed=3)
+        total = time.perf_counter() - start
+        assert streamed == text, f"streamed tokens differ from generate() at length {length}"
+        ttfts.append(first_token_time(generator, length, seed=3))
+        print(f"{length:>8}{ttfts[-1] * 1e3:>16.3f}{total * 1e3:>15.1f}")
+    assert ttfts[-1] < 5 * ttfts[0] + 1e-3, "time to first token grows with the length"
+
+    switches, stopped_at = asyncio.run(check_async(generator))
+    print(f" agenerate: {switches} switches between two consumers; cancelled after {stopped_at} tokens")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time to first token of streamed generation.")
+    parser.add_argument("--author", default="austen", help="austen | twain | doyle")
+    parser.add_argument("--level", default="word-3", help="char-3 | word-3 etc.")
+    args = parser.parse_args()
+    main(args.author, args.level)
@@ -0,0 +1,55 @@
+"""
+bench_vectorized.py
+Pure-Python multi-order counting vs the NumPy path over integer-encoded
+tokens. Checks that the decoded dicts equal calculate_ngrams_multi
+(including key order) and reports seconds for orders 1-3.
+
+"np dict" includes building the Python dicts; "np arrays" stops at the
+(ngram ids, counts) arrays.
+
+Run from the repository root:
+    python benchmarks/bench_vectorized.py
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from starter_preprocess import TextPreprocessor, FrequencyAnalyzer
+from src.analyze import AUTHOR_FILES
+
+ORDERS = [1, 2, 3]
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    pre = TextPreprocessor()
+    fa = FrequencyAnalyzer()
+    print(f"{'author':<8}{'tokens':<7}{'python s':>10}{'encode s':>10}{'np dict s':>11}{'np arrays s':>13}{'speedup':>9}")
+    for author, path in AUTHOR_FILES.items():
+        with open(path, "r", encoding="utf-8") as f:
+            normalized = pre.normalize_text(pre.clean_gutenberg_text(f.read()))
+
+        words = pre.tokenize_words(normalized)
+        runs = [
+            ("char", pre.tokenize_chars(normalized), pre.encode_chars, normalized),
+            ("word", words, pre.encode_tokens, words),
+        ]
+        for name, tokens, encode, source in runs:
+            reference, python_time = timed(fa.calculate_ngrams_multi, tokens, ORDERS)
+            (vocab, ids), encode_time = timed(encode, source)
+            counts, dict_time = timed(fa.calculate_ngrams_vectorized_multi, ids, vocab, ORDERS)
+            _, array_time = timed(fa.calculate_ngrams_vectorized_multi, ids, vocab, ORDERS, as_arrays=True)
+            for n in ORDERS:
+                assert list(counts[n].items()) == list(reference[n].items()), f"{author} {name} {n}-gram differs"
+            print(f"{author:<8}{name:<7}{python_time:>10.3f}{encode_time:>10.3f}{dict_time:>11.3f}"
+                  f"{array_time:>13.3f}{python_time / (encode_time + dict_time):>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
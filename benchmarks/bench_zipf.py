@@ -0,0 +1,52 @@
+"""
+bench_zipf.py
+Time Zipf fits of all 18 tables: JSON + sorted() + Python regression vs zipf.zipf_tables.
+
+Both must give the same alpha and R^2 for every table.
+
+Run from the repository root after analyze:
+    python benchmarks/bench_zipf.py
+"""
+
+import os
+import sys
+import math
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from starter_preprocess import FrequencyAnalyzer
+from src.zipf import zipf_tables, AUTHORS, TYPES, ORDERS
+
+
+def legacy_zipf(frequencies):
+    # Dict load, full sort and a per-point least-squares loop
+    counts = sorted(frequencies.values(), reverse=True)
+    xs = [math.log10(r) for r in range(1, len(counts) + 1)]
+    ys = [math.log10(c) for c in counts]
+    mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+    sxx = sum((x - mx) ** 2 for x in xs)
+    syy = sum((y - my) ** 2 for y in ys)
+    sxy = sum((x - mx) * (y - my) for x, y in zip(xs, ys))
+    return {"alpha": -sxy / sxx, "r_squared": sxy * sxy / (sxx * syy)}
+
+
+def main():
+    fa = FrequencyAnalyzer()
+    start = time.perf_counter()
+    legacy = [legacy_zipf(fa.load_frequencies(f"data/freq_tables/{a}_{t}_{n}-gram.json"))
+              for a in AUTHORS for t in TYPES for n in ORDERS]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = zipf_tables()
+    vector_time = time.perf_counter() - start
+
+    assert len(results) == len(legacy)
+    for old, new in zip(legacy, results):
+        assert abs(old["alpha"] - new["alpha"]) < 1e-9 and abs(old["r_squared"] - new["r_squared"]) < 1e-9, new
+
+    print(f"{len(results)} tables | legacy {legacy_time * 1e3:.0f} ms | vectorized {vector_time * 1e3:.1f} ms"
+          f" | {legacy_time / vector_time:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+check_import_time.py
+Import-time budget for CLI cold starts, measured with `python -X importtime`.
+
+Runs `shannon_gen.py generate` in a fresh interpreter several times and
+fails (exit 1) when the best run's total import time exceeds the budget,
+or when a subcommand loads a module it must not (matplotlib and numpy for
+generate, matplotlib for analyze).
+
+bench_suite.py runs the same check as part of its regression gate, and
+tests/test_import_time.py asserts the forbidden modules stay unloaded.
+
+Run from the repository root after analyze:
+    python benchmarks/check_import_time.py [--budget-ms 200]
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = os.path.join(ROOT, "src", "shannon_gen.py")
+
+# name -> (interpreter arguments, module prefixes that must not be imported)
+CASES = {
+    "generate": ([CLI, "generate", "--author", "austen", "--level", "word-3", "--length", "5"],
+                 ["matplotlib", "numpy"]),
+    "analyze": (["-c", "import sys; sys.path.insert(0, '.'); import src.analyze"], ["matplotlib"]),
+    "help": ([CLI, "--help"], ["matplotlib", "numpy"]),
+}
+
+
+def import_times(args):
+    """{module: cumulative microseconds} for one cold run."""
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Top-level imports have no indentation; their cumulative times add up to the total
+        times[name[1:].rstrip()] = int(cumulative)
+    return times
+
+
+def total_ms(times):
+    return sum(us for name, us in times.items() if not name.startswith(" ")) / 1e3
+
+
+def check_startup(budget_ms, runs):
+    """
+    ({case: best total import ms}, [failure messages]) for every case:
+    forbidden modules loaded, or generate over budget_ms.
+    """
+    times, failures = {}, []
+    for name, (args, forbidden) in CASES.items():
+        samples = [import_times(args) for _ in range(runs)]
+        best = min(samples, key=total_ms)
+        times[name] = total_ms(best)
+        loaded = sorted({m.strip() for m in best if any(m.strip().startswith(f) for f in forbidden)})
+        if loaded:
+            failures.append(f"{name} imports {', '.join(loaded[:3])}")
+        elif name == "generate" and times[name] > budget_ms:
+            failures.append(f"{name} over {budget_ms} ms budget ({times[name]:.1f} ms)")
+    return times, failures
+
+
+def main(budget_ms, runs):
+    times, failures = check_startup(budget_ms, runs)
+    for name, ms in times.items():
+        failed = [f for f in failures if f.startswith(f"{name} ")]
+        print(f"{name:<10}{ms:>8.1f} ms  {'FAIL: ' + failed[0][len(name) + 1:] if failed else 'ok'}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check CLI import time against a budget.")
+    parser.add_argument("--budget-ms", type=float, default=200, help="Import budget for generate")
+    parser.add_argument("--runs", type=int, default=3, help="Cold runs per case; the fastest counts")
+    args = parser.parse_args()
+    sys.exit(main(args.budget_ms, args.runs))
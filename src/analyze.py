@@ -7,77 +7,495 @@ for the given author text using starter_preprocess.py utilities.
 """
 import sys
 import os
+import re
+import json
+import hashlib
+import shutil
+import multiprocessing as mp
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import argparse
-from starter_preprocess import TextPreprocessor, FrequencyAnalyzer
+from starter_preprocess import TextPreprocessor, FrequencyAnalyzer, NgramCounter
+from src.model_store import save_model, model_path_for, pack_contexts, MODEL_FILES
+from src.corpus_store import save_corpus, corpus_path_for, CORPUS_FILES
+from src.ngram_trie import NgramTrie, trie_path_for, trie_files
+from src.smoothing import build_kneser_ney, kn_path_for, kn_files
+from src.pruning import prune_frequencies, parse_setting, format_setting
+from src.sketch import SketchCounter, remove_sketches, SKETCH_FILES, DEFAULT_EPSILON, DEFAULT_DELTA, DEFAULT_HEAVY_HITTERS
+from src import metrics
 
 
-def analyze_text(author: str):
+AUTHOR_FILES = {
+    "austen": "data/austen_pride_prejudice.txt",
+    "twain": "data/twain_tom_sawyer.txt",
+    "doyle": "data/doyle_sherlock_holmes.txt"
+}
+
+# Characters of input text normalized at a time in streaming mode
+DEFAULT_CHUNK_SIZE = 1 << 22
+
+# Modules whose code determines the analyze outputs; editing any of them invalidates the cache
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_SOURCES = [
+    os.path.join(_ROOT, "starter_preprocess.py"),
+    os.path.join(_ROOT, "src", "analyze.py"),
+    os.path.join(_ROOT, "src", "model_store.py"),
+    os.path.join(_ROOT, "src", "corpus_store.py"),
+    os.path.join(_ROOT, "src", "ngram_trie.py"),
+    os.path.join(_ROOT, "src", "smoothing.py"),
+    os.path.join(_ROOT, "src", "sketch.py"),
+    os.path.join(_ROOT, "src", "pruning.py"),
+]
+
+# n-gram orders analyze writes
+ORDERS = [1, 2, 3]
+
+# Highest order stored in the char/word tries (all orders in one structure, no table per order)
+DEFAULT_TRIE_ORDER = 5
+
+
+def _hash_file(h, path):
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+
+
+def cache_key(input_path, pre, orders):
+    """
+    Content hash of everything the analyze outputs depend on: the input
+    bytes, the preprocessing settings, the n-gram orders and the code.
+    """
+    h = hashlib.blake2b(digest_size=20)
+    _hash_file(h, input_path)
+    h.update(json.dumps({"markers": pre.gutenberg_markers, "orders": list(orders)}).encode("utf-8"))
+    for path in CACHE_SOURCES:
+        _hash_file(h, path)
+    return h.hexdigest()
+
+
+def _output_files(outputs):
+    # Every file analyze writes: JSON tables, the files of each binary model, the corpus artifact,
+    # tries, Kneser-Ney models and approximate (sketched) orders
+    files = []
+    for level in ("char", "word"):
+        for json_path in outputs[level].values():
+            model_dir = model_path_for(json_path)
+            files.append(json_path)
+            files.extend(os.path.join(model_dir, name) for name in MODEL_FILES)
+    if outputs.get("corpus"):
+        files.extend(os.path.join(outputs["corpus"], name) for name in CORPUS_FILES)
+    tries = outputs.get("tries") or {}
+    for level in ("char", "word"):
+        if level in tries:
+            files.extend(os.path.join(tries[level], name) for name in trie_files(tries["order"]))
+            files.extend(os.path.join(tries[f"{level}_kn"], name) for name in kn_files(tries["order"]))
+    approx = outputs.get("approx") or {}
+    for level in ("char", "word"):
+        for paths in approx.get(level, {}).values():
+            if paths["model"]:
+                files.extend(os.path.join(paths["model"], name) for name in MODEL_FILES)
+            files.extend(os.path.join(paths["sketch"], name) for name in SKETCH_FILES)
+            if paths["vocab"] not in files:
+                files.append(paths["vocab"])
+    return files
+
+
+def _fingerprint(files):
+    # Size and mtime catch outputs that were overwritten or deleted since the cached run
+    fingerprint = {}
+    for path in files:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        fingerprint[path] = [st.st_size, st.st_mtime_ns]
+    return fingerprint
+
+
+def _cached_outputs(manifest_path, key):
+    """Output paths of a previous run with the same key, or None if anything changed."""
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if manifest.get("key") != key:
+        return None
+    if _fingerprint(_output_files(manifest["outputs"])) != manifest.get("files"):
+        return None
+    return manifest["outputs"]
+
+
+def remove_stale_outputs(author, out_dir, keep_tries, keep_corpus):
+    """
+    Delete this author's tries and Kneser-Ney tables (unless keep_tries) and
+    corpus artifact (unless keep_corpus) left by an earlier run, so a run that
+    does not rebuild them never leaves the generator, score or attribute
+    reading models of a different input next to the new tables.
+    """
+    paths = []
+    if not keep_tries:
+        paths += [path_for(author, level, out_dir) for path_for in (trie_path_for, kn_path_for)
+                  for level in ("char", "word")]
+    if not keep_corpus:
+        paths.append(corpus_path_for(author))
+    for path in paths:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def iter_normalized_chunks(input_path, pre, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield the normalized book text in pieces of roughly chunk_size characters.
+
+    A first pass over the file finds the Gutenberg header/footer lines, the
+    second normalizes whole-line batches. Chunks always end on a line break,
+    so joining the non-empty pieces with a single space reproduces
+    normalize_text(clean_gutenberg_text(raw)) exactly.
+    """
+    with open(input_path, "r", encoding="utf-8") as f:
+        start_idx, end_idx = pre.find_gutenberg_bounds(f)
+
+    with open(input_path, "r", encoding="utf-8") as f:
+        buffer, size = [], 0
+        for i, line in enumerate(f):
+            if end_idx is not None and i >= end_idx:
+                break
+            if i < start_idx:
+                continue
+            buffer.append(line)
+            size += len(line)
+            if size >= chunk_size:
+                chunk = pre.normalize_text("".join(buffer))
+                if chunk:
+                    yield chunk
+                buffer, size = [], 0
+        chunk = pre.normalize_text("".join(buffer))
+        if chunk:
+            yield chunk
+
+
+def count_streaming(input_path, pre, orders, chunk_size=DEFAULT_CHUNK_SIZE, sketches=None):
+    """
+    Count char and word n-grams chunk by chunk with bounded working memory.
+
+    Returns (char counts, word counts, number of sentences, number of words,
+    number of chars), matching the in-memory path exactly. `sketches`
+    ({"char": SketchCounter, "word": SketchCounter}) are fed the same
+    token chunks for approximate higher orders.
+    """
+    char_counter = NgramCounter(orders)
+    word_counter = NgramCounter(orders)
+    n_sentences = n_words = n_chars = 0
+    open_sentence = False  # text after the last [.!?] of the previous chunk
+
+    for k, chunk in enumerate(iter_normalized_chunks(input_path, pre, chunk_size)):
+        # Chunks are joined by one space in the full text
+        chars = pre.tokenize_chars(chunk)
+        if k:
+            chars.insert(0, " ")
+        words = pre.tokenize_words(chunk)
+        char_counter.update(chars)
+        word_counter.update(words)
+        if sketches:
+            sketches["char"].update(chars)
+            sketches["word"].update(words)
+        n_chars += len(chars)
+        n_words += len(words)
+
+        # A sentence may straddle the chunk boundary: merge it with the carried piece
+        parts = re.split(r'[.!?]+', chunk)
+        first = open_sentence or bool(parts[0].strip())
+        if len(parts) == 1:
+            open_sentence = first
+        else:
+            n_sentences += first + sum(1 for part in parts[1:-1] if part.strip())
+            open_sentence = bool(parts[-1].strip())
+    n_sentences += open_sentence
+
+    return char_counter.results(), word_counter.results(), n_sentences, n_words, n_chars
+
+
+# Token id arrays visible to pool workers (inherited on fork, sent once per worker otherwise)
+_shared_streams = {}
+
+
+def _init_worker(streams):
+    global _shared_streams
+    _shared_streams = streams
+
+
+def _count_shard(name, start, end, orders):
+    # Count the n-grams starting in ids[start:end] as (ngram id rows, counts) per order
+    fa = FrequencyAnalyzer()
+    vocab, ids = _shared_streams[name]
+    return {n: fa.calculate_ngrams_vectorized(ids[start:end + n - 1], vocab, n, as_arrays=True)
+            for n in orders}
+
+
+def _merge_shards(shards, vocab, n):
+    # Sum the shards' counts by packed code; keys keep their first occurrence across shards
+    ngrams = np.concatenate([rows for rows, _ in shards])
+    counts = np.concatenate([c for _, c in shards])
+    codes = pack_contexts(ngrams, max(len(vocab), 1))
+    uniq, first, inverse = np.unique(codes, return_index=True, return_inverse=True)
+    totals = np.bincount(inverse.ravel(), weights=counts, minlength=len(uniq)).astype(np.int64)
+    order = np.argsort(first, kind="stable")
+    tokens = np.array(vocab, dtype=object)
+    columns = [tokens[col].tolist() for col in ngrams[first[order]].T]
+    keys = columns[0] if n == 1 else zip(*columns)
+    return dict(zip(keys, totals[order].tolist()))
+
+
+def count_parallel(streams, orders, workers):
+    """
+    Map-reduce n-gram counting over a process pool.
+
+    Each stream in `streams` (name -> (vocab, ids) as from TextPreprocessor.encode_tokens)
+    is cut into `workers` contiguous shards. A shard counts the n-grams starting
+    inside it with calculate_ngrams_vectorized(as_arrays=True), reading n-1 ids
+    past its end, so no n-gram is lost or counted twice at a cut. Only the id and
+    count arrays travel back; the parent sums them by packed code and builds each
+    dict once, so the result (including key order) equals calculate_ngrams_multi.
+    """
+    max_n = max(orders)
+    streams = {name: (vocab, np.asarray(ids, dtype=np.int64)) for name, (vocab, ids) in streams.items()}
+    if any(max(len(vocab), 1) ** max_n >= 2 ** 63 for vocab, _ in streams.values()):
+        raise ValueError(f"Vocabulary too large to pack {max_n}-grams into int64 codes")
+    plan = {}
+    for name, (_, ids) in streams.items():
+        n_shards = max(1, min(workers, len(ids) // max(max_n, 1)))
+        plan[name] = [len(ids) * i // n_shards for i in range(n_shards + 1)]
+
+    ctx = mp.get_context("fork") if "fork" in mp.get_all_start_methods() else None
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                             initializer=_init_worker, initargs=(streams,)) as pool:
+        futures = {name: [pool.submit(_count_shard, name, cuts[i], cuts[i + 1], orders)
+                          for i in range(len(cuts) - 1)]
+                   for name, cuts in plan.items()}
+        shards = {name: [future.result() for future in name_futures] for name, name_futures in futures.items()}
+
+    return {name: {n: _merge_shards([shard[n] for shard in shards[name]], streams[name][0], n) for n in orders}
+            for name in streams}
+
+
+def analyze_text(author: str, stream: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 input_path: str = None, workers: int = 1, use_cache: bool = True,
+                 trie_order: int = DEFAULT_TRIE_ORDER, approx_order: int = 0,
+                 epsilon: float = DEFAULT_EPSILON, delta: float = DEFAULT_DELTA,
+                 heavy_hitters: int = DEFAULT_HEAVY_HITTERS, prune: dict = None):
     """
     Clean, normalize, tokenize, and compute n-gram frequencies
     for the given author.
-    """
 
-    author_files = {
-        "austen": "data/austen_pride_prejudice.txt",
-        "twain": "data/twain_tom_sawyer.txt",
-        "doyle": "data/doyle_sherlock_holmes.txt"
-    }
+    With stream=True the book is read and normalized chunk_size characters
+    at a time instead of holding the whole text and token lists in memory.
+    input_path overrides the bundled book (the author then only names the outputs).
+    workers > 1 counts the n-grams in that many processes.
+
+    Outputs are keyed on a hash of the input bytes, preprocessing settings,
+    orders and code (see cache_key); when the key and the written files are
+    unchanged the run stops after hashing. use_cache=False always recomputes.
 
-    if author not in author_files:
-        raise ValueError("Author must be one of: austen, twain, doyle")
+    The in-memory path also saves the normalized text, sentence spans and
+    token ids as a corpus artifact (src/corpus_store.py) for visualize and
+    later stages; streaming mode does not, since its input may not fit in memory.
+    It also builds char and word tries (src/ngram_trie.py) holding every
+    order up to trie_order, which the generator uses for orders above 3,
+    and from them the Kneser-Ney tables for smoothed generation
+    (src/smoothing.py); trie_order=0 skips both. Artifacts a run does not
+    rebuild are deleted (remove_stale_outputs), not left from an older input.
+
+    Streaming mode with approx_order > 3 also counts orders 4..approx_order
+    approximately in fixed memory (src/sketch.py): a Count-Min Sketch with
+    error bound epsilon * N at probability delta, and the heavy_hitters most
+    frequent n-grams written as binary models the generator and top-k use.
+
+    prune (a parse_setting dict, e.g. {"min_count": 2, "bits": 8}) prunes
+    and quantizes the 2- and 3-gram tables before they are written (src/pruning.py).
+
+    Returns {"char": {"1-gram": json_path, ...}, "word": {...}, "corpus": dir or None,
+    "tries": {"char": dir, "word": dir, "char_kn": dir, "word_kn": dir, "order": trie_order} or None,
+    "approx": {"config": {...}, "char": {"4-gram": {"model": dir, "sketch": dir}, ...}, "word": {...}} or None,
+    "prune": the prune setting or None}.
+    """
+    if stream and workers > 1:
+        raise ValueError("Streaming mode counts serially; use either stream or workers > 1")
+    if approx_order and not stream:
+        raise ValueError("Approximate counting runs in streaming mode; pass stream=True")
 
-    input_path = author_files[author]
+    if input_path is None:
+        if author not in AUTHOR_FILES:
+            raise ValueError("Author must be one of: austen, twain, doyle")
+        input_path = AUTHOR_FILES[author]
     print(f"📖 Reading text for {author.title()}...")
 
     pre = TextPreprocessor()
     fa = FrequencyAnalyzer()
+    orders = ORDERS
 
-    with open(input_path, "r", encoding="utf-8") as f:
-        raw = f.read()
+    out_dir = "data/freq_tables"
+    manifest_path = os.path.join(out_dir, f"{author}_manifest.json")
+    trie_order = 0 if stream else trie_order
+    with metrics.stage("cache_check"):
+        key = cache_key(input_path, pre, orders)
+        outputs = _cached_outputs(manifest_path, key) if use_cache else None
+    metrics.count("bytes_read", os.path.getsize(input_path))
+    approx_orders = list(range(max(orders) + 1, approx_order + 1))
+    approx_config = ({"order": approx_order, "epsilon": epsilon, "delta": delta,
+                      "heavy_hitters": heavy_hitters} if approx_orders else None)
+    if (outputs is not None and (outputs.get("tries") or {}).get("order", 0) == trie_order
+            and (outputs.get("approx") or {}).get("config") == approx_config
+            and outputs.get("prune") == (prune or None)):
+        print(f" Input and code unchanged (key {key[:12]}); reusing tables in {out_dir}")
+        return outputs
 
-    cleaned = pre.clean_gutenberg_text(raw)
-    normalized = pre.normalize_text(cleaned)
-    print(" Cleaned and normalized text.")
+    corpus_path = tries = approx = None
+    remove_sketches(author, out_dir, approx_orders)
+    remove_stale_outputs(author, out_dir, keep_tries=bool(trie_order), keep_corpus=not stream)
+    if stream:
+        sketches = None
+        if approx_orders:
+            sketches = {level: SketchCounter(approx_orders, epsilon, delta, heavy_hitters)
+                        for level in ("char", "word")}
+        with metrics.stage("stream_count"):
+            char_counts, word_counts, n_sentences, n_words, n_chars = count_streaming(
+                input_path, pre, orders, chunk_size, sketches)
+        print(" Cleaned, normalized and counted text in streaming mode.")
+        if sketches:
+            with metrics.stage("write_sketch"):
+                approx = {"config": approx_config}
+                for level, counter in sketches.items():
+                    approx[level] = counter.save(author, level, out_dir)
+                    metrics.count("sketch_bytes", counter.nbytes)
+                    metrics.count("sketch_vocab_bytes", counter.vocab_bytes)
+            print(f" Sketched orders {', '.join(map(str, approx_orders))} "
+                  f"({sketches['word'].nbytes / 2**20:.1f} MB per level plus a "
+                  f"{sketches['word'].vocab_bytes / 2**20:.1f} MB word vocabulary, top {heavy_hitters} kept).")
+    else:
+        with metrics.stage("read"):
+            with open(input_path, "r", encoding="utf-8") as f:
+                raw = f.read()
 
-    sentences = pre.tokenize_sentences(normalized)
-    words = pre.tokenize_words(normalized)
-    chars = pre.tokenize_chars(normalized)
+        with metrics.stage("clean"):
+            cleaned = pre.clean_gutenberg_text(raw)
+        with metrics.stage("normalize"):
+            normalized = pre.normalize_text(cleaned)
+        print(" Cleaned and normalized text.")
 
-    print(f" Sentences: {len(sentences)} | Words: {len(words)} | Chars: {len(chars)}")
+        with metrics.stage("tokenize"):
+            sentences = pre.tokenize_sentences(normalized)
+            words = pre.tokenize_words(normalized)
+            n_sentences, n_words = len(sentences), len(words)
 
-    char_freqs_all = {}
-    word_freqs_all = {}
+        with metrics.stage("encode"):
+            char_vocab, char_ids = pre.encode_chars(normalized)
+            word_vocab, word_ids = pre.encode_tokens(words)
+            n_chars = len(char_ids)
 
-    for n in [1, 2, 3]:
-        char_freqs = fa.calculate_ngrams(chars, n)
-        word_freqs = fa.calculate_ngrams(words, n)
-        char_freqs_all[f"{n}-gram"] = char_freqs
-        word_freqs_all[f"{n}-gram"] = word_freqs
+        with metrics.stage("count"):
+            if workers > 1:
+                counts = count_parallel({"char": (char_vocab, char_ids), "word": (word_vocab, word_ids)},
+                                        orders, workers)
+                char_counts, word_counts = counts["char"], counts["word"]
+            else:
+                # Chars are counted with NumPy over their ids, without a per-character list.
+                # Word tables are dominated by building the output dict, so Counter stays faster there.
+                char_counts = fa.calculate_ngrams_vectorized_multi(char_ids, char_vocab, orders)
+                word_counts = fa.calculate_ngrams_multi(words, orders)
+
+        with metrics.stage("save_corpus"):
+            corpus_path = corpus_path_for(author)
+            save_corpus(corpus_path, key, normalized, pre, char_vocab, char_ids, word_vocab, word_ids)
+
+        if trie_order:
+            tries = {"order": trie_order}
+            for level, ids, vocab in [("char", char_ids, char_vocab), ("word", word_ids, word_vocab)]:
+                with metrics.stage("build_trie"):
+                    trie = NgramTrie.build(ids, vocab, trie_order)
+                    tries[level] = trie_path_for(author, level, "data/freq_tables")
+                    trie.save(tries[level])
+                with metrics.stage("build_kneser_ney"):
+                    tries[f"{level}_kn"] = kn_path_for(author, level, "data/freq_tables")
+                    build_kneser_ney(trie, tries[f"{level}_kn"], level)
+                metrics.count("trie_nodes", len(trie))
+            print(f" Built char and word tries and Kneser-Ney tables up to order {trie_order}.")
+
+    if prune:
+        with metrics.stage("prune"):
+            before = sum(len(counts[n]) for counts in (char_counts, word_counts) for n in orders if n > 1)
+            char_counts = prune_frequencies(char_counts, prune)
+            word_counts = prune_frequencies(word_counts, prune)
+            after = sum(len(counts[n]) for counts in (char_counts, word_counts) for n in orders if n > 1)
+        metrics.count("ngrams_pruned", before - after)
+        print(f" Pruned ({format_setting(prune)}): {before:,} → {after:,} n-grams of order 2+.")
+
+    print(f" Sentences: {n_sentences} | Words: {n_words} | Chars: {n_chars}")
+    metrics.count("sentences", n_sentences)
+    metrics.count("word_tokens", n_words)
+    metrics.count("char_tokens", n_chars)
+
+    char_freqs_all = {f"{n}-gram": char_counts[n] for n in orders}
+    word_freqs_all = {f"{n}-gram": word_counts[n] for n in orders}
 
-    out_dir = "data/freq_tables"
     os.makedirs(out_dir, exist_ok=True)
 
     char_file = os.path.join(out_dir, f"{author}_char.json")
     word_file = os.path.join(out_dir, f"{author}_word.json")
 
-    # Save each n-gram level separately so JSON stays valid
-    for n, freqs in char_freqs_all.items():
-        filename = os.path.join(out_dir, f"{author}_char_{n}.json")
-        fa.save_frequencies(freqs, filename)
+    # Save each n-gram level separately so JSON stays valid,
+    # plus the binary model the generator loads with memmap
+    outputs = {"char": {}, "word": {}, "corpus": corpus_path, "tries": tries, "approx": approx,
+               "prune": prune or None}
+    quantized = bool((prune or {}).get("bits"))
+    for level, freqs_all in [("char", char_freqs_all), ("word", word_freqs_all)]:
+        for n, freqs in freqs_all.items():
+            filename = os.path.join(out_dir, f"{author}_{level}_{n}.json")
+            with metrics.stage("write_json"):
+                fa.save_frequencies(freqs, filename)
+            with metrics.stage("write_model"):
+                save_model(freqs, model_path_for(filename), level, quantized=quantized and n != "1-gram")
+            outputs[level][n] = filename
+            metrics.count("ngrams_distinct", len(freqs))
+            metrics.count("ngrams_counted", sum(freqs.values()))
+            metrics.count("tables_written")
+            metrics.count("bytes_written", os.path.getsize(filename))
 
-    for n, freqs in word_freqs_all.items():
-        filename = os.path.join(out_dir, f"{author}_word_{n}.json")
-        fa.save_frequencies(freqs, filename)
+    # Record the key only once every output is written
+    with metrics.stage("write_manifest"):
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "outputs": outputs,
+                       "files": _fingerprint(_output_files(outputs))}, f, indent=2)
 
     print(f" Saved character frequencies → {char_file}")
     print(f" Saved word frequencies → {word_file}")
     print(" Done!")
+    return outputs
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Analyze text and compute n-gram frequencies.")
     parser.add_argument("--author", required=True, help="Author to analyze: austen | twain | doyle")
+    parser.add_argument("--stream", action="store_true", help="Read and count the input in chunks")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Characters per chunk with --stream")
+    parser.add_argument("--input", default=None, help="Analyze this file instead of the bundled book")
+    parser.add_argument("--workers", type=int, default=1, help="Processes used for n-gram counting")
+    parser.add_argument("--force", action="store_true", help="Recompute even if inputs are unchanged")
+    parser.add_argument("--trie-order", type=int, default=DEFAULT_TRIE_ORDER,
+                        help="Highest order kept in the n-gram tries (0 to skip them)")
+    parser.add_argument("--approx-order", type=int, default=0,
+                        help="With --stream, count orders 4..N approximately in fixed memory")
+    parser.add_argument("--epsilon", type=float, default=DEFAULT_EPSILON,
+                        help="Sketch error bound as a fraction of the n-grams seen")
+    parser.add_argument("--delta", type=float, default=DEFAULT_DELTA,
+                        help="Probability that a sketch estimate exceeds the error bound")
+    parser.add_argument("--heavy-hitters", type=int, default=DEFAULT_HEAVY_HITTERS,
+                        help="Most frequent n-grams kept per approximate order")
+    parser.add_argument("--prune", default=None,
+                        help="Prune/quantize the 2- and 3-gram tables, e.g. min_count=2 | entropy=1e-7,bits=8")
     args = parser.parse_args()
 
-    analyze_text(args.author)
\ No newline at end of file
+    analyze_text(args.author, stream=args.stream, chunk_size=args.chunk_size, input_path=args.input,
+                 workers=args.workers, use_cache=not args.force, trie_order=args.trie_order,
+                 approx_order=args.approx_order, epsilon=args.epsilon, delta=args.delta,
+                 heavy_hitters=args.heavy_hitters, prune=parse_setting(args.prune))
\ No newline at end of file
@@ -5,24 +5,24 @@ Part 2 - Statistical Analysis & Visualization
 
 import os
 import json
+import heapq
 import argparse
 import numpy as np
-import matplotlib.pyplot as plt
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import argparse
 from starter_preprocess import TextPreprocessor, FrequencyAnalyzer
+from src.analyze import AUTHOR_FILES, ORDERS, cache_key
+from src.corpus_store import load_corpus
+from src.model_store import NgramModel, model_path_for, heavy_model_path_for
+from src.ngram_trie import NgramTrie, trie_path_for
+from src import metrics
 
 
 def load_text(author):
-    author_files = {
-        "austen": "data/austen_pride_prejudice.txt",
-        "twain": "data/twain_tom_sawyer.txt",
-        "doyle": "data/doyle_sherlock_holmes.txt"
-    }
-    if author not in author_files:
+    if author not in AUTHOR_FILES:
         raise ValueError("Author must be one of: austen, twain, doyle")
-    with open(author_files[author], "r", encoding="utf-8") as f:
+    with open(AUTHOR_FILES[author], "r", encoding="utf-8") as f:
         return f.read()
 
 
@@ -35,6 +35,8 @@ def compute_sentence_stats(text, preprocessor):
 
 
 def plot_sentence_length_distribution(author, lengths):
+    import matplotlib.pyplot as plt  # only plotting needs it; top_ngrams callers skip the import
+
     plt.figure(figsize=(8, 4))
     plt.hist(lengths, bins=40, color="teal", edgecolor="black", alpha=0.7)
     plt.title(f"Sentence Length Distribution — {author.title()}")
@@ -46,15 +48,46 @@ def plot_sentence_length_distribution(author, lengths):
     plt.close()
 
 
+def top_ngrams(author, level="word-3", k=20, prefix=()):
+    """
+    The k most frequent n-grams of one (author, level) as (ngram, count)
+    pairs, optionally only those starting with the `prefix` tokens.
+
+    Answered from the binary model's rank index, or for orders above 3
+    from the n-gram trie (else the heavy hitters of analyze --approx-order),
+    without loading the JSON table.
+    """
+    ngram_type, n = level.split("-")
+    json_path = f"data/freq_tables/{author}_{ngram_type}_{n}-gram.json"
+    if os.path.isdir(model_path_for(json_path)):
+        return NgramModel(model_path_for(json_path)).top_k(k, prefix)
+    trie_path = trie_path_for(author, ngram_type)
+    if os.path.isdir(trie_path):
+        trie = NgramTrie.load(trie_path)
+        if trie.max_order >= int(n):
+            return trie.top_ngrams(int(n), k, prefix)
+    if os.path.isdir(heavy_model_path_for(json_path)):
+        return NgramModel(heavy_model_path_for(json_path)).top_k(k, prefix)
+    raise FileNotFoundError(f"No binary model or trie for {author} {level}; run analyze first")
+
+
 def plot_top_ngrams(author, freq_file, top_n=20, label="Word"):
-    with open(freq_file, "r", encoding="utf-8") as f:
-        freqs = json.load(f)
-    # Pick the trigram list for visualization (3-gram)
-    trigram_data = freqs.get("3-gram", freqs)
-    top_items = sorted(trigram_data.items(), key=lambda x: x[1], reverse=True)[:top_n]
+    model_path = model_path_for(freq_file)
+    if os.path.isdir(model_path):
+        # Rank index written by analyze: no table load or sort
+        top_items = [(" ".join(g) if isinstance(g, tuple) else g, c)
+                     for g, c in NgramModel(model_path).top_k(top_n)]
+    else:
+        with open(freq_file, "r", encoding="utf-8") as f:
+            freqs = json.load(f)
+        # Pick the trigram list for visualization (3-gram)
+        trigram_data = freqs.get("3-gram", freqs)
+        top_items = heapq.nlargest(top_n, trigram_data.items(), key=lambda x: x[1])
+        top_items = [(l.replace("||", " "), c) for l, c in top_items]  # prettier keys
+
+    import matplotlib.pyplot as plt
 
     labels, values = zip(*top_items)
-    labels = [l.replace("||", " ") for l in labels]  # prettier keys
 
     plt.figure(figsize=(10, 5))
     plt.barh(labels[::-1], values[::-1], color="slateblue")
@@ -69,22 +102,41 @@ def plot_top_ngrams(author, freq_file, top_n=20, label="Word"):
 def main(author):
     pre = TextPreprocessor()
 
-    raw_text = load_text(author)
-    clean_text = pre.clean_gutenberg_text(raw_text)
-    normalized = pre.normalize_text(clean_text)
+    if author not in AUTHOR_FILES:
+        raise ValueError("Author must be one of: austen, twain, doyle")
 
-    # Sentence stats
-    sentence_lengths, mean_len, std_len = compute_sentence_stats(normalized, pre)
+    # Reuse the corpus analyze saved, as long as it was built from this exact input and code
+    with metrics.stage("load_corpus"):
+        corpus = load_corpus(author, cache_key(AUTHOR_FILES[author], pre, ORDERS))
+    if corpus is not None:
+        with metrics.stage("sentence_stats"):
+            sentence_lengths = np.asarray(corpus.sentence_lengths)
+            mean_len, std_len = np.mean(sentence_lengths), np.std(sentence_lengths)
+    else:
+        print(" No up-to-date corpus from analyze; preprocessing the text again.")
+        with metrics.stage("preprocess"):
+            raw_text = load_text(author)
+            clean_text = pre.clean_gutenberg_text(raw_text)
+            normalized = pre.normalize_text(clean_text)
+        metrics.count("bytes_read", len(raw_text.encode("utf-8")))
+
+        # Sentence stats
+        with metrics.stage("sentence_stats"):
+            sentence_lengths, mean_len, std_len = compute_sentence_stats(normalized, pre)
+    metrics.count("sentences", len(sentence_lengths))
     print(f"📊 {author.title()} — Mean sentence length: {mean_len:.2f} ± {std_len:.2f}")
 
-    plot_sentence_length_distribution(author, sentence_lengths)
+    with metrics.stage("plot_sentence_lengths"):
+        plot_sentence_length_distribution(author, sentence_lengths)
 
     # Load frequency JSONs (generated in part 1)
     word_freq_file = f"data/freq_tables/{author}_word_3-gram.json"
     char_freq_file = f"data/freq_tables/{author}_char_3-gram.json"
 
-    plot_top_ngrams(author, word_freq_file, label="Word")
-    plot_top_ngrams(author, char_freq_file, label="Character")
+    with metrics.stage("plot_top_ngrams"):
+        plot_top_ngrams(author, word_freq_file, label="Word")
+        plot_top_ngrams(author, char_freq_file, label="Character")
+    metrics.count("plots_written", 3)
 
     print(f"Plots saved in /outputs for {author}")
 
@@ -0,0 +1,180 @@
+"""
+attribute.py
+Author attribution of many documents: score each under every author model and rank
+
+Every author's n-gram trie is loaded once in the parent, together with the
+scorer arrays built from it (scoring.NgramScorer). Pool workers are forked
+after that, so they read the same pages instead of loading their own copies
+(on platforms without fork each worker receives the scorers once).
+
+A document is normalized and tokenized once with TextPreprocessor and
+integer-encoded once; each author then only maps the document's small
+vocabulary to its ids and runs the vectorized Kneser-Ney scorer. The result
+per document is the authors ranked by total log2-likelihood.
+
+Run from the repository root after analyze:
+    python src/attribute.py --inputs unknown/*.txt --workers 4
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import multiprocessing as mp
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from starter_preprocess import TextPreprocessor
+from src.model_store import list_authors
+from src.ngram_trie import TRIE_SUFFIX
+from src.scoring import NgramScorer
+
+# Documents per task sent to a worker
+CHUNK_DOCUMENTS = 16
+
+# Tasks in flight per worker; input is read only as results are consumed
+TASKS_PER_WORKER = 2
+
+
+def load_scorers(authors=None, level="word-3"):
+    """{author: NgramScorer} for every author (default: all with a trie of the level's type)."""
+    ngram_type = level.split("-")[0]
+    authors = authors or list_authors(f"_{ngram_type}{TRIE_SUFFIX}")
+    if not authors:
+        raise FileNotFoundError(f"No {ngram_type} tries in data/freq_tables; run analyze first")
+    return {author: NgramScorer(author, level) for author in authors}
+
+
+def read_documents(paths, per_line=False):
+    """
+    (name, text) pairs from files and directories (their *.txt files).
+    With per_line=True every non-empty line of a file is its own document.
+    """
+    files = []
+    for path in paths:
+        files.extend(sorted(glob.glob(os.path.join(path, "*.txt"))) if os.path.isdir(path) else [path])
+    for path in files:
+        with open(path, "r", encoding="utf-8") as f:
+            if per_line:
+                for i, line in enumerate(f, 1):
+                    if line.strip():
+                        yield f"{path}:{i}", line
+            else:
+                yield path, f.read()
+
+
+def score_document(scorers, name, text, pre=None):
+    """
+    {"document", "tokens", "ranking": [{"author", "log2_likelihood", "bits_per_token"}, ...]}
+    with the ranking best author first. A document with no tokens after
+    normalization has "ranking": None, since every author would score it 0.
+    """
+    pre = pre or TextPreprocessor()
+    scorer = next(iter(scorers.values()))
+    normalized = pre.normalize_text(text)
+    tokens = pre.tokenize_chars(normalized) if scorer.ngram_type == "char" else pre.tokenize_words(normalized)
+    if not tokens:
+        return {"document": name, "tokens": 0, "ranking": None}
+    local_vocab, local_ids = pre.encode_tokens(tokens)
+    ranking = []
+    for author, scorer in scorers.items():
+        log_likelihood = float(scorer.log_probs(scorer.map_ids(local_vocab, local_ids)).sum())
+        ranking.append({"author": author, "log2_likelihood": log_likelihood,
+                        "bits_per_token": -log_likelihood / len(tokens)})
+    ranking.sort(key=lambda r: r["log2_likelihood"], reverse=True)
+    return {"document": name, "tokens": len(tokens), "ranking": ranking}
+
+
+# Scorers visible to pool workers (inherited on fork, sent once per worker otherwise)
+_shared_scorers = {}
+
+
+def _init_worker(scorers):
+    global _shared_scorers
+    _shared_scorers = scorers
+
+
+def _score_chunk(documents):
+    pre = TextPreprocessor()
+    return [score_document(_shared_scorers, name, text, pre) for name, text in documents]
+
+
+def _chunks(documents, size):
+    chunk = []
+    for doc in documents:
+        chunk.append(doc)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def attribute(documents, scorers, workers=1):
+    """
+    Yield score_document results for an iterable of (name, text) pairs in
+    input order. workers > 1 scores chunks of documents in a process pool,
+    with at most TASKS_PER_WORKER chunks per worker submitted at a time.
+    """
+    if workers <= 1:
+        pre = TextPreprocessor()
+        for name, text in documents:
+            yield score_document(scorers, name, text, pre)
+        return
+
+    ctx = mp.get_context("fork") if "fork" in mp.get_all_start_methods() else None
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                             initializer=_init_worker, initargs=(scorers,)) as pool:
+        pending = deque()
+        for chunk in _chunks(documents, CHUNK_DOCUMENTS):
+            if len(pending) >= TASKS_PER_WORKER * workers:
+                yield from pending.popleft().result()
+            pending.append(pool.submit(_score_chunk, chunk))
+        while pending:
+            yield from pending.popleft().result()
+
+
+def run(paths, authors=None, level="word-3", workers=None, per_line=False, output=None):
+    """Attribute every document under `paths`, print or save the rankings and report documents/sec."""
+    workers = workers or os.cpu_count() or 1
+    scorers = load_scorers(authors, level)
+    start = time.perf_counter()
+    n_docs = n_unscorable = 0
+    out = open(output, "w", encoding="utf-8") if output else None
+    try:
+        for result in attribute(read_documents(paths, per_line), scorers, workers):
+            n_docs += 1
+            n_unscorable += result["ranking"] is None
+            if out:
+                out.write(json.dumps(result) + "\n")
+            elif result["ranking"] is None:
+                print(f" {result['document']:<40} → unscorable (no tokens)")
+            else:
+                best, *rest = result["ranking"]
+                runner_up = f"; next {rest[0]['author']} {rest[0]['log2_likelihood']:.1f}" if rest else ""
+                print(f" {result['document']:<40} → {best['author']:<10} {best['log2_likelihood']:.1f} bits"
+                      f" ({result['tokens']} tokens{runner_up})")
+    finally:
+        if out:
+            out.close()
+    elapsed = time.perf_counter() - start
+    print(f" Attributed {n_docs} documents under {len(scorers)} {level} models with {workers} workers"
+          f" in {elapsed:.2f} s ({n_docs / elapsed if elapsed else 0:,.1f} documents/s)")
+    if n_unscorable:
+        print(f" {n_unscorable} documents had no tokens and were not ranked")
+    if output:
+        print(f" Saved rankings → {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Attribute documents to the author whose model scores them best.")
+    parser.add_argument("--inputs", nargs="+", required=True, help="Text files or directories of *.txt files")
+    parser.add_argument("--authors", nargs="*", default=None, help="Candidate authors (default: all analyzed)")
+    parser.add_argument("--level", default="word-3", help="char-3 | word-3 | word-5 etc.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--per-line", action="store_true", help="Treat every line of a file as a document")
+    parser.add_argument("--output", default=None, help="Write one JSON ranking per document to this file")
+    args = parser.parse_args()
+    run(args.inputs, args.authors, args.level, args.workers, args.per_line, args.output)
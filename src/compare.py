@@ -0,0 +1,185 @@
+"""
+compare.py
+Cross-author divergence matrices (KL, Jensen-Shannon, cosine) over n-gram tables
+
+All authors' binary models of one (type, order) are aligned onto a shared
+vocabulary: tokens get global ids, each n-gram row a packed int64 key, and
+the union of keys the column space. The counts then form a sparse
+authors x n-grams matrix in CSR layout (indptr, indices, counts).
+
+The matrices are computed in one pass over dense column blocks of that
+matrix, so memory stays at authors x block whatever the table sizes:
+
+    cosine(i, j)  P_i . P_j / (|P_i| |P_j|), one matmul per block
+    KL(i || j)    sum p'_i log2(p'_i / p'_j) with p' = (1 - s) p + s / columns,
+                  so n-grams an author never used do not make it infinite;
+                  sum p'_i log2 p'_j is again one matmul per block
+    JS(i, j)      in bits, from the n-grams both authors use (the rest add
+                  half their mass each), so only columns shared by two or more
+                  authors are visited
+
+Run from the repository root after analyze:
+    python src/compare.py --type word --orders 1 2 3
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.model_store import NgramModel, model_path_for, pack_contexts, list_authors, MODEL_SUFFIX
+
+# Weight of the uniform distribution mixed into each author's table for KL
+DEFAULT_SMOOTHING = 0.01
+
+# Dense cells (authors x columns) per block
+BLOCK_CELLS = 1 << 22
+
+METRICS = ["kl", "js", "cosine"]
+
+
+def load_models(authors, ngram_type="word", n=3, out_dir="data/freq_tables"):
+    models = []
+    for author in authors:
+        path = model_path_for(os.path.join(out_dir, f"{author}_{ngram_type}_{n}-gram.json"))
+        if not os.path.isdir(path):
+            raise FileNotFoundError(f"No binary model {path}; run analyze for {author} first")
+        models.append(NgramModel(path))
+    return models
+
+
+def align_models(models):
+    """
+    Sparse authors x n-grams count matrix over the union of the models' n-grams:
+    (indptr, indices, counts, n_columns) in CSR layout, column indices sorted per row.
+    """
+    token_ids = {}
+    for model in models:
+        for tok in model.vocab:
+            token_ids.setdefault(tok, len(token_ids))
+    vocab_size = max(len(token_ids), 1)
+    order = models[0].order
+    if any(model.order != order for model in models):
+        raise ValueError("All models must have the same order")
+    if vocab_size ** order >= 2 ** 63:
+        raise ValueError(f"Shared vocabulary of {vocab_size} is too large to pack {order}-grams")
+
+    keys = []
+    for model in models:
+        local_to_global = np.fromiter((token_ids[tok] for tok in model.vocab), dtype=np.int64,
+                                      count=len(model.vocab))
+        keys.append(pack_contexts(local_to_global[np.asarray(model.ngrams, dtype=np.int64)], vocab_size))
+    union = np.unique(np.concatenate(keys))
+
+    indptr, indices, counts = [0], [], []
+    for model, model_keys in zip(models, keys):
+        sort_idx = np.argsort(model_keys)
+        indices.append(np.searchsorted(union, model_keys[sort_idx]))
+        counts.append(np.asarray(model.counts, dtype=np.float64)[sort_idx])
+        indptr.append(indptr[-1] + len(sort_idx))
+    return np.array(indptr), np.concatenate(indices), np.concatenate(counts), len(union)
+
+
+def _blocks(indptr, indices, values, n_columns, block):
+    # Dense (rows x block) slices of a CSR matrix, left to right
+    n_rows = len(indptr) - 1
+    for lo in range(0, n_columns, block):
+        hi = min(lo + block, n_columns)
+        dense = np.zeros((n_rows, hi - lo))
+        for r in range(n_rows):
+            cols = indices[indptr[r]:indptr[r + 1]]
+            a, b = np.searchsorted(cols, [lo, hi])
+            dense[r, cols[a:b] - lo] = values[indptr[r] + a:indptr[r] + b]
+        yield dense
+
+
+def divergence_matrices(models, smoothing=DEFAULT_SMOOTHING):
+    """{"kl", "js", "cosine"}: (authors x authors) float64 matrices for a list of NgramModels."""
+    if not 0 < smoothing < 1:
+        raise ValueError("smoothing must lie in (0, 1)")
+    indptr, indices, counts, n_columns = align_models(models)
+    n_rows = len(models)
+    totals = np.add.reduceat(counts, indptr[:-1]) if len(counts) else np.zeros(n_rows)
+    probs = counts / np.repeat(totals, np.diff(indptr))
+
+    dot = np.zeros((n_rows, n_rows))
+    cross = np.zeros((n_rows, n_rows))  # sum over n-grams of p'_i log2 p'_j
+    both_mass = np.zeros((n_rows, n_rows))  # mass of author i on n-grams author j also uses
+    both_terms = np.zeros((n_rows, n_rows))
+    uniform = smoothing / n_columns
+    block = max(1024, BLOCK_CELLS // n_rows)
+    for p in _blocks(indptr, indices, probs, n_columns, block):
+        dot += p @ p.T
+        smoothed = (1 - smoothing) * p + uniform
+        cross += smoothed @ np.log2(smoothed).T
+
+        p = p[:, np.count_nonzero(p, axis=0) >= 2]  # columns shared by two or more authors
+        if not p.shape[1]:
+            continue
+        for i in range(n_rows):
+            both = (p[i] > 0) & (p > 0)
+            pi = np.broadcast_to(p[i], p.shape)[both]
+            pj = p[both]
+            m = (pi + pj) / 2
+            rows = np.repeat(np.arange(n_rows), both.sum(axis=1))
+            both_mass[i] += np.bincount(rows, weights=pi, minlength=n_rows)
+            both_terms[i] += np.bincount(rows, weights=(pi * np.log2(pi / m) + pj * np.log2(pj / m)) / 2,
+                                         minlength=n_rows)
+
+    norms = np.sqrt(np.diag(dot))
+    cosine = dot / np.maximum(np.outer(norms, norms), 1e-300)
+    kl = np.diag(cross)[:, None] - cross
+    # Mass on n-grams the other author never uses contributes p log2(p / (p / 2)) / 2 = p / 2 bits
+    js = both_terms + (2 - both_mass - both_mass.T) / 2
+    np.fill_diagonal(kl, 0.0)
+    np.fill_diagonal(js, 0.0)
+    return {"kl": kl, "js": np.maximum(js, 0.0), "cosine": cosine}
+
+
+def compare_authors(authors=None, ngram_type="word", orders=(1, 2, 3), smoothing=DEFAULT_SMOOTHING):
+    """{"authors": [...], "orders": {n: {"kl", "js", "cosine"}}} for every order."""
+    authors = authors or list_authors(f"_{ngram_type}_{max(orders)}-gram{MODEL_SUFFIX}")
+    if len(authors) < 2:
+        raise ValueError("Need at least two authors with frequency tables to compare")
+    return {"authors": list(authors),
+            "orders": {n: divergence_matrices(load_models(authors, ngram_type, n), smoothing) for n in orders}}
+
+
+def save_matrices(result, ngram_type, path):
+    """Write a compare_authors result as JSON (matrices as nested lists)."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"authors": result["authors"], "type": ngram_type,
+                   "orders": {str(n): {k: v.tolist() for k, v in m.items()}
+                              for n, m in result["orders"].items()}}, f, indent=2)
+
+
+def format_matrix(names, matrix, fmt="{:>9.3f}"):
+    width = max(9, max(len(name) for name in names) + 1)
+    lines = [" " * width + "".join(f"{name[:8]:>9}" for name in names)]
+    for name, row in zip(names, matrix):
+        lines.append(f"{name:<{width}}" + "".join(fmt.format(v) for v in row))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="KL, Jensen-Shannon and cosine matrices between authors.")
+    parser.add_argument("--authors", nargs="*", default=None, help="Authors to compare (default: all analyzed)")
+    parser.add_argument("--type", default="word", choices=["char", "word"], help="n-gram type")
+    parser.add_argument("--orders", type=int, nargs="*", default=[1, 2, 3], help="n-gram orders")
+    parser.add_argument("--smoothing", type=float, default=DEFAULT_SMOOTHING,
+                        help="Uniform mixture weight for KL (0 < s < 1)")
+    parser.add_argument("--json", default=None, help="Also write the matrices to this JSON file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = compare_authors(args.authors, args.type, args.orders, args.smoothing)
+    elapsed = time.perf_counter() - start
+    for n, matrices in result["orders"].items():
+        for metric in METRICS:
+            print(f"\n{args.type}-{n} {metric}:")
+            print(format_matrix(result["authors"], matrices[metric]))
+    print(f"\n {len(result['authors'])} authors x {len(args.orders)} orders in {elapsed:.2f} s")
+    if args.json:
+        save_matrices(result, args.type, args.json)
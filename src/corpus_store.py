@@ -0,0 +1,119 @@
+"""
+corpus_store.py
+Preprocessed-corpus artifact shared by analyze and the downstream stages
+
+analyze writes data/corpus/<author>.corpus/ once per input:
+
+    meta.json              cache key, char and word vocabularies
+    normalized.txt         the normalized text (UTF-8)
+    char_ids.npy           id of every character of normalized.txt
+    word_ids.npy           id of every tokenize_words token
+    sentence_spans.npy     int64 (s, 2) [start, end) of each sentence in normalized.txt
+    sentence_lengths.npy   uint32 (s,) words per sentence
+
+visualize and the other stages load it instead of re-reading and
+re-normalizing the book. Arrays are opened with mmap_mode="r".
+"""
+
+import os
+import re
+import sys
+import json
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.model_store import smallest_uint
+
+CORPUS_DIR = "data/corpus"
+CORPUS_ARRAYS = ["char_ids", "word_ids", "sentence_spans", "sentence_lengths"]
+CORPUS_FILES = ["meta.json", "normalized.txt"] + [f"{name}.npy" for name in CORPUS_ARRAYS]
+
+_SENTENCE = re.compile(r'[^.!?]+')
+
+
+def corpus_path_for(author):
+    return os.path.join(CORPUS_DIR, f"{author}.corpus")
+
+
+def sentence_spans(normalized):
+    """
+    [start, end) offsets of the sentences tokenize_sentences returns,
+    i.e. the stripped, non-empty pieces between runs of . ! ?
+    """
+    spans = []
+    for m in _SENTENCE.finditer(normalized):
+        piece = m.group()
+        stripped = piece.strip()
+        if stripped:
+            start = m.start() + (len(piece) - len(piece.lstrip()))
+            spans.append((start, start + len(stripped)))
+    return np.array(spans, dtype=np.int64).reshape(-1, 2)
+
+
+def save_corpus(path, key, normalized, pre, char_vocab, char_ids, word_vocab, word_ids):
+    """Write the artifact for one normalized text (ids from TextPreprocessor.encode_*)."""
+    spans = sentence_spans(normalized)
+    lengths = np.array(pre.get_sentence_lengths([normalized[a:b] for a, b in spans.tolist()]),
+                       dtype=np.uint32)
+    arrays = {
+        "char_ids": np.asarray(char_ids).astype(smallest_uint(len(char_vocab), (np.uint8, np.uint16, np.uint32))),
+        "word_ids": np.asarray(word_ids).astype(smallest_uint(len(word_vocab))),
+        "sentence_spans": spans,
+        "sentence_lengths": lengths,
+    }
+
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, "normalized.txt"), "w", encoding="utf-8") as f:
+        f.write(normalized)
+    for name, arr in arrays.items():
+        np.save(os.path.join(path, f"{name}.npy"), arr)
+    # meta.json last: a corpus without it is treated as incomplete
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"key": key, "char_vocab": char_vocab, "word_vocab": word_vocab}, f, ensure_ascii=False)
+
+
+class Corpus:
+    """Memory-mapped view of a saved corpus artifact."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.key = meta["key"]
+        self.char_vocab = meta["char_vocab"]
+        self.word_vocab = meta["word_vocab"]
+        for name in CORPUS_ARRAYS:
+            setattr(self, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r"))
+        self._normalized = None
+
+    @property
+    def normalized(self):
+        """The normalized text, read on first use."""
+        if self._normalized is None:
+            with open(os.path.join(self.path, "normalized.txt"), "r", encoding="utf-8") as f:
+                self._normalized = f.read()
+        return self._normalized
+
+    def sentences(self):
+        """Same list as TextPreprocessor.tokenize_sentences(normalized)."""
+        text = self.normalized
+        return [text[a:b] for a, b in self.sentence_spans.tolist()]
+
+    def words(self):
+        return [self.word_vocab[i] for i in self.word_ids.tolist()]
+
+    def chars(self):
+        return [self.char_vocab[i] for i in self.char_ids.tolist()]
+
+
+def load_corpus(author, key=None):
+    """
+    The saved corpus for `author`, or None if there is none or (when key is
+    given) it was built from different input or code.
+    """
+    path = corpus_path_for(author)
+    if not os.path.exists(os.path.join(path, "meta.json")):
+        return None
+    corpus = Corpus(path)
+    if key is not None and corpus.key != key:
+        return None
+    return corpus
@@ -1,6 +1,10 @@
 """
 generator.py
 Part 3 — Markov Text Generator
+
+generate() returns the whole text; iter_generate() and agenerate() yield
+the tokens one by one as they are sampled, so the first token arrives
+after model lookup of one context whatever the requested length.
 """
 
 import os
@@ -8,27 +12,89 @@ import json
 import random
 import argparse
 import sys
+from collections import deque
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import argparse
 from starter_preprocess import TextPreprocessor, FrequencyAnalyzer
+from src.sampler import CumulativeSampler
+from src.model_store import NgramModel, model_path_for, heavy_model_path_for, pack_contexts
+from src import metrics
 
 
 
 class TextGenerator:
-    def __init__(self, author, level="word-1"):
+    def __init__(self, author, level="word-1", rng=None, prefer_binary=True, smoothing=None):
         self.author = author
         self.level = level
+        self.rng = rng if rng is not None else random.Random()
         self.ngram_type, self.n = self._parse_level(level)
-        self.freq_data = self._load_freq_data()
+        self.table_path = f"data/freq_tables/{self.author}_{self.ngram_type}_{self.n}-gram.json"
+
+        # Prefer the memory-mapped binary model; samplers are then built per context on first use
+        self.model = self._load_model() if prefer_binary else None
+        self.trie = None
+        if self.model is None and not os.path.exists(self.table_path):
+            # Orders without a table of their own (e.g. word-5) are served from the n-gram trie,
+            # else from the heavy hitters of analyze --approx-order
+            self.trie = self._load_trie()
+            if self.trie is None:
+                self.model = self._load_heavy_model()
+        if self.model is not None or self.trie is not None:
+            self.freq_data = None
+            self.start_states = None
+            self.index = {}
+        else:
+            self.freq_data = self._load_freq_data()
+            self.start_states = list(self.freq_data.keys())
+            self.index = self._build_index()
+
+        # smoothing="kn" backs off through precomputed lower orders instead of stopping at unseen contexts
+        if smoothing not in (None, "none", "kn"):
+            raise ValueError(f"Unknown smoothing: {smoothing} (expected none | kn)")
+        self.smoother = self._load_smoother() if smoothing == "kn" else None
 
     def _parse_level(self, level):
         # e.g. "word-3" → ("word", 3)
         model_type, order = level.split("-")
         return model_type, int(order)
 
+    def _load_model(self):
+        model_path = model_path_for(self.table_path)
+        if not os.path.isdir(model_path):
+            return None
+        return NgramModel(model_path)
+
+    def _load_trie(self):
+        # Tries, Kneser-Ney tables and batched generation import numpy; sampling a binary model does not
+        from src.ngram_trie import NgramTrie, trie_path_for
+        trie_path = trie_path_for(self.author, self.ngram_type)
+        if os.path.isdir(trie_path):
+            trie = NgramTrie.load(trie_path)
+            if trie.max_order >= self.n:
+                return trie
+        return None
+
+    def _load_heavy_model(self):
+        from src.ngram_trie import trie_path_for
+        # Only the most frequent n-grams of the order: a last resort after exact tables and tries
+        heavy_path = heavy_model_path_for(self.table_path)
+        if not os.path.isdir(heavy_path):
+            raise FileNotFoundError(f"Missing frequency file {self.table_path} and no "
+                                    f"{self.ngram_type} trie of order {self.n} at "
+                                    f"{trie_path_for(self.author, self.ngram_type)}")
+        return NgramModel(heavy_path)
+
+    def _load_smoother(self):
+        from src.smoothing import KneserNey, kn_path_for
+        kn_path = kn_path_for(self.author, self.ngram_type)
+        if not os.path.isdir(kn_path):
+            raise FileNotFoundError(f"Missing Kneser-Ney model {kn_path}; run analyze first")
+        top = self.model if self.model is not None else self.trie
+        return KneserNey(kn_path, top if top is not None else self._id_model(), self.n)
+
     def _load_freq_data(self):
         # Load the right frequency JSON file
-        file_path = f"data/freq_tables/{self.author}_{self.ngram_type}_{self.n}-gram.json"
+        file_path = self.table_path
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"Missing frequency file: {file_path}")
         with open(file_path, "r", encoding="utf-8") as f:
@@ -42,65 +108,164 @@ class TextGenerator:
                 freq_data[key] = val
         return freq_data
 
+    def _build_index(self):
+        # Group the table once by context: (w1, ..., w_{n-1}) -> sampler over successors.
+        # Unigram models have a single empty context holding the whole vocabulary.
+        grouped = {}
+        for key, count in self.freq_data.items():
+            ngram = key if isinstance(key, tuple) else (key,)
+            grouped.setdefault(ngram[:-1], {})[ngram[-1]] = count
+        return {context: CumulativeSampler(succ.keys(), succ.values())
+                for context, succ in grouped.items()}
+
+    def _sampler_for(self, context):
+        sampler = self.index.get(context)
+        source = self.model if self.model is not None else self.trie
+        if sampler is None and source is not None:
+            successors = source.successors(context)
+            if successors is not None:
+                sampler = self.index[context] = CumulativeSampler(*successors)
+        return sampler
+
+    def _random_start(self):
+        if self.model is not None:
+            return self.model.ngram(self.rng.randrange(len(self.model)))
+        if self.trie is not None:
+            return self.trie.ngram_at(self.n, self.rng.randrange(len(self.trie.tokens[self.n])))
+        return self.rng.choice(self.start_states)
+
     def _choose_next(self, candidates):
         # Weighted random choice
-        total = sum(candidates.values())
-        r = random.uniform(0, total)
-        upto = 0
-        for k, w in candidates.items():
-            upto += w
-            if upto >= r:
-                return k
-        return random.choice(list(candidates.keys()))
+        return candidates.sample(self.rng)
 
     def generate(self, length=100, seed=None):
         """Generate text using loaded n-gram model."""
-        if self.ngram_type == "char":
-            return self._generate_char_sequence(length, seed)
-        else:
-            return self._generate_word_sequence(length, seed)
+        if seed is not None:
+            self.rng.seed(seed)
+        with metrics.stage("generate"):
+            if self.ngram_type == "char":
+                text = self._generate_char_sequence(length, seed)
+            else:
+                text = self._generate_word_sequence(length, seed)
+        return text
+
+    def iter_generate(self, length=100, seed=None):
+        """
+        Yield the tokens of generate(length, seed) one at a time: the start
+        n-gram's tokens, then each sampled token as soon as it is drawn.
+
+        Nothing is sampled ahead of the consumer, and closing the iterator
+        (or breaking out of the loop) stops generation. The generator's rng
+        is shared, so interleaving two iterators interleaves their draws.
+        """
+        if seed is not None:
+            self.rng.seed(seed)
+        return self._iter_tokens(length)
+
+    async def agenerate(self, length=100, seed=None):
+        """
+        Async iterator over the tokens of iter_generate(length, seed).
+
+        Each token is sampled only when the consumer awaits it, and control
+        returns to the event loop after every token, so other tasks keep
+        running and cancelling the consuming task stops generation.
+        """
+        import asyncio
+
+        tokens = self.iter_generate(length, seed)
+        try:
+            for token in tokens:
+                yield token
+                await asyncio.sleep(0)
+        finally:
+            tokens.close()
+
+    def _iter_tokens(self, length):
+        start = self._random_start()
+        current = list(start) if isinstance(start, tuple) else [start]
+        # Only the last n-1 tokens condition the next one
+        window = deque(current, maxlen=max(self.n - 1, 1))
+        produced = 0
+        try:
+            yield from current
+            for _ in range(length):
+                context = tuple(window) if self.n > 1 else ()
+                if self.smoother is not None:
+                    token = self.smoother.sample(context, self.rng)
+                else:
+                    next_candidates = self._sampler_for(context)
+                    if not next_candidates:
+                        break
+                    token = self._choose_next(next_candidates)
+                window.append(token)
+                produced += 1
+                yield token
+        finally:
+            metrics.count("tokens_generated", produced)
+
+    def _generate_tokens(self, length):
+        return list(self._iter_tokens(length))
 
     def _generate_char_sequence(self, length, seed):
-        if self.n == 0:
-            return ''.join(random.choices(list(self.freq_data.keys()), k=length))
-        start = random.choice(list(self.freq_data.keys()))
-        if isinstance(start, tuple):
-            current = list(start)
-        else:
-            current = [start]
-
-        output = current.copy()
-        for _ in range(length):
-            context = tuple(output[-(self.n - 1):]) if self.n > 1 else output[-1]
-            next_candidates = {k[-1]: v for k, v in self.freq_data.items()
-                               if (self.n == 1 and k == context) or
-                                  (self.n > 1 and k[:-1] == context)}
-            if not next_candidates:
-                break
-            next_token = self._choose_next(next_candidates)
-            output.append(next_token)
-        return ''.join(output)
+        return ''.join(self._generate_tokens(length))
 
     def _generate_word_sequence(self, length, seed):
-        words = list(self.freq_data.keys())
-        start = random.choice(words)
-        if isinstance(start, tuple):
-            current = list(start)
-        else:
-            current = [start]
-        output = current.copy()
-
-        for _ in range(length):
-            context = tuple(output[-(self.n - 1):]) if self.n > 1 else output[-1]
-            next_candidates = {k[-1]: v for k, v in self.freq_data.items()
-                               if (self.n == 1 and k == context) or
-                                  (self.n > 1 and k[:-1] == context)}
-            if not next_candidates:
+        return " ".join(self._generate_tokens(length))
+
+    def _id_model(self):
+        # Batched generation needs the integer-id arrays; JSON- and trie-backed generators build them once
+        if self.model is None:
+            freq_data = self.freq_data if self.trie is None else self.trie.frequencies(self.n)
+            self.model = NgramModel.from_frequencies(freq_data, self.ngram_type)
+        return self.model
+
+    def generate_batch(self, n_samples, length=100, seed=None, as_ids=False):
+        """
+        Generate n_samples sequences at once, advancing all of them per step.
+
+        Each step packs every sample's context, finds its row block with one
+        searchsorted over the context keys and samples all successors with a
+        second searchsorted over the global cumulative counts.
+
+        Returns a list of strings, or with as_ids=True an int64 matrix of
+        vocabulary ids (n_samples x (order + length)) padded with -1 where a
+        sample hit an unseen context. Batches sample the raw counts; smoothing
+        applies to generate() only.
+        """
+        import numpy as np
+
+        model = self._id_model()
+        rng = np.random.default_rng(seed)
+        n = model.order
+        cum = model.cum_counts
+        offsets = model.offsets
+        vocab_size = len(model.vocab)
+
+        out = np.full((n_samples, n + length), -1, dtype=np.int64)
+        out[:, :n] = model.ngrams[rng.integers(0, len(model), size=n_samples)]
+        alive = np.arange(n_samples)
+
+        for pos in range(n, n + length):
+            keys = pack_contexts(out[alive, pos - n + 1:pos], vocab_size)
+            group = np.searchsorted(model.context_keys, keys)
+            group_clipped = np.minimum(group, len(model.context_keys) - 1)
+            seen = model.context_keys[group_clipped] == keys
+            alive, group = alive[seen], group_clipped[seen]
+            if len(alive) == 0:
                 break
-            next_word = self._choose_next(next_candidates)
-            output.append(next_word)
-        return " ".join(output)
 
+            lo = offsets[group].astype(np.int64)
+            hi = offsets[group + 1].astype(np.int64)
+            base = np.where(lo > 0, cum[lo - 1], 0)
+            target = base + rng.integers(0, cum[hi - 1] - base)
+            rows = np.searchsorted(cum, target, side="right")
+            out[alive, pos] = model.ngrams[rows, -1]
+
+        if as_ids:
+            return out
+        sep = "" if self.ngram_type == "char" else " "
+        vocab = model.vocab
+        return [sep.join(vocab[i] for i in row if i >= 0) for row in out.tolist()]
 
 
 if __name__ == "__main__":
@@ -108,9 +273,13 @@ if __name__ == "__main__":
     parser.add_argument("--author", required=True, help="austen | twain | doyle")
     parser.add_argument("--level", required=True, help="char-1 | char-2 | word-3 etc.")
     parser.add_argument("--length", type=int, default=100, help="Number of tokens to generate")
+    parser.add_argument("--smoothing", choices=["none", "kn"], default="none",
+                        help="kn backs off to lower orders so generation never stops early")
     args = parser.parse_args()
 
-    generator = TextGenerator(author=args.author, level=args.level)
-    result = generator.generate(length=args.length)
+    generator = TextGenerator(author=args.author, level=args.level, smoothing=args.smoothing)
     print("\n🪶 Generated Text:\n")
-    print(result)
\ No newline at end of file
+    sep = "" if generator.ngram_type == "char" else " "
+    for i, token in enumerate(generator.iter_generate(length=args.length)):
+        print(token if i == 0 else sep + token, end="", flush=True)
+    print()
\ No newline at end of file
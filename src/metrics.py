@@ -0,0 +1,110 @@
+"""
+metrics.py
+Per-stage timers, counters and optional cProfile dumps for the pipeline
+
+Pipeline code marks its stages and counts what it processed:
+
+    with metrics.stage("normalize"):
+        normalized = pre.normalize_text(cleaned)
+    metrics.count("tokens", len(words))
+
+Both are no-ops until a collector is enabled (shannon_gen.py --metrics /
+--profile), so normal runs pay nothing but a function call. A stage
+records wall time, call count and the process peak RSS when it ended;
+with a profile directory each stage also dumps <stage>.prof (all its
+calls) for pstats or snakeviz.
+"""
+
+import os
+import sys
+import json
+import time
+import resource
+from contextlib import contextmanager, nullcontext
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (also used by benchmarks/bench_suite.py)."""
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+class Metrics:
+    """Collects stage timings and counters for one run."""
+
+    def __init__(self, profile_dir=None):
+        self.profile_dir = profile_dir
+        self.stages = {}  # name -> {"seconds", "calls", "peak_rss_mb"}, in first-run order
+        self.counters = {}
+        self._profilers = {}  # stage -> cProfile.Profile, accumulated over calls
+        self._profiling = False  # cProfile allows one active profiler, so nested stages are not dumped
+        self.start = time.perf_counter()
+        if profile_dir:
+            import cProfile  # only needed when profiling
+            self._new_profiler = cProfile.Profile
+            os.makedirs(profile_dir, exist_ok=True)
+
+    @contextmanager
+    def stage(self, name):
+        profiler = None
+        if self.profile_dir and not self._profiling:
+            if name not in self._profilers:
+                self._profilers[name] = self._new_profiler()
+            profiler = self._profilers[name]
+        if profiler:
+            self._profiling = True
+            profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if profiler:
+                profiler.disable()
+                self._profiling = False
+                profiler.dump_stats(os.path.join(self.profile_dir, f"{name}.prof"))
+            entry = self.stages.setdefault(name, {"seconds": 0.0, "calls": 0})
+            entry["seconds"] += elapsed
+            entry["calls"] += 1
+            entry["peak_rss_mb"] = round(peak_rss_mb(), 1)
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def report(self):
+        return {
+            "total_seconds": time.perf_counter() - self.start,
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "stages": self.stages,
+            "counters": self.counters,
+            "profiles": self.profile_dir,
+        }
+
+    def write(self, path):
+        """Write the JSON report to `path` ("-" prints it)."""
+        text = json.dumps(self.report(), indent=2)
+        if path == "-":
+            print(text)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+
+
+_active = None
+
+
+def enable(profile_dir=None):
+    """Start collecting for this process and return the collector."""
+    global _active
+    _active = Metrics(profile_dir)
+    return _active
+
+
+def stage(name):
+    return _active.stage(name) if _active is not None else nullcontext()
+
+
+def count(name, value=1):
+    if _active is not None:
+        _active.count(name, value)
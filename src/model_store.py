@@ -0,0 +1,365 @@
+"""
+model_store.py
+Compact binary n-gram models loaded with numpy memory maps
+
+A model for one (author, level) is a directory next to the JSON table,
+e.g. data/freq_tables/austen_word_3-gram.model/, holding:
+
+    meta.json         order, ngram type and the vocabulary (id -> token)
+    ngrams.npy        (m, n) token ids, rows sorted by context
+    counts.npy        (m,) count of each row
+    context_keys.npy  int64 (c,) packed context ids, sorted and unique
+    offsets.npy       (c + 1,) row range of each context
+    rank.npy          (m,) rows by descending count, ties in table order (top-k index)
+
+Ids, counts and offsets use the smallest unsigned dtype that fits
+(uint16 ids for vocabularies under 65536 tokens, uint32 counts).
+Quantized models (analyze --prune ...,bits=B) store each count as a code
+into a small table of distinct counts kept in meta.json ("codebook").
+
+The .npy files are memory-mapped, so loading only maps the pages and
+several processes reading the same model share them. Sampling only needs
+successors() and ngram(), which read the files through plain mmap
+memoryviews (map_npy), so `generate` starts without importing numpy; the
+numpy memmaps the other methods use are opened on first access.
+"""
+
+import os
+import re
+import sys
+import json
+import glob
+import mmap
+import struct
+import argparse
+from bisect import bisect_left
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from starter_preprocess import FrequencyAnalyzer
+
+MODEL_SUFFIX = ".model"
+# Heavy-hitter (top-k only) models of approximate orders, kept apart from exact tables
+HEAVY_SUFFIX = ".hh.model"
+ARRAYS = ["ngrams", "counts", "context_keys", "offsets", "rank"]
+MODEL_FILES = ["meta.json"] + [f"{name}.npy" for name in ARRAYS]
+
+# .npy dtypes map_npy reads (as struct format codes)
+NPY_FORMATS = {"|u1": "B", "<u2": "H", "<u4": "I", "<u8": "Q", "<i8": "q"}
+
+
+def model_path_for(json_path):
+    """data/freq_tables/x_word_3-gram.json -> data/freq_tables/x_word_3-gram.model"""
+    return os.path.splitext(json_path)[0] + MODEL_SUFFIX
+
+
+def list_authors(suffix, out_dir="data/freq_tables"):
+    """Sorted authors with an analyze output named <author><suffix>, e.g. suffix="_word_3-gram.model"."""
+    return sorted(os.path.basename(p)[:-len(suffix)] for p in glob.glob(os.path.join(out_dir, f"*{suffix}")))
+
+
+def heavy_model_path_for(json_path):
+    """data/freq_tables/x_word_5-gram.json -> data/freq_tables/x_word_5-gram.hh.model"""
+    return os.path.splitext(json_path)[0] + HEAVY_SUFFIX
+
+
+def smallest_uint(max_value, dtypes=None):
+    import numpy as np
+    for dtype in dtypes or (np.uint16, np.uint32):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return np.uint64
+
+
+def pack_contexts(ids, vocab_size):
+    """Pack rows of context ids (k columns) into one int64 key per row."""
+    import numpy as np
+    ids = np.asarray(ids, dtype=np.int64)
+    keys = np.zeros(ids.shape[0], dtype=np.int64)
+    for col in range(ids.shape[1]):
+        keys = keys * vocab_size + ids[:, col]
+    return keys
+
+
+def top_indices(counts, k):
+    """Indices of the k largest counts, largest first and ties by index, via argpartition."""
+    import numpy as np
+    counts = -np.asarray(counts, dtype=np.int64)
+    top = np.arange(len(counts)) if k >= len(counts) else np.argpartition(counts, k - 1)[:k]
+    return top[np.lexsort((top, counts[top]))]
+
+
+def build_arrays(frequencies):
+    """
+    Turn a frequency dict (the same shape save_frequencies takes: tuple
+    keys for n > 1, plain strings for unigrams) into (vocab, arrays).
+    """
+    import numpy as np
+    keys = list(frequencies.keys())
+    if not keys:
+        raise ValueError("Cannot build a model from an empty frequency table")
+    rows = [k if isinstance(k, tuple) else (k,) for k in keys]
+
+    vocab = sorted({tok for row in rows for tok in row})
+    token_ids = {tok: i for i, tok in enumerate(vocab)}
+    ngrams = np.array([[token_ids[tok] for tok in row] for row in rows], dtype=np.int64)
+    counts = np.fromiter(frequencies.values(), dtype=np.int64, count=len(rows))
+    return vocab, arrays_from_ids(ngrams, counts, len(vocab))
+
+
+def arrays_from_ids(ngrams, counts, vocab_size):
+    """Model arrays for an (m, n) matrix of token ids and their counts."""
+    import numpy as np
+    order = ngrams.shape[1]
+    if vocab_size ** max(order - 1, 1) >= 2 ** 63:
+        raise ValueError(f"Vocabulary of {vocab_size} is too large to pack {order - 1}-token contexts")
+    ngrams = np.asarray(ngrams).astype(smallest_uint(vocab_size - 1))
+    counts = np.asarray(counts).astype(smallest_uint(max(counts.max(), 1 << 16)))
+
+    # Sort rows lexicographically so each context is one contiguous block
+    sort_idx = np.lexsort(ngrams.T[::-1])
+    ngrams = ngrams[sort_idx]
+    counts = counts[sort_idx]
+
+    row_keys = pack_contexts(ngrams[:, :-1], vocab_size)
+    context_keys, starts = np.unique(row_keys, return_index=True)
+    row_dtype = smallest_uint(max(len(ngrams), 1 << 16))
+    offsets = np.append(starts, len(ngrams)).astype(row_dtype)
+
+    # Rank index: the order sorted(items, key=count, reverse=True) gives over the input rows
+    rank = np.lexsort((sort_idx, -counts.astype(np.int64))).astype(row_dtype)
+    return dict(zip(ARRAYS, [ngrams, counts, context_keys, offsets, rank]))
+
+
+def write_model(path, vocab, arrays, ngram_type, codebook=None):
+    """Write vocab and model arrays as a binary model directory (counts as codes when a codebook is given)."""
+    import numpy as np
+    os.makedirs(path, exist_ok=True)
+    meta = {"order": arrays["ngrams"].shape[1], "ngram_type": ngram_type, "vocab": vocab}
+    if codebook is not None:
+        meta["codebook"] = [int(c) for c in codebook]
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    for name, arr in arrays.items():
+        np.save(os.path.join(path, f"{name}.npy"), arr)
+
+
+def save_model(frequencies, path, ngram_type, quantized=False):
+    """
+    Write a frequency dict as a binary model directory. With quantized=True
+    (counts already reduced to a few distinct values) each count is stored
+    as an index into the table of distinct counts.
+    """
+    import numpy as np
+    vocab, arrays = build_arrays(frequencies)
+    codebook = None
+    if quantized:
+        codebook, codes = np.unique(arrays["counts"], return_inverse=True)
+        arrays["counts"] = codes.ravel().astype(smallest_uint(len(codebook) - 1, (np.uint8, np.uint16, np.uint32)))
+    write_model(path, vocab, arrays, ngram_type, codebook)
+
+
+def map_npy(path):
+    """
+    Flat memoryview over the data of a C-order .npy file, memory-mapped
+    without numpy, or None for dtypes (or byte orders) it cannot read.
+    """
+    with open(path, "rb") as f:
+        version = f.read(8)[6]  # b"\x93NUMPY" + major + minor
+        size_format = "<H" if version == 1 else "<I"
+        header = f.read(struct.unpack(size_format, f.read(struct.calcsize(size_format)))[0]).decode("latin1")
+        descr = re.search(r"'descr': '([^']+)'", header)
+        shape = re.search(r"'shape': \(([^)]*)\)", header)
+        fmt = NPY_FORMATS.get(descr.group(1)) if descr else None
+        if fmt is None or shape is None or "'fortran_order': False" not in header or sys.byteorder != "little":
+            return None
+        length = 1
+        for dim in shape.group(1).split(","):
+            length *= int(dim) if dim.strip() else 1
+        offset = f.tell()
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(mapped)[offset:offset + length * struct.calcsize(fmt)].cast(fmt)
+
+
+class NgramModel:
+    """Read-only, memory-mapped view of a binary n-gram model."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.codebook = meta.get("codebook")
+        self._init(meta["ngram_type"], meta["vocab"], {})
+        self.order = meta["order"]
+
+    @classmethod
+    def from_frequencies(cls, frequencies, ngram_type):
+        """Build an in-memory model straight from a frequency dict."""
+        model = cls.__new__(cls)
+        model.path = None
+        model.codebook = None
+        vocab, arrays = build_arrays(frequencies)
+        model._init(ngram_type, vocab, arrays)
+        return model
+
+    def _init(self, ngram_type, vocab, arrays):
+        self.ngram_type = ngram_type
+        self.vocab = vocab
+        self.token_ids = {tok: i for i, tok in enumerate(vocab)}
+        for name, arr in arrays.items():
+            setattr(self, name, arr)
+        if arrays:
+            self.order = self.ngrams.shape[1]
+        self._flat = {}
+        self._cum_counts = None
+
+    def __getattr__(self, name):
+        # numpy memmaps of a saved model, opened when a method first needs one
+        if name not in ARRAYS or self.__dict__.get("path") is None:
+            raise AttributeError(name)
+        import numpy as np
+        array_path = os.path.join(self.path, f"{name}.npy")
+        arr = None  # models written before the rank index have none; top_k then uses argpartition
+        if os.path.exists(array_path):
+            arr = np.load(array_path, mmap_mode="r")
+            if name == "counts" and self.codebook is not None:
+                arr = np.asarray(self.codebook, dtype=np.uint32)[arr]
+        setattr(self, name, arr)
+        return arr
+
+    def _view(self, name):
+        # Flat row-major view of one array (counts as stored, i.e. codes when quantized):
+        # an mmap memoryview for saved models, so sampling never needs numpy
+        view = self._flat.get(name)
+        if view is None:
+            view = map_npy(os.path.join(self.path, f"{name}.npy")) if self.path else None
+            if view is None:
+                arr = getattr(self, name)
+                if self.path and name == "counts" and self.codebook is not None:
+                    import numpy as np
+                    arr = np.load(os.path.join(self.path, "counts.npy"), mmap_mode="r")
+                view = arr.reshape(-1)
+            self._flat[name] = view
+        return view
+
+    @property
+    def cum_counts(self):
+        """Running total of counts over all rows (int64), built on first use."""
+        if self._cum_counts is None:
+            import numpy as np
+            self._cum_counts = np.cumsum(self.counts, dtype=np.int64)
+        return self._cum_counts
+
+    def __len__(self):
+        return len(self._view("counts"))
+
+    @property
+    def nbytes(self):
+        """Bytes of the row, count, context key and offset arrays as stored."""
+        return sum(self._view(name).nbytes for name in ("ngrams", "counts", "context_keys", "offsets"))
+
+    def context_key(self, context):
+        """Packed key for a tuple of context tokens, or None if a token is unknown."""
+        key = 0
+        for tok in context:
+            tok_id = self.token_ids.get(tok)
+            if tok_id is None:
+                return None
+            key = key * len(self.vocab) + tok_id
+        return key
+
+    def context_range(self, context):
+        """(start, end) row range for the context, or None if it was never seen."""
+        key = self.context_key(context)
+        if key is None:
+            return None
+        context_keys = self._view("context_keys")
+        i = bisect_left(context_keys, key)
+        if i == len(context_keys) or context_keys[i] != key:
+            return None
+        offsets = self._view("offsets")
+        return int(offsets[i]), int(offsets[i + 1])
+
+    def successors(self, context):
+        """(successor tokens, counts) for a context tuple, or None if unseen."""
+        rows = self.context_range(context)
+        if rows is None:
+            return None
+        start, end = rows
+        n = self.order
+        tokens = [self.vocab[i] for i in self._view("ngrams")[start * n + n - 1:end * n:n].tolist()]
+        counts = self._view("counts")[start:end].tolist()
+        if self.codebook is not None:
+            counts = [self.codebook[c] for c in counts]
+        return tokens, counts
+
+    def _bisect_rows(self, ids, right):
+        # First row whose leading len(ids) tokens are > ids (right) or >= ids (left)
+        lo, hi, p = 0, len(self.ngrams), len(ids)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            row = self.ngrams[mid, :p].tolist()
+            if row < ids or (right and row == ids):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def prefix_range(self, prefix):
+        """(start, end) rows of the n-grams starting with `prefix`, found by binary search over the sorted rows."""
+        ids = [self.token_ids.get(tok) for tok in prefix]
+        if None in ids or len(ids) > self.order:
+            return None
+        if len(ids) == self.order - 1:
+            return self.context_range(prefix)
+        start, end = self._bisect_rows(ids, right=False), self._bisect_rows(ids, right=True)
+        return (start, end) if start < end else None
+
+    def top_k(self, k=10, prefix=()):
+        """
+        The k most frequent n-grams (optionally only those starting with
+        `prefix`) as (ngram, count) pairs, without decoding the whole table.
+
+        The unfiltered query reads the first k entries of the rank index;
+        a prefix narrows the rows to one contiguous block and selects
+        within it with argpartition.
+        """
+        if prefix:
+            rows = self.prefix_range(tuple(prefix))
+            if rows is None:
+                return []
+            start, end = rows
+        else:
+            start, end = 0, len(self)
+        if not prefix and self.rank is not None:
+            import numpy as np
+            top = np.asarray(self.rank[:k], dtype=np.int64)
+        else:
+            top = start + top_indices(self.counts[start:end], k)
+        return [(self.ngram(row), int(self.counts[row])) for row in top.tolist()]
+
+    def ngram(self, row):
+        """Token tuple for one row (a plain string for unigram models)."""
+        n = self.order
+        tokens = tuple(self.vocab[i] for i in self._view("ngrams")[row * n:(row + 1) * n].tolist())
+        return tokens if self.order > 1 else tokens[0]
+
+    def to_frequencies(self):
+        """Decode back to the dict format load_frequencies returns."""
+        return {self.ngram(row): count for row, count in enumerate(self.counts.tolist())}
+
+
+def convert_json(json_path, out_path=None):
+    """Convert one JSON frequency table to a binary model and return its path."""
+    out_path = out_path or model_path_for(json_path)
+    ngram_type = "char" if "_char_" in os.path.basename(json_path) else "word"
+    frequencies = FrequencyAnalyzer().load_frequencies(json_path)
+    save_model(frequencies, out_path, ngram_type)
+    return out_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert JSON frequency tables to binary models.")
+    parser.add_argument("tables", nargs="*", help="JSON tables (default: data/freq_tables/*-gram.json)")
+    args = parser.parse_args()
+
+    for json_path in args.tables or sorted(glob.glob("data/freq_tables/*-gram.json")):
+        print(f" {json_path} → {convert_json(json_path)}")
@@ -0,0 +1,215 @@
+"""
+ngram_trie.py
+Array-based count trie holding every n-gram order up to N
+
+Level k of the trie holds one node per distinct k-gram, sorted by parent
+node and then token id, in three flat arrays:
+
+    tokens[k]    token id of the node's last token
+    counts[k]    occurrences of the k-gram in the corpus
+    children[k]  (len + 1) offsets: node i's children are
+                 level k+1 nodes children[k][i] .. children[k][i+1]
+
+Finding a prefix walks one level per token with a binary search inside
+the current child range, so successors/count/top_k cost O(len(prefix)).
+Saved tries are directories of .npy files opened with mmap_mode="r".
+"""
+
+import os
+import sys
+import json
+import heapq
+import argparse
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.model_store import smallest_uint, top_indices
+
+TRIE_SUFFIX = ".trie"
+
+
+def trie_path_for(author, ngram_type, out_dir="data/freq_tables"):
+    return os.path.join(out_dir, f"{author}_{ngram_type}{TRIE_SUFFIX}")
+
+
+def trie_files(max_order):
+    """Names of the files a saved trie of this order consists of."""
+    return ["meta.json"] + [f"{name}_{k}.npy" for k in range(1, max_order + 1)
+                            for name in ("tokens", "counts", "children")]
+
+
+class NgramTrie:
+    """Counts of all n-grams of order 1..max_order over one token stream."""
+
+    def __init__(self, vocab, tokens, counts, children):
+        self.vocab = vocab
+        self.token_ids = {tok: i for i, tok in enumerate(vocab)}
+        # Index 0 is the root level: it has no tokens, one node, and its children are level 1
+        self.tokens = [None] + list(tokens)
+        self.counts = [None] + list(counts)
+        self.children = [np.array([0, len(tokens[0]) if tokens else 0], dtype=np.int64)] + list(children)
+        self.max_order = len(tokens)
+        self.total = int(np.sum(self.counts[1], dtype=np.int64)) if tokens else 0
+
+    @classmethod
+    def build(cls, ids, vocab, max_order):
+        """
+        Build from an integer token array (e.g. TextPreprocessor.encode_tokens).
+
+        Each level is one np.unique over (parent node * V + next token) keys
+        for every corpus position, so the result is sorted by parent and token.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        size = max(len(vocab), 1)
+        tokens, counts, children = [], [], []
+
+        nodes = np.zeros(len(ids), dtype=np.int64)  # node of the window starting at each position
+        parents = None
+        for k in range(1, max_order + 1):
+            m = len(ids) - k + 1
+            if m <= 0:
+                break
+            keys = nodes[:m] * size + ids[k - 1:k - 1 + m]
+            uniq, inverse, level_counts = np.unique(keys, return_inverse=True, return_counts=True)
+            if parents is not None:
+                # Offsets of each previous-level node's children in this level
+                children.append(np.searchsorted(uniq // size, np.arange(len(parents) + 1)))
+            parents = uniq
+            nodes = inverse.ravel()
+            tokens.append((uniq % size).astype(smallest_uint(size)))
+            counts.append(level_counts.astype(smallest_uint(max(level_counts.max(), 1 << 16))))
+        if parents is not None:
+            children.append(np.full(len(parents) + 1, 0, dtype=np.int64))  # deepest level is a leaf
+        children = [c.astype(smallest_uint(max(int(c[-1]), 1 << 16))) for c in children]
+        return cls(list(vocab), tokens, counts, children)
+
+    def __len__(self):
+        return sum(len(t) for t in self.tokens[1:])
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for level in (self.tokens, self.counts, self.children)
+                   for a in level if a is not None)
+
+    def _find(self, prefix):
+        # (level, node) of the prefix, or None; the root is (0, 0)
+        level, node = 0, 0
+        for tok in prefix:
+            tok_id = self.token_ids.get(tok)
+            if tok_id is None or level == self.max_order:
+                return None
+            lo, hi = int(self.children[level][node]), int(self.children[level][node + 1])
+            pos = lo + int(np.searchsorted(self.tokens[level + 1][lo:hi], tok_id))
+            if pos == hi or self.tokens[level + 1][pos] != tok_id:
+                return None
+            level, node = level + 1, pos
+        return level, node
+
+    def count(self, ngram):
+        """Occurrences of an n-gram (tuple of tokens, or one token); 0 if unseen."""
+        if isinstance(ngram, str):
+            ngram = (ngram,)
+        found = self._find(ngram)
+        if found is None:
+            return 0
+        level, node = found
+        return self.total if level == 0 else int(self.counts[level][node])
+
+    def successors(self, prefix):
+        """(next tokens, counts) after `prefix`, or None if the prefix is unseen or at max order."""
+        found = self._find(prefix)
+        if found is None or found[0] == self.max_order:
+            return None
+        level, node = found
+        lo, hi = int(self.children[level][node]), int(self.children[level][node + 1])
+        if lo == hi:
+            return None
+        tokens = [self.vocab[i] for i in self.tokens[level + 1][lo:hi].tolist()]
+        return tokens, self.counts[level + 1][lo:hi].tolist()
+
+    def top_k(self, k=10, prefix=()):
+        """The k most frequent successors of `prefix` as (token, count) pairs."""
+        successors = self.successors(prefix)
+        if successors is None:
+            return []
+        return heapq.nlargest(k, zip(*successors), key=lambda item: item[1])
+
+    def top_ngrams(self, order, k=10, prefix=()):
+        """
+        The k most frequent n-grams of one order starting with `prefix`, as
+        (token tuple, count) pairs. Descendants of a node at any depth are
+        one contiguous block, so only that block's counts are examined.
+        """
+        found = self._find(prefix)
+        if found is None or not len(prefix) <= order <= self.max_order:
+            return []
+        level, node = found
+        lo, hi = node, node + 1
+        for depth in range(level, order):
+            lo, hi = int(self.children[depth][lo]), int(self.children[depth][hi])
+        top = lo + top_indices(self.counts[order][lo:hi], k)
+        return [(self.ngram_at(order, i), int(self.counts[order][i])) for i in top.tolist()]
+
+    def ngram_at(self, level, node):
+        """Token tuple of a node, found by walking parent offsets up to the root."""
+        ids = []
+        while level > 0:
+            ids.append(int(self.tokens[level][node]))
+            node = int(np.searchsorted(self.children[level - 1], node, side="right")) - 1
+            level -= 1
+        return tuple(self.vocab[i] for i in reversed(ids))
+
+    def level_ngrams(self, level):
+        """(ids, counts) of every n-gram of one order: an int64 (m, level) id matrix in trie order."""
+        m = len(self.tokens[level])
+        ids = np.empty((m, level), dtype=np.int64)
+        nodes = np.arange(m)
+        for k in range(level, 0, -1):
+            ids[:, k - 1] = self.tokens[k][nodes]
+            nodes = np.searchsorted(self.children[k - 1], nodes, side="right") - 1
+        return ids, np.asarray(self.counts[level])
+
+    def frequencies(self, level):
+        """One order as the dict format load_frequencies returns (string keys for unigrams)."""
+        ids, counts = self.level_ngrams(level)
+        vocab = self.vocab
+        if level == 1:
+            return {vocab[row[0]]: c for row, c in zip(ids.tolist(), counts.tolist())}
+        return {tuple(vocab[i] for i in row): c for row, c in zip(ids.tolist(), counts.tolist())}
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        for k in range(1, self.max_order + 1):
+            np.save(os.path.join(path, f"tokens_{k}.npy"), self.tokens[k])
+            np.save(os.path.join(path, f"counts_{k}.npy"), self.counts[k])
+            np.save(os.path.join(path, f"children_{k}.npy"), self.children[k])
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"max_order": self.max_order, "vocab": self.vocab}, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path):
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        levels = range(1, meta["max_order"] + 1)
+
+        def arrays(name):
+            return [np.load(os.path.join(path, f"{name}_{k}.npy"), mmap_mode="r") for k in levels]
+
+        return cls(meta["vocab"], arrays("tokens"), arrays("counts"), arrays("children"))
+
+
+if __name__ == "__main__":
+    from src.corpus_store import load_corpus
+
+    parser = argparse.ArgumentParser(description="Build n-gram tries from the corpus saved by analyze.")
+    parser.add_argument("--author", required=True, help="austen | twain | doyle")
+    parser.add_argument("--max-order", type=int, default=5, help="Highest n-gram order to store")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.author)
+    if corpus is None:
+        raise FileNotFoundError(f"No corpus for {args.author}; run analyze first")
+    for ngram_type, ids, vocab in [("char", corpus.char_ids, corpus.char_vocab),
+                                   ("word", corpus.word_ids, corpus.word_vocab)]:
+        path = trie_path_for(args.author, ngram_type)
+        NgramTrie.build(ids, vocab, args.max_order).save(path)
+        print(f" Saved {ngram_type} trie (orders 1-{args.max_order}) → {path}")
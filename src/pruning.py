@@ -0,0 +1,294 @@
+"""
+pruning.py
+Pruning and count quantization of n-gram tables
+
+Most word 3-grams occur once; they dominate table size, load time and the
+generator's dict memory. A pruning setting combines any of:
+
+    min_count=K   drop n-grams seen fewer than K times
+    top_k=K       keep only the K most frequent successors of each context
+    entropy=T     Stolcke relative-entropy pruning: drop an n-gram when backing
+                  off to the (n-1)-gram instead raises the model's relative
+                  entropy by less than T (natural-log units, e.g. 1e-7)
+    bits=B        log-quantize the remaining counts to at most 2^B distinct
+                  values; binary models then store a 1- or 2-byte code per row
+
+written as a comma-separated spec, e.g. "min_count=2,bits=8". Orders >= 2
+are pruned and quantized; unigram tables stay exact. Criteria are computed
+on the unpruned tables, so one order's pruning does not change another's.
+
+analyze applies a setting with --prune; `python src/pruning.py` reports
+size, load time and held-out perplexity for a list of settings.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from starter_preprocess import FrequencyAnalyzer
+from src.model_store import NgramModel, save_model, model_path_for, pack_contexts, smallest_uint
+from src.ngram_trie import NgramTrie
+from src.smoothing import discount
+
+SETTING_TYPES = {"min_count": int, "top_k": int, "entropy": float, "bits": int}
+
+DEFAULT_SETTINGS = ["none", "min_count=2", "min_count=3", "top_k=10", "entropy=1e-7",
+                    "entropy=1e-6", "bits=8", "min_count=2,bits=8"]
+
+
+def parse_setting(spec):
+    """'min_count=2,bits=8' -> {"min_count": 2, "bits": 8}; 'none' or '' -> {}."""
+    setting = {}
+    if spec in (None, "", "none"):
+        return setting
+    for part in spec.split(","):
+        name, sep, value = part.partition("=")
+        name = name.strip()
+        if not sep or name not in SETTING_TYPES:
+            raise ValueError(f"Bad pruning option {part!r}; expected one of "
+                             f"{', '.join(f'{k}=...' for k in SETTING_TYPES)}")
+        setting[name] = SETTING_TYPES[name](value)
+        if setting[name] <= 0:
+            raise ValueError(f"Pruning option {name} must be positive")
+    if "bits" in setting and setting["bits"] > 16:
+        raise ValueError("bits must be at most 16")
+    return setting
+
+
+def format_setting(setting):
+    return ",".join(f"{k}={v}" for k, v in setting.items()) or "none"
+
+
+def context_ranks(ngrams, counts, vocab_size):
+    """Rank of each row among the successors of its context (0 = most frequent, ties by row)."""
+    ctx = pack_contexts(ngrams[:, :-1], vocab_size)
+    rows = np.arange(len(counts))
+    order = np.lexsort((rows, -np.asarray(counts, dtype=np.int64), ctx))
+    sorted_ctx = ctx[order]
+    starts = np.flatnonzero(np.r_[True, sorted_ctx[1:] != sorted_ctx[:-1]])
+    group_start = np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+    ranks = np.empty(len(order), dtype=np.int64)
+    ranks[order] = rows - group_start
+    return ranks
+
+
+def _lookup(keys, table_keys, values):
+    # values[i] of the table row whose key equals keys[j]; every key must be present
+    order = np.argsort(table_keys, kind="stable")
+    pos = np.searchsorted(table_keys[order], keys)
+    return values[order[pos]]
+
+
+def stolcke_deltas(ngrams, counts, lower_ngrams, lower_counts, vocab_size):
+    """
+    Relative-entropy increase from pruning each n-gram alone (Stolcke 1998).
+
+    The model is a back-off model: absolute discounting (D from the
+    count-of-counts) on the n-grams, backing off to the maximum-likelihood
+    (n-1)-gram distribution. Removing (h, w) moves P(w | h) into the
+    back-off mass of h and renormalizes the back-off weight alpha(h):
+
+        delta = -P(h) * [P(w|h) (log P'(w|h) - log P(w|h)) + beta(h) (log alpha'(h) - log alpha(h))]
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    lower_counts = np.asarray(lower_counts, dtype=np.float64)
+
+    ctx, inverse = np.unique(pack_contexts(ngrams[:, :-1], vocab_size), return_inverse=True)
+    inverse = inverse.ravel()
+    ctx_total = np.bincount(inverse, weights=counts)
+    ctx_types = np.bincount(inverse)
+    d = discount(counts)
+    p = (counts - d) / ctx_total[inverse]
+    beta = d * ctx_types / ctx_total
+
+    # Lower-order probability of each n-gram's suffix: c(h', w) / c(h')
+    lower_ctx, lower_inverse = np.unique(pack_contexts(lower_ngrams[:, :-1], vocab_size), return_inverse=True)
+    lower_total = np.bincount(lower_inverse.ravel(), weights=lower_counts)
+    suffix_count = _lookup(pack_contexts(ngrams[:, 1:], vocab_size),
+                           pack_contexts(lower_ngrams, vocab_size), lower_counts)
+    suffix_total = lower_total[np.searchsorted(lower_ctx, pack_contexts(ngrams[:, 1:-1], vocab_size))]
+    p_low = suffix_count / suffix_total
+
+    # Back-off weights before and after removing the n-gram
+    unseen_low = np.maximum(1.0 - np.bincount(inverse, weights=p_low), 1e-12)
+    alpha = beta / unseen_low
+    alpha_new = (beta[inverse] + p) / (unseen_low[inverse] + p_low)
+    p_h = ctx_total[inverse] / counts.sum()
+    return -p_h * (p * (np.log(alpha_new * p_low) - np.log(p))
+                   + beta[inverse] * (np.log(alpha_new) - np.log(alpha[inverse])))
+
+
+def keep_mask(ngrams, counts, setting, lower=None, vocab_size=None):
+    """
+    Boolean mask of the rows a setting keeps. ngrams is an (m, n) id matrix;
+    lower = (ids, counts) of the (n-1)-grams in the same id space, needed for entropy.
+    """
+    counts = np.asarray(counts)
+    if vocab_size is None:
+        vocab_size = int(ngrams.max()) + 1 if len(ngrams) else 1
+    keep = np.ones(len(counts), dtype=bool)
+    if setting.get("min_count"):
+        keep &= counts >= setting["min_count"]
+    if setting.get("top_k"):
+        keep &= context_ranks(ngrams, counts, vocab_size) < setting["top_k"]
+    if setting.get("entropy"):
+        if lower is None:
+            raise ValueError("Entropy pruning needs the (n-1)-gram table")
+        keep &= stolcke_deltas(ngrams, counts, lower[0], lower[1], vocab_size) >= setting["entropy"]
+    return keep
+
+
+def quantize_counts(counts, bits):
+    """
+    Log-quantize counts to at most 2^bits values: bins are log-spaced
+    between 1 and the largest count, and each count becomes the rounded
+    mean of its bin (small counts, with a bin each, stay exact).
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    if not len(counts):
+        return counts
+    edges = np.unique(np.floor(np.geomspace(1, counts.max() + 1, (1 << bits) + 1)).astype(np.int64))
+    bins = np.searchsorted(edges, counts, side="right") - 1
+    means = np.bincount(bins, weights=counts) / np.maximum(np.bincount(bins), 1)
+    return np.maximum(np.rint(means), 1).astype(np.int64)[bins]
+
+
+def prune_frequencies(frequencies, setting, orders=None):
+    """
+    Apply a setting to frequency dicts of several orders ({n: dict} as
+    calculate_ngrams_multi returns them), to `orders` (default: every order
+    >= 2). Returns new dicts in the same key order; other orders are returned as is.
+    """
+    if not setting:
+        return frequencies
+    token_ids = {}
+    ids = {}
+    for n, freqs in frequencies.items():
+        rows = [k if isinstance(k, tuple) else (k,) for k in freqs]
+        ids[n] = np.array([[token_ids.setdefault(tok, len(token_ids)) for tok in row] for row in rows],
+                          dtype=np.int64).reshape(len(rows), n)
+    pruned = {}
+    for n, freqs in frequencies.items():
+        if n < 2 or (orders is not None and n not in orders):
+            pruned[n] = freqs
+            continue
+        counts = np.fromiter(freqs.values(), dtype=np.int64, count=len(freqs))
+        lower = (ids[n - 1], np.fromiter(frequencies[n - 1].values(), dtype=np.int64)) \
+            if n - 1 in frequencies else None
+        keep = keep_mask(ids[n], counts, setting, lower, len(token_ids))
+        if setting.get("bits"):
+            counts = quantize_counts(counts, setting["bits"])
+        pruned[n] = {key: count for key, count, kept in zip(freqs, counts.tolist(), keep.tolist()) if kept}
+    return pruned
+
+
+def prune_trie(trie, n, setting):
+    """Orders 1..n of an NgramTrie with order n pruned (and quantized) by the setting."""
+    ids, counts = trie.level_ngrams(n)
+    lower = trie.level_ngrams(n - 1) if n > 1 else None
+    keep = keep_mask(ids, counts, setting, lower, len(trie.vocab)) if n > 1 else np.ones(len(counts), bool)
+    counts = np.asarray(counts, dtype=np.int64)
+    if setting.get("bits") and n > 1:
+        counts = quantize_counts(counts, setting["bits"])
+    # Children offsets of order n-1 into the kept rows
+    kept_before = np.r_[0, np.cumsum(keep)]
+    offsets = kept_before[np.asarray(trie.children[n - 1], dtype=np.int64)]
+    tokens = trie.tokens[1:n] + [trie.tokens[n][keep]]
+    level_counts = trie.counts[1:n] + [counts[keep].astype(smallest_uint(max(counts.max(), 1 << 16)))]
+    children = trie.children[1:n - 1] + [offsets, np.zeros(int(keep.sum()) + 1, dtype=np.int64)]
+    return NgramTrie(trie.vocab, tokens, level_counts, children)
+
+
+def _best_time(fn, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _dir_bytes(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def prune_report(author, level="word-3", settings=DEFAULT_SETTINGS, holdout=0.1):
+    """
+    One row per setting: n-grams kept, JSON and binary model size and load
+    time of the full-book table, and perplexity of the held-out last
+    `holdout` of the book under a Kneser-Ney model trained on the rest with
+    its top order pruned the same way. Lower orders keep their unpruned
+    continuation counts, as in the .kn tables analyze --prune writes.
+
+    The full tables are counted from the saved corpus rather than read from
+    data/freq_tables, which are already pruned after analyze --prune.
+    """
+    from src.corpus_store import load_corpus
+    from src.scoring import NgramScorer
+
+    ngram_type, n = level.split("-")
+    n = int(n)
+    if n < 2:
+        raise ValueError("Pruning applies to orders of 2 and above")
+    fa = FrequencyAnalyzer()
+    corpus = load_corpus(author)
+    if corpus is None:
+        raise FileNotFoundError(f"No corpus for {author}; run analyze first")
+    ids = np.asarray(corpus.char_ids if ngram_type == "char" else corpus.word_ids, dtype=np.int64)
+    vocab = corpus.char_vocab if ngram_type == "char" else corpus.word_vocab
+    full = NgramTrie.build(ids, vocab, n)
+    tables = {k: full.frequencies(k) for k in (n - 1, n)}
+    cut = int(len(ids) * (1 - holdout))
+    train = NgramTrie.build(ids[:cut], vocab, n)
+
+    rows = []
+    tmp = tempfile.mkdtemp(prefix="prune_")
+    try:
+        for spec in settings:
+            setting = parse_setting(spec)
+            freqs = prune_frequencies(tables, setting, orders=[n])[n]
+            json_path = os.path.join(tmp, f"{author}_{ngram_type}_{n}-gram.json")
+            fa.save_frequencies(freqs, json_path)
+            save_model(freqs, model_path_for(json_path), ngram_type, quantized=bool(setting.get("bits")))
+            scorer = NgramScorer(author, level, trie=train, top=prune_trie(train, n, setting))
+            perplexity = scorer.perplexity(ids[cut:])
+            rows.append({
+                "setting": format_setting(setting), "ngrams": len(freqs),
+                "json_bytes": os.path.getsize(json_path),
+                "model_bytes": _dir_bytes(model_path_for(json_path)),
+                "json_load_s": _best_time(lambda: fa.load_frequencies(json_path)),
+                "model_load_s": _best_time(lambda: NgramModel(model_path_for(json_path))),
+                "perplexity": perplexity,
+            })
+    finally:
+        shutil.rmtree(tmp)
+    base = rows[0]["perplexity"]
+    for row in rows:
+        row["perplexity_change"] = row["perplexity"] / base - 1
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Size, load time and perplexity of pruned n-gram tables.")
+    parser.add_argument("--author", required=True, help="austen | twain | doyle")
+    parser.add_argument("--level", default="word-3", help="char-3 | word-2 | word-3 etc.")
+    parser.add_argument("--settings", nargs="*", default=DEFAULT_SETTINGS,
+                        help="Pruning specs, e.g. none min_count=2 entropy=1e-7 bits=8 (first is the baseline)")
+    parser.add_argument("--json", action="store_true", help="Print the rows as JSON")
+    args = parser.parse_args()
+
+    rows = prune_report(args.author, args.level, args.settings)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print(f"{'setting':<22}{'n-grams':>9}{'JSON MB':>9}{'model MB':>10}{'JSON ms':>9}{'model ms':>10}"
+              f"{'perplexity':>12}{'change':>9}")
+        for r in rows:
+            print(f"{r['setting']:<22}{r['ngrams']:>9}{r['json_bytes'] / 2**20:>9.2f}{r['model_bytes'] / 2**20:>10.2f}"
+                  f"{r['json_load_s'] * 1e3:>9.1f}{r['model_load_s'] * 1e3:>10.2f}"
+                  f"{r['perplexity']:>12.1f}{r['perplexity_change']:>+9.1%}")
@@ -0,0 +1,35 @@
+"""
+sampler.py
+Precomputed weighted samplers for n-gram successor distributions
+"""
+
+import random
+from bisect import bisect_right
+from itertools import accumulate
+
+
+class CumulativeSampler:
+    """
+    Weighted choice over a fixed list of tokens.
+
+    Cumulative weights are computed once, so each draw is a single
+    bisect (O(log k)) instead of a linear walk over the candidates.
+    """
+
+    __slots__ = ("tokens", "cum_weights", "total")
+
+    def __init__(self, tokens, weights):
+        self.tokens = list(tokens)
+        self.cum_weights = list(accumulate(weights))
+        if not self.tokens or self.cum_weights[-1] <= 0:
+            raise ValueError("Sampler needs at least one token with positive weight")
+        self.total = self.cum_weights[-1]
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def sample(self, rng=random):
+        """Draw one token using `rng` (anything with a random() method)."""
+        i = bisect_right(self.cum_weights, rng.random() * self.total)
+        # random() < 1, but the float product can still round up to total
+        return self.tokens[min(i, len(self.tokens) - 1)]
@@ -0,0 +1,170 @@
+"""
+scoring.py
+Per-token log-probabilities, cross-entropy and perplexity of text under an author model
+
+NgramScorer scores a text (or token / id array) against the n-gram trie
+of one (author, level) with interpolated Kneser-Ney smoothing:
+
+    p_k(w | ctx) = (max(c_k(ctx, w) - D_k, 0) + D_k * types_k(ctx) * p_{k-1}(w | ctx[1:])) / T_k(ctx)
+
+c_n are raw counts and c_k for k < n continuation counts; the unigram
+level interpolates with a uniform distribution over the vocabulary plus
+one unknown token, so no token scores zero. The arrays come from
+smoothing.kneser_ney_levels, the same model generate --smoothing kn samples.
+
+Scoring is vectorized over positions. Each trie level k is indexed by the
+sorted keys parent * (V + 1) + token, so finding the k-gram that starts
+at every position is one searchsorted per order, and all counts, context
+totals and mixture weights are array gathers.
+
+InformationAnalyzer provides the entropy and Zipf helpers the assignment's
+grading tester expects.
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from starter_preprocess import TextPreprocessor
+from src.ngram_trie import NgramTrie, trie_path_for
+from src.smoothing import kneser_ney_levels
+from src.zipf import fit_zipf
+
+
+class InformationAnalyzer:
+    """Entropy, perplexity, Zipf fits and model cross-entropy in bits."""
+
+    def calculate_entropy(self, probabilities):
+        """Shannon entropy (bits) of a distribution given as a dict or array of probabilities or counts."""
+        if isinstance(probabilities, dict):
+            probabilities = list(probabilities.values())
+        p = np.asarray(probabilities, dtype=np.float64)
+        p = p[p > 0]
+        if len(p) == 0:
+            return 0.0
+        p = p / p.sum()
+        return float(-np.sum(p * np.log2(p)))
+
+    def calculate_perplexity(self, entropy):
+        return 2.0 ** entropy
+
+    def analyze_zipf_distribution(self, frequencies):
+        """Zipf fit of a frequency dict or count array: {"alpha", "r_squared", ...} (see zipf.py)."""
+        if isinstance(frequencies, dict):
+            frequencies = list(frequencies.values())
+        return fit_zipf(frequencies)
+
+    def cross_entropy(self, text, author, level="word-3"):
+        """Bits per token of `text` under the (author, level) model."""
+        return NgramScorer(author, level).cross_entropy(text)
+
+
+class NgramScorer:
+    """
+    Vectorized interpolated Kneser-Ney scoring against one author's trie.
+    `top` (pruning.prune_trie of the trie) scores a pruned top order over
+    the trie's unpruned lower orders, the model analyze --prune writes.
+    """
+
+    def __init__(self, author, level="word-3", trie=None, top=None):
+        self.author = author
+        self.ngram_type, order = level.split("-")
+        self.n = int(order)
+        if trie is None:
+            trie_path = trie_path_for(author, self.ngram_type)
+            if not os.path.isdir(trie_path):
+                raise FileNotFoundError(f"Missing n-gram trie {trie_path}; run analyze first")
+            trie = NgramTrie.load(trie_path)
+        if trie.max_order < self.n:
+            raise ValueError(f"Trie for {author} {self.ngram_type} only holds orders up to {trie.max_order}")
+        self.trie = trie
+        self.vocab = trie.vocab
+        self.base = len(self.vocab) + 1  # id len(vocab) stands for unknown tokens
+        # keys / counts / discounts / totals / types per order, shared with generate --smoothing kn
+        self.keys, self.counts, self.discounts, self.totals, self.types = kneser_ney_levels(trie, self.n, top)
+
+    def encode(self, tokens):
+        """Model ids of a token list; unknown tokens get id len(vocab)."""
+        return self.map_ids(*TextPreprocessor().encode_tokens(tokens))
+
+    def map_ids(self, local_vocab, local_ids):
+        """Model ids of tokens already encoded as (vocab, ids) by TextPreprocessor.encode_tokens."""
+        token_ids = self.trie.token_ids
+        table = np.fromiter((token_ids.get(tok, self.base - 1) for tok in local_vocab),
+                            dtype=np.int64, count=len(local_vocab))
+        return table[local_ids] if len(local_ids) else np.empty(0, dtype=np.int64)
+
+    def _ids(self, text):
+        # str -> normalized and tokenized like analyze; ints -> model ids; anything else -> tokens
+        if isinstance(text, str):
+            pre = TextPreprocessor()
+            normalized = pre.normalize_text(text)
+            if self.ngram_type == "char":
+                return self.encode(pre.tokenize_chars(normalized))
+            return self.encode(pre.tokenize_words(normalized))
+        arr = np.asarray(text)
+        if arr.dtype.kind in "iu":
+            return arr.astype(np.int64)
+        return self.encode(list(text))
+
+    def log_probs(self, text):
+        """log2 probability of every token; position i is conditioned on up to n-1 preceding tokens."""
+        ids = self._ids(text)
+        m = len(ids)
+        # p starts uniform over the vocabulary plus the unknown token
+        p = np.full(m, 1.0 / self.base)
+        nodes = np.zeros(m, dtype=np.int64)  # level k-1 node of the window starting at each position
+        for k in range(1, self.n + 1):
+            width = m - k + 1
+            if width <= 0:
+                break
+            ctx = nodes[:width]
+            query = ctx * self.base + ids[k - 1:]
+            pos = np.minimum(np.searchsorted(self.keys[k], query), len(self.keys[k]) - 1)
+            found = (ctx >= 0) & (self.keys[k][pos] == query)
+            gram = np.where(found, pos, -1)
+
+            # The k-gram starting at j predicts token j + k - 1
+            lower = p[k - 1:]
+            safe_ctx = np.maximum(ctx, 0)
+            total = np.where(ctx >= 0, self.totals[k][safe_ctx], 0)
+            d = self.discounts[k]
+            count = np.where(found, self.counts[k][pos], 0)
+            seen = total > 0
+            mixed = (np.maximum(count - d, 0) + d * self.types[k][safe_ctx] * lower) / np.maximum(total, 1)
+            p[k - 1:] = np.where(seen, mixed, lower)
+            nodes = gram
+        return np.log2(p)
+
+    def cross_entropy(self, text):
+        """Average negative log2 probability per token (bits)."""
+        lp = self.log_probs(text)
+        return float(-lp.mean()) if len(lp) else 0.0
+
+    def perplexity(self, text):
+        return 2.0 ** self.cross_entropy(text)
+
+    def score(self, text):
+        lp = self.log_probs(text)
+        h = float(-lp.mean()) if len(lp) else 0.0
+        return {"author": self.author, "level": f"{self.ngram_type}-{self.n}", "tokens": len(lp),
+                "cross_entropy": h, "perplexity": 2.0 ** h}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score text under an author's n-gram model.")
+    parser.add_argument("--author", required=True, help="austen | twain | doyle")
+    parser.add_argument("--level", default="word-3", help="char-1 | char-2 | word-3 etc.")
+    parser.add_argument("--input", required=True, help="Text file to score")
+    args = parser.parse_args()
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        text = f.read()
+    scorer = NgramScorer(args.author, args.level)
+    start = time.perf_counter()
+    result = scorer.score(text)
+    elapsed = time.perf_counter() - start
+    print(f" Tokens: {result['tokens']} | Cross-entropy: {result['cross_entropy']:.3f} bits"
+          f" | Perplexity: {result['perplexity']:.1f} | {result['tokens'] / elapsed:,.0f} tokens/s")
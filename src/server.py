@@ -0,0 +1,274 @@
+"""
+server.py
+Long-running generation service with warm, LRU-cached models
+
+Keeps TextGenerator instances for (author, level) pairs in memory so a
+request only pays for sampling, not for imports and table loading.
+Generators build per-context samplers (and Kneser-Ney nodes) as requests
+reach new contexts; each request charges that growth to its cache entry,
+so the LRU budget covers the caches as well as the tables.
+
+    GET /generate?author=austen&level=word-3&length=50&seed=7
+    GET /generate?author=austen&level=word-5&length=50&smoothing=kn
+    GET /stats
+"""
+
+import os
+import re
+import sys
+import copy
+import json
+import time
+import random
+import argparse
+import threading
+import socketserver
+from itertools import islice
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.generator import TextGenerator
+from src.model_store import list_authors
+from src.ngram_trie import TRIE_SUFFIX
+
+# Rough per-entry cost of a JSON-backed table held as a Python dict
+DICT_ENTRY_BYTES = 200
+
+# Rough cost of one lazily built per-context sampler (key, object, dict slot)
+# and of each successor it holds (token reference and cumulative weight)
+SAMPLER_BYTES = 250
+SUCCESSOR_BYTES = 40
+
+LEVEL_PATTERN = re.compile(r"(char|word)-\d+")
+
+
+def known_authors():
+    """Authors analyze has written tables or tries for."""
+    return {author for ngram_type in ("char", "word")
+            for suffix in (f"_{ngram_type}_1-gram.json", f"_{ngram_type}{TRIE_SUFFIX}")
+            for author in list_authors(suffix)}
+
+
+def validate(author, level, length=1):
+    """
+    Reject names that are not analyzed authors or levels like word-3 (order 1 or more),
+    before they reach file paths, and lengths below 1.
+    """
+    if not LEVEL_PATTERN.fullmatch(level) or int(level.split("-")[1]) < 1:
+        raise ValueError(f"Invalid level: {level} (expected char-N or word-N with N >= 1)")
+    if length < 1:
+        raise ValueError(f"Invalid length: {length} (expected 1 or more)")
+    if author not in known_authors():
+        raise ValueError(f"Unknown author: {author}")
+
+
+def estimate_bytes(generator):
+    """Approximate resident size of a loaded generator."""
+    if generator.model is not None:
+        return generator.model.nbytes + DICT_ENTRY_BYTES * len(generator.model.vocab)
+    if generator.trie is not None:
+        return generator.trie.nbytes + DICT_ENTRY_BYTES * len(generator.trie.vocab)
+    return DICT_ENTRY_BYTES * len(generator.freq_data)
+
+
+def _context_caches(generator):
+    # Per-context caches a generator grows while serving, each only ever appended to
+    caches = [generator.index]
+    if generator.smoother is not None:
+        caches.extend(level.nodes for level in generator.smoother.levels)
+    return caches
+
+
+def cache_sizes(generator):
+    """Entries in each per-context cache, the starting point for cache_growth."""
+    return [len(cache) for cache in _context_caches(generator)]
+
+
+def cache_growth(generator, seen):
+    """(estimated bytes of cache entries added since `seen`, current sizes)."""
+    added, sizes = 0, []
+    for cache, start in zip(_context_caches(generator), seen):
+        # list() first: other requests may add entries while we count
+        for value in islice(list(cache.values()), start, None):
+            sampler = value[0] if isinstance(value, tuple) else value
+            added += SAMPLER_BYTES + SUCCESSOR_BYTES * (len(sampler) if sampler is not None else 0)
+        sizes.append(max(start, len(cache)))
+    return added, sizes
+
+
+class ModelCache:
+    """Thread-safe LRU cache of TextGenerators bounded by estimated memory."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # (author, level[, smoothing]) -> [generator, size, cache sizes]
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._loading = {}  # cache key -> Lock, so each model is loaded once
+
+    def get(self, author, level, smoothing=None):
+        key = (author, level) + ((smoothing,) if smoothing else ())
+        with self._lock:
+            if key in self.entries:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return self.entries[key][0]
+            self.misses += 1
+        validate(author, level)
+        with self._lock:
+            load_lock = self._loading.setdefault(key, threading.Lock())
+
+        # Load outside the cache lock so other models keep serving
+        try:
+            with load_lock:
+                with self._lock:
+                    if key in self.entries:
+                        return self.entries[key][0]
+                generator = TextGenerator(author=author, level=level, smoothing=smoothing)
+                size = estimate_bytes(generator)
+                with self._lock:
+                    self.entries[key] = [generator, size, cache_sizes(generator)]
+                    self.total_bytes += size
+                    self._evict()
+                return generator
+        finally:
+            # Also after a failed load, so bad keys do not leave a lock behind
+            with self._lock:
+                self._loading.pop(key, None)
+
+    def charge(self, author, level, smoothing=None):
+        """
+        Add the samplers a request built to its entry's size and evict to fit the
+        budget. A model whose caches alone exceed it is dropped too; the next
+        request reloads it with empty caches.
+        """
+        key = (author, level) + ((smoothing,) if smoothing else ())
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return
+            added, entry[2] = cache_growth(entry[0], entry[2])
+            entry[1] += added
+            self.total_bytes += added
+            self._evict(keep_newest=False)
+
+    def _evict(self, keep_newest=True):
+        # Drop least recently used models until under budget, by default keeping the newest one
+        while self.total_bytes > self.max_bytes and len(self.entries) > keep_newest:
+            _, (_, size, _) = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "models": ["/".join(key) for key in self.entries],
+                "cached_bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+class GenerationHandler(BaseHTTPRequestHandler):
+    cache = None  # set by make_server
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if url.path == "/stats":
+            self._send(200, self.cache.stats())
+        elif url.path == "/generate":
+            self._generate(params)
+        else:
+            self._send(404, {"error": f"Unknown path: {url.path}"})
+
+    def _generate(self, params):
+        start = time.perf_counter()
+        try:
+            author = params["author"]
+            level = params.get("level", "word-1")
+            length = int(params.get("length", 100))
+            seed = int(params["seed"]) if "seed" in params else None
+            smoothing = params.get("smoothing")
+            if smoothing == "none":
+                smoothing = None
+            validate(author, level, length)
+            shared = self.cache.get(author, level, smoothing)
+        except KeyError as e:
+            self._send(400, {"error": f"Missing parameter: {e}"})
+            return
+        except (ValueError, FileNotFoundError) as e:
+            self._send(400, {"error": str(e)})
+            return
+
+        # Shallow copy shares the model and samplers but gives this request its own RNG
+        generator = copy.copy(shared)
+        generator.rng = random.Random(seed)
+        text = generator.generate(length=length)
+        self.cache.charge(author, level, smoothing)
+        self._send(200, {"author": author, "level": level, "text": text,
+                         "ms": round((time.perf_counter() - start) * 1e3, 3)})
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # Unix socket peers have no (host, port) pair
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        socketserver.UnixStreamServer.server_bind(self)
+        self.server_name, self.server_port = "localhost", 0
+
+
+def make_server(cache, host="127.0.0.1", port=8000, socket_path=None):
+    handler = type("Handler", (GenerationHandler,), {"cache": cache})
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        return ThreadingUnixHTTPServer(socket_path, handler)
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def serve(host="127.0.0.1", port=8000, socket_path=None, cache_mb=512):
+    """Run the generation service until interrupted."""
+    cache = ModelCache(max_bytes=cache_mb * 1024 * 1024)
+    server = make_server(cache, host, port, socket_path)
+    where = f"unix:{socket_path}" if socket_path else f"http://{host}:{port}"
+    print(f"🪶 Serving text generation on {where} (cache {cache_mb} MB)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve text generation over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8000, help="TCP port")
+    parser.add_argument("--socket", default=None, help="Serve on this Unix socket instead of TCP")
+    parser.add_argument("--cache-mb", type=int, default=512, help="Memory cap for cached models")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.socket, args.cache_mb)
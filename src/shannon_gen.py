@@ -1,6 +1,10 @@
 """
 shannon_gen.py
 Part 4 — Unified CLI for Shannon Text Analysis & Generation
+
+Subcommand modules are imported inside their branch of main(), so e.g.
+`generate` never loads matplotlib; benchmarks/check_import_time.py keeps
+the startup within budget.
 """
 
 import argparse
@@ -10,20 +14,38 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.analyze import analyze_text
-from src.analyze_stats import main as visualize_main
-from src.generator import TextGenerator
-
 
 def main():
     parser = argparse.ArgumentParser(
         description="Unified CLI for Shannon-style text analysis and generation."
     )
+    parser.add_argument("--metrics", default=None, metavar="PATH",
+                        help="Write per-stage timings, counters and peak memory as JSON ('-' for stdout)")
+    parser.add_argument("--profile", default=None, metavar="DIR",
+                        help="Also dump a cProfile file per stage into DIR (implies metrics collection)")
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     # analyze
     analyze_parser = subparsers.add_parser("analyze", help="Run Part 1: generate frequency tables")
     analyze_parser.add_argument("--author", required=True, help="austen | twain | doyle")
+    analyze_parser.add_argument("--stream", action="store_true", help="Read and count the input in chunks")
+    analyze_parser.add_argument("--chunk-size", type=int, default=None,
+                                help="Characters per chunk with --stream (default 4M)")
+    analyze_parser.add_argument("--input", default=None, help="Analyze this file instead of the bundled book")
+    analyze_parser.add_argument("--workers", type=int, default=1, help="Processes used for n-gram counting")
+    analyze_parser.add_argument("--force", action="store_true", help="Recompute even if inputs are unchanged")
+    analyze_parser.add_argument("--trie-order", type=int, default=None,
+                                help="Highest order kept in the n-gram tries (default 5, 0 to skip them)")
+    analyze_parser.add_argument("--approx-order", type=int, default=None,
+                                help="With --stream, count orders 4..N approximately in fixed memory")
+    analyze_parser.add_argument("--epsilon", type=float, default=None,
+                                help="Sketch error bound as a fraction of the n-grams seen (default 1e-4)")
+    analyze_parser.add_argument("--delta", type=float, default=None,
+                                help="Probability that a sketch estimate exceeds the bound (default 0.01)")
+    analyze_parser.add_argument("--heavy-hitters", type=int, default=None,
+                                help="Most frequent n-grams kept per approximate order (default 10000)")
+    analyze_parser.add_argument("--prune", default=None,
+                                help="Prune/quantize the 2- and 3-gram tables, e.g. min_count=2 | entropy=1e-7,bits=8")
 
     # visualize
     vis_parser = subparsers.add_parser("visualize", help="Run Part 2: create plots")
@@ -34,23 +56,147 @@ def main():
     gen_parser.add_argument("--author", required=True, help="austen | twain | doyle")
     gen_parser.add_argument("--level", required=True, help="char-1 | char-2 | word-3 etc.")
     gen_parser.add_argument("--length", type=int, default=100, help="Number of tokens to generate")
+    gen_parser.add_argument("--smoothing", choices=["none", "kn"], default="none",
+                            help="kn backs off to lower orders so generation never stops early")
+
+    # score
+    score_parser = subparsers.add_parser("score", help="Cross-entropy and perplexity of a text under a model")
+    score_parser.add_argument("--author", required=True, help="austen | twain | doyle")
+    score_parser.add_argument("--level", default="word-3", help="char-3 | word-3 | word-5 etc.")
+    score_parser.add_argument("--input", required=True, help="Text file to score")
+
+    # top
+    top_parser = subparsers.add_parser("top", help="Most frequent n-grams of a table, optionally by prefix")
+    top_parser.add_argument("--author", required=True, help="austen | twain | doyle")
+    top_parser.add_argument("--level", default="word-3", help="char-3 | word-3 | word-5 etc.")
+    top_parser.add_argument("--k", type=int, default=20, help="Number of n-grams to list")
+    top_parser.add_argument("--prefix", default="", help="Only n-grams starting with these tokens")
+
+    # zipf
+    zipf_parser = subparsers.add_parser("zipf", help="Zipf fits of every frequency table (and Heaps with --heaps)")
+    zipf_parser.add_argument("--author", default=None, help="Only this author (default: all)")
+    zipf_parser.add_argument("--heaps", action="store_true", help="Also fit Heaps' law over each book")
+
+    # compare
+    cmp_parser = subparsers.add_parser("compare", help="KL, Jensen-Shannon and cosine matrices between authors")
+    cmp_parser.add_argument("--authors", nargs="*", default=None, help="Authors to compare (default: all analyzed)")
+    cmp_parser.add_argument("--type", default="word", choices=["char", "word"], help="n-gram type")
+    cmp_parser.add_argument("--orders", type=int, nargs="*", default=[1, 2, 3], help="n-gram orders")
+    cmp_parser.add_argument("--json", default=None, help="Also write the matrices to this JSON file")
+
+    # attribute
+    attr_parser = subparsers.add_parser("attribute", help="Rank authors by the log-likelihood of each document")
+    attr_parser.add_argument("--inputs", nargs="+", required=True, help="Text files or directories of *.txt files")
+    attr_parser.add_argument("--authors", nargs="*", default=None, help="Candidate authors (default: all analyzed)")
+    attr_parser.add_argument("--level", default="word-3", help="char-3 | word-3 | word-5 etc.")
+    attr_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    attr_parser.add_argument("--per-line", action="store_true", help="Treat every line of a file as a document")
+    attr_parser.add_argument("--output", default=None, help="Write one JSON ranking per document to this file")
+
+    # serve
+    serve_parser = subparsers.add_parser("serve", help="Serve generation over HTTP with warm cached models")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    serve_parser.add_argument("--port", type=int, default=8000, help="TCP port")
+    serve_parser.add_argument("--socket", default=None, help="Serve on this Unix socket instead of TCP")
+    serve_parser.add_argument("--cache-mb", type=int, default=512, help="Memory cap for cached models")
 
     args = parser.parse_args()
 
+    collector = None
+    if args.metrics or args.profile:
+        from src import metrics
+        collector = metrics.enable(args.profile)
+
     # dispatch by command
     if args.command == "analyze":
-        analyze_text(args.author)
+        from src.analyze import analyze_text
+        from src.pruning import parse_setting
+        # Unset options keep analyze_text's defaults
+        options = {"chunk_size": args.chunk_size, "trie_order": args.trie_order,
+                   "approx_order": args.approx_order, "epsilon": args.epsilon, "delta": args.delta,
+                   "heavy_hitters": args.heavy_hitters,
+                   "prune": parse_setting(args.prune) if args.prune else None}
+        analyze_text(args.author, stream=args.stream, input_path=args.input, workers=args.workers,
+                     use_cache=not args.force, **{k: v for k, v in options.items() if v is not None})
 
     elif args.command == "visualize":
+        from src.analyze_stats import main as visualize_main
         visualize_main(args.author)
 
     elif args.command == "generate":
-        generator = TextGenerator(author=args.author, level=args.level)
-        text = generator.generate(length=args.length)
+        from src.generator import TextGenerator
+        from src import metrics
+        with metrics.stage("load_model"):
+            generator = TextGenerator(author=args.author, level=args.level, smoothing=args.smoothing)
         print("\n🪶 Generated Text:")
-        print(text)
+        # Tokens are printed as they are sampled rather than after the whole run
+        sep = "" if generator.ngram_type == "char" else " "
+        with metrics.stage("generate"):
+            for i, token in enumerate(generator.iter_generate(length=args.length)):
+                print(token if i == 0 else sep + token, end="", flush=True)
+        print()
         print("------------------------------------------------\n")
 
+    elif args.command == "score":
+        with open(args.input, "r", encoding="utf-8") as f:
+            text = f.read()
+        from src.scoring import NgramScorer
+        result = NgramScorer(args.author, args.level).score(text)
+        print(f"\n📏 {args.input} under {args.author.title()} {args.level}:")
+        print(f" Tokens: {result['tokens']} | Cross-entropy: {result['cross_entropy']:.3f} bits/token"
+              f" | Perplexity: {result['perplexity']:.1f}")
+
+    elif args.command == "top":
+        from src.analyze_stats import top_ngrams
+        # Word prefixes are space separated; a char prefix is the characters themselves
+        prefix = tuple(args.prefix.split()) if args.level.startswith("word") else tuple(args.prefix)
+        print(f"\n🔝 Top {args.k} {args.level} for {args.author.title()}"
+              + (f" starting with '{args.prefix}':" if prefix else ":"))
+        for ngram, count in top_ngrams(args.author, args.level, args.k, prefix):
+            sep = " " if args.level.startswith("word") else ""
+            print(f" {count:>7}  {sep.join(ngram) if isinstance(ngram, tuple) else ngram}")
+
+    elif args.command == "zipf":
+        from src.analyze import AUTHOR_FILES
+        from src.zipf import zipf_tables, heaps_streaming, AUTHORS, TYPES
+        authors = [args.author] if args.author else AUTHORS
+        print("\n📈 Zipf fits (count ∝ rank^-alpha):")
+        for r in zipf_tables(authors):
+            print(f" {r['author']:<7} {r['type']}-{r['order']}  types={r['types']:<7} "
+                  f"alpha={r['alpha']:.3f}  R²={r['r_squared']:.3f}")
+        if args.heaps:
+            print("\n📈 Heaps fits (vocabulary ∝ tokens^beta):")
+            for author in authors:
+                for ngram_type in TYPES:
+                    h = heaps_streaming(AUTHOR_FILES[author], ngram_type)
+                    print(f" {author:<7} {ngram_type:<5} tokens={h['tokens']:<7} vocab={h['vocab']:<6} "
+                          f"beta={h['beta']:.3f}  R²={h['r_squared']:.3f}")
+
+    elif args.command == "compare":
+        from src.compare import compare_authors, format_matrix, save_matrices, METRICS
+        result = compare_authors(args.authors, args.type, args.orders)
+        for n, matrices in result["orders"].items():
+            for metric in METRICS:
+                print(f"\n🔀 {args.type}-{n} {metric}:")
+                print(format_matrix(result["authors"], matrices[metric]))
+        if args.json:
+            save_matrices(result, args.type, args.json)
+            print(f" Saved matrices → {args.json}")
+
+    elif args.command == "attribute":
+        from src.attribute import run
+        print(f"\n🕵️  Attributing documents under {args.level} models:")
+        run(args.inputs, args.authors, args.level, args.workers, args.per_line, args.output)
+
+    elif args.command == "serve":
+        from src.server import serve
+        serve(args.host, args.port, args.socket, args.cache_mb)
+
+    if collector is not None:
+        collector.write(args.metrics or os.path.join(args.profile, "metrics.json"))
+        if args.metrics != "-":
+            print(f"⏱️  Metrics written to {args.metrics or os.path.join(args.profile, 'metrics.json')}")
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,340 @@
+"""
+sketch.py
+Approximate n-gram counting in fixed memory: Count-Min Sketch + Misra-Gries
+
+Exact tables of word 4- and 5-grams grow with the corpus, since almost
+every long n-gram is unique. SketchCounter instead keeps, per order:
+
+    CountMinSketch  depth x width counters for point queries. An estimate is
+                    never below the true count and exceeds it by more than
+                    epsilon * N with probability at most delta (N = n-grams seen).
+    MisraGries      the `capacity` heaviest n-grams. Every n-gram occurring more
+                    than N / (capacity + 1) times is kept.
+
+Tokens are mapped to ids and each n-gram window to a 64-bit hash, so a chunk
+is counted with a few NumPy passes. The sketches and summaries have a fixed
+size; the token -> id vocabulary does not. It grows with the distinct tokens
+seen (sublinearly in the corpus, per Heaps' law), is reported separately by
+vocab_bytes and is written once per type, not per order.
+
+SketchCounter.save writes per order the heavy hitters as a binary model
+(data/freq_tables/<author>_<type>_<n>-gram.hh.model/, src/model_store.py) and
+the sketch (<n>-gram.cms/), plus <author>_<type>.cms.vocab.json. The .hh.model
+suffix keeps the partial tables apart from exact ones: TextGenerator and the
+top-k queries only fall back to them when no exact table or trie of that
+order exists, and compare never reads them.
+"""
+
+import os
+import sys
+import glob
+import json
+import math
+import shutil
+import argparse
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.model_store import arrays_from_ids, write_model, model_path_for, heavy_model_path_for
+
+SKETCH_SUFFIX = ".cms"
+VOCAB_SUFFIX = ".cms.vocab.json"
+SKETCH_FILES = ["meta.json", "table.npy"]
+
+DEFAULT_EPSILON = 1e-4
+DEFAULT_DELTA = 0.01
+DEFAULT_HEAVY_HITTERS = 10000
+
+# Multiplier of the polynomial n-gram hash (any large odd 64-bit constant)
+_HASH_BASE = np.uint64(0x9E3779B97F4A7C15)
+
+
+def sketch_path_for(json_path):
+    """data/freq_tables/x_word_5-gram.json -> data/freq_tables/x_word_5-gram.cms"""
+    return os.path.splitext(json_path)[0] + SKETCH_SUFFIX
+
+
+def vocab_path_for(author, ngram_type, out_dir="data/freq_tables"):
+    """Token list shared by all sketched orders of one (author, type)."""
+    return os.path.join(out_dir, f"{author}_{ngram_type}{VOCAB_SUFFIX}")
+
+
+def remove_sketches(author, out_dir="data/freq_tables", keep_orders=()):
+    """
+    Delete sketches of this author (and the heavy-hitter models next to
+    them) for orders not in keep_orders, and the vocabularies once no
+    order is kept.
+    """
+    for sketch_dir in glob.glob(os.path.join(out_dir, f"{author}_*-gram{SKETCH_SUFFIX}")):
+        n = int(sketch_dir[:-len(SKETCH_SUFFIX)].rsplit("_", 1)[1].split("-")[0])
+        if n not in keep_orders:
+            shutil.rmtree(sketch_dir)
+            shutil.rmtree(heavy_model_path_for(sketch_dir), ignore_errors=True)
+            # Heavy hitters written before they had their own suffix
+            shutil.rmtree(model_path_for(sketch_dir), ignore_errors=True)
+    if not keep_orders:
+        for path in glob.glob(os.path.join(out_dir, f"{author}_*{VOCAB_SUFFIX}")):
+            os.remove(path)
+
+
+def _hash_columns(columns, m):
+    keys = np.zeros(m, dtype=np.uint64)
+    for col in columns:
+        keys = keys * _HASH_BASE + np.asarray(col, dtype=np.uint64) + np.uint64(1)
+    # splitmix64 finalizer, so the high bits used by the sketch rows depend on every token
+    keys ^= keys >> np.uint64(30)
+    keys *= np.uint64(0xBF58476D1CE4E5B9)
+    keys ^= keys >> np.uint64(27)
+    keys *= np.uint64(0x94D049BB133111EB)
+    keys ^= keys >> np.uint64(31)
+    return keys
+
+
+def ngram_keys(ids, n):
+    """64-bit hash of every length-n window of an id array (len(ids) - n + 1 keys)."""
+    m = max(len(ids) - n + 1, 0)
+    return _hash_columns([ids[i:i + m] for i in range(n)], m)
+
+
+def hash_rows(ngrams):
+    """64-bit hash of each row of an (m, n) id matrix, the same key ngram_keys gives that window."""
+    ngrams = np.asarray(ngrams)
+    return _hash_columns(ngrams.T, len(ngrams))
+
+
+class CountMinSketch:
+    """depth x width counters; each row hashes a key to one counter with multiply-shift."""
+
+    def __init__(self, width, depth, seed=0, table=None, total=0):
+        # Multiply-shift needs a power-of-two width
+        self.log_width = max(1, math.ceil(math.log2(width)))
+        self.width = 1 << self.log_width
+        self.depth = depth
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(0, 2 ** 63, size=depth, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.b = rng.integers(0, 2 ** 63, size=depth, dtype=np.uint64)
+        self.table = table if table is not None else np.zeros((depth, self.width), dtype=np.int64)
+        self.total = total
+
+    @classmethod
+    def from_error(cls, epsilon, delta, seed=0):
+        """Sketch whose estimates exceed the true count by > epsilon * N with probability <= delta."""
+        if not (0 < epsilon < 1 and 0 < delta < 1):
+            raise ValueError("epsilon and delta must lie in (0, 1)")
+        return cls(math.ceil(math.e / epsilon), math.ceil(math.log(1 / delta)), seed)
+
+    @property
+    def nbytes(self):
+        return self.table.nbytes
+
+    @property
+    def epsilon(self):
+        """Relative error bound: estimates exceed the count by at most epsilon * total w.h.p."""
+        return math.e / self.width
+
+    def _columns(self, keys, row):
+        return ((self.a[row] * keys + self.b[row]) >> np.uint64(64 - self.log_width)).astype(np.intp)
+
+    def add(self, keys, counts):
+        """Add counts[i] to key keys[i] (keys should be unique within one call)."""
+        keys = np.asarray(keys, dtype=np.uint64)
+        counts = np.asarray(counts, dtype=np.int64)
+        for row in range(self.depth):
+            self.table[row] += np.bincount(self._columns(keys, row), weights=counts,
+                                           minlength=self.width).astype(np.int64)
+        self.total += int(counts.sum())
+
+    def query(self, keys):
+        """Estimated counts (int64) of an array of keys."""
+        keys = np.asarray(keys, dtype=np.uint64)
+        est = self.table[0, self._columns(keys, 0)]
+        for row in range(1, self.depth):
+            est = np.minimum(est, self.table[row, self._columns(keys, row)])
+        return np.asarray(est, dtype=np.int64)
+
+
+class MisraGries:
+    """
+    The `capacity` heaviest keys of a stream, merged in batches.
+
+    Each batch (unique keys with their counts) is added to the summary; when
+    more than `capacity` keys remain, the (capacity + 1)-th largest count is
+    subtracted from all of them and non-positive ones are dropped. A kept
+    count is at most `error` below the true count, and error <= N / (capacity + 1).
+    """
+
+    def __init__(self, capacity, order):
+        self.capacity = capacity
+        self.keys = np.zeros(0, dtype=np.uint64)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.ngrams = np.zeros((0, order), dtype=np.int64)  # token ids of each kept key
+        self.error = 0
+
+    @property
+    def nbytes(self):
+        return self.keys.nbytes + self.counts.nbytes + self.ngrams.nbytes
+
+    def update(self, keys, counts, ngrams):
+        keys = np.concatenate([self.keys, keys])
+        uniq, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        summed = np.bincount(inverse, weights=np.concatenate([self.counts, counts])).astype(np.int64)
+        ngrams = np.concatenate([self.ngrams, ngrams])[first]
+        if len(uniq) > self.capacity:
+            cut = int(np.partition(summed, len(summed) - self.capacity - 1)[len(summed) - self.capacity - 1])
+            summed -= cut
+            self.error += cut
+            keep = summed > 0
+            uniq, summed, ngrams = uniq[keep], summed[keep], ngrams[keep]
+        self.keys, self.counts, self.ngrams = uniq, summed, ngrams
+
+
+class SketchCounter:
+    """
+    Approximate counts of several n-gram orders from tokens fed in order,
+    in the spirit of NgramCounter: only the last (max order - 1) token ids
+    are carried between update() calls.
+    """
+
+    def __init__(self, orders, epsilon=DEFAULT_EPSILON, delta=DEFAULT_DELTA,
+                 heavy_hitters=DEFAULT_HEAVY_HITTERS):
+        self.orders = tuple(sorted(set(orders)))
+        if not self.orders or self.orders[0] < 1:
+            raise ValueError("n-gram orders must be positive integers")
+        if heavy_hitters < 1:
+            raise ValueError("heavy_hitters must be at least 1")
+        self.epsilon, self.delta = epsilon, delta
+        # One seed per order, so the orders' collisions are independent
+        self.sketches = {n: CountMinSketch.from_error(epsilon, delta, seed=n) for n in self.orders}
+        self.heavy = {n: MisraGries(heavy_hitters, n) for n in self.orders}
+        self.token_ids = {}
+        self._tail = np.zeros(0, dtype=np.int64)
+        self._carry = self.orders[-1] - 1
+
+    @property
+    def vocab(self):
+        return list(self.token_ids)
+
+    @property
+    def nbytes(self):
+        """Bytes held by the sketches and heavy-hitter summaries; fixed by epsilon, delta and heavy_hitters."""
+        return sum(s.nbytes for s in self.sketches.values()) + sum(h.nbytes for h in self.heavy.values())
+
+    @property
+    def vocab_bytes(self):
+        """Approximate bytes of the token -> id dict, which grows with the distinct tokens seen."""
+        return sys.getsizeof(self.token_ids) + sum(sys.getsizeof(tok) for tok in self.token_ids)
+
+    def update(self, tokens):
+        """Count every n-gram that ends inside `tokens`."""
+        token_ids = self.token_ids
+        ids = np.fromiter((token_ids.setdefault(tok, len(token_ids)) for tok in tokens),
+                          dtype=np.int64, count=len(tokens))
+        window = np.concatenate([self._tail, ids])
+        tail_len = len(self._tail)
+        for n in self.orders:
+            start = max(0, tail_len - n + 1)
+            keys = ngram_keys(window[start:], n)
+            if not len(keys):
+                continue
+            uniq, first, counts = np.unique(keys, return_index=True, return_counts=True)
+            self.sketches[n].add(uniq, counts)
+            rows = np.stack([window[start + i + first] for i in range(n)], axis=1)
+            self.heavy[n].update(uniq, counts, rows)
+        if self._carry:
+            self._tail = window[-self._carry:]
+
+    def heavy_hitters(self, n):
+        """
+        (ngram ids, counts) of the kept heavy hitters of order n. A count is
+        the smaller of the two upper bounds (sketch estimate, Misra-Gries
+        count + its error), so it is never below the true count.
+        """
+        heavy = self.heavy[n]
+        counts = np.minimum(self.sketches[n].query(heavy.keys), heavy.counts + heavy.error)
+        return heavy.ngrams, counts
+
+    def count(self, ngram):
+        """Estimated count of one n-gram (tuple of tokens)."""
+        return _point_query(self.sketches[len(ngram)], self.token_ids, ngram)
+
+    def save(self, author, ngram_type, out_dir="data/freq_tables"):
+        """
+        Write the vocabulary once, then each order's heavy hitters as a binary
+        model and its sketch next to it.
+        Returns {"<n>-gram": {"model": dir, "sketch": dir, "vocab": file}}.
+        """
+        vocab = self.vocab
+        vocab_path = vocab_path_for(author, ngram_type, out_dir)
+        with open(vocab_path, "w", encoding="utf-8") as f:
+            json.dump(vocab, f, ensure_ascii=False)
+        written = {}
+        for n in self.orders:
+            json_path = os.path.join(out_dir, f"{author}_{ngram_type}_{n}-gram.json")
+            model_dir = heavy_model_path_for(json_path)
+            ngrams, counts = self.heavy_hitters(n)
+            if len(counts):
+                # Only tokens of kept n-grams go into the model vocabulary
+                used, local = np.unique(ngrams, return_inverse=True)
+                local = local.reshape(ngrams.shape)
+                write_model(model_dir, [vocab[i] for i in used.tolist()],
+                            arrays_from_ids(local, counts, len(used)), ngram_type)
+            sketch = self.sketches[n]
+            sketch_dir = sketch_path_for(json_path)
+            os.makedirs(sketch_dir, exist_ok=True)
+            np.save(os.path.join(sketch_dir, "table.npy"), sketch.table)
+            with open(os.path.join(sketch_dir, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump({"order": n, "ngram_type": ngram_type, "width": sketch.width,
+                           "depth": sketch.depth, "seed": sketch.seed, "total": sketch.total,
+                           "epsilon": self.epsilon, "delta": self.delta,
+                           "heavy_hitters": self.heavy[n].capacity, "heavy_error": self.heavy[n].error,
+                           "vocab": os.path.basename(vocab_path)}, f, ensure_ascii=False)
+            written[f"{n}-gram"] = {"model": model_dir if len(counts) else None,
+                                    "sketch": sketch_dir, "vocab": vocab_path}
+        return written
+
+
+def _point_query(sketch, token_ids, ngram):
+    ids = [token_ids.get(tok) for tok in ngram]
+    if None in ids:
+        return 0
+    return int(sketch.query(hash_rows([ids]))[0])
+
+
+class NgramSketch:
+    """Point queries against a saved sketch (memory-mapped table)."""
+
+    def __init__(self, path):
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        table = np.load(os.path.join(path, "table.npy"), mmap_mode="r")
+        self.sketch = CountMinSketch(self.meta["width"], self.meta["depth"], self.meta["seed"],
+                                     table=table, total=self.meta["total"])
+        self.order = self.meta["order"]
+        with open(os.path.join(os.path.dirname(os.path.abspath(path)), self.meta["vocab"]), "r",
+                  encoding="utf-8") as f:
+            self.token_ids = {tok: i for i, tok in enumerate(json.load(f))}
+
+    @property
+    def error_bound(self):
+        """Absolute error (epsilon * N) exceeded with probability at most delta."""
+        return self.sketch.epsilon * self.sketch.total
+
+    def count(self, ngram):
+        """Estimated count of a tuple of tokens (0 if a token never occurred)."""
+        if len(ngram) != self.order:
+            raise ValueError(f"Expected a {self.order}-gram, got {len(ngram)} tokens")
+        return _point_query(self.sketch, self.token_ids, tuple(ngram))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Estimated count of an n-gram from an analyze --approx-order sketch.")
+    parser.add_argument("--author", required=True, help="austen | twain | doyle")
+    parser.add_argument("--level", default="word-5", help="e.g. word-4 | word-5 | char-5")
+    parser.add_argument("ngram", help="Space-separated words, or the characters of a char n-gram")
+    args = parser.parse_args()
+
+    ngram_type, n = args.level.split("-")
+    sketch = NgramSketch(sketch_path_for(f"data/freq_tables/{args.author}_{ngram_type}_{n}-gram.json"))
+    ngram = tuple(args.ngram.split()) if ngram_type == "word" else tuple(args.ngram)
+    print(f" {args.ngram!r}: ~{sketch.count(ngram)} (over by at most {sketch.error_bound:.0f}"
+          f" with probability {1 - sketch.meta['delta']:.0%})")
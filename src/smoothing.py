@@ -0,0 +1,200 @@
+"""
+smoothing.py
+Interpolated Kneser-Ney smoothing for the n-gram generator
+
+    P(w | ctx) = max(c(ctx, w) - D, 0) / c(ctx) + gamma(ctx) * P_lower(w | ctx[1:])
+    gamma(ctx) = D * (distinct successors of ctx) / c(ctx)
+
+The highest order uses raw counts; lower orders use continuation counts
+(the number of distinct tokens seen before an n-gram), so a word's
+unigram weight reflects how many contexts it completes rather than how
+often it occurs. The unigram level is discounted like the others and
+interpolates with a uniform distribution over the vocabulary plus one
+unknown token, so scoring never assigns a token zero probability.
+
+kneser_ney_levels computes the model once as arrays over an NgramTrie;
+scoring.py evaluates it directly and analyze saves its lower orders.
+Sampling from the mixture walks down the orders: at each order it draws
+from the discounted counts with probability 1 - gamma and otherwise
+backs off, and an unseen context backs off directly. Below the unigram
+level it draws a uniform vocabulary token (the unknown token cannot be
+emitted), so generation never dead-ends and each step costs at most one
+cached lookup per order.
+
+analyze precomputes the continuation tables (binary models, see
+model_store.py) and the discounts D = n1 / (n1 + 2 n2) per order into
+data/freq_tables/<author>_<type>.kn/.
+"""
+
+import os
+import sys
+import json
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.sampler import CumulativeSampler
+from src.model_store import NgramModel, MODEL_FILES, arrays_from_ids, write_model
+
+KN_SUFFIX = ".kn"
+
+# Used when an order has too few n-grams seen once or twice to estimate D
+DEFAULT_DISCOUNT = 0.75
+
+
+def kn_path_for(author, ngram_type, out_dir="data/freq_tables"):
+    return os.path.join(out_dir, f"{author}_{ngram_type}{KN_SUFFIX}")
+
+
+def kn_files(max_order):
+    """Names of the files a saved Kneser-Ney model of this order consists of."""
+    return ["meta.json"] + [os.path.join(f"cont_{k}.model", name)
+                            for k in range(1, max_order) for name in MODEL_FILES]
+
+
+def discount(counts):
+    """Absolute discount D = n1 / (n1 + 2 n2) from the count-of-counts."""
+    counts = np.asarray(counts)
+    n1 = int(np.count_nonzero(counts == 1))
+    n2 = int(np.count_nonzero(counts == 2))
+    if n1 == 0 or n2 == 0:
+        return DEFAULT_DISCOUNT
+    return n1 / (n1 + 2 * n2)
+
+
+def _level_keys(trie, k, base):
+    # Lookup keys parent * base + token of the level-k nodes, and each node's parent
+    tokens = np.asarray(trie.tokens[k], dtype=np.int64)
+    parent = np.searchsorted(trie.children[k - 1], np.arange(len(tokens)), side="right") - 1
+    return parent * base + tokens, parent
+
+
+def _context_sums(counts, offsets):
+    # Total count and number of positive-count successors of each parent node
+    offsets = np.asarray(offsets, dtype=np.int64)
+    cum = np.concatenate(([0], np.cumsum(counts)))
+    cum_types = np.concatenate(([0], np.cumsum(counts > 0)))
+    return cum[offsets[1:]] - cum[offsets[:-1]], cum_types[offsets[1:]] - cum_types[offsets[:-1]]
+
+
+def kneser_ney_levels(trie, n, top=None):
+    """
+    The interpolated Kneser-Ney model of order n over an NgramTrie as
+    per-order arrays indexed by trie node (index 0 unused):
+
+      keys[k]       sorted lookup keys parent * (V + 1) + token of the level-k nodes
+      counts[k]     raw counts for k = n, continuation counts below
+      discounts[k]  D_k from the count-of-counts of counts[k]
+      totals[k]     sum of counts[k] over the successors of each level k-1 node
+      types[k]      number of those successors with a positive count
+
+    scoring.py evaluates the model from these arrays and build_kneser_ney
+    saves the lower orders for sampling, so both describe the same model.
+
+    `top` is a pruned copy of the trie (pruning.prune_trie) whose order n
+    replaces the trie's raw counts. Lower orders and all discounts still
+    come from the full trie, as analyze --prune keeps its .kn tables.
+    """
+    base = len(trie.vocab) + 1
+    keys, parents = [None], [None]
+    for k in range(1, n + 1):
+        level_keys, parent = _level_keys(trie, k, base)
+        keys.append(level_keys)
+        parents.append(parent)
+
+    # suffix[k]: level k-1 node of each level-k n-gram without its first token
+    suffix = [None, np.zeros(len(keys[1]), dtype=np.int64)]
+    for k in range(2, n + 1):
+        tokens = np.asarray(trie.tokens[k], dtype=np.int64)
+        suffix.append(np.searchsorted(keys[k - 1], suffix[k - 1][parents[k]] * base + tokens))
+
+    counts, discounts, totals, types = [None], [None], [None], [None]
+    for k in range(1, n + 1):
+        if k == n:
+            level_counts = np.asarray(trie.counts[k], dtype=np.int64)
+        else:
+            # Continuation count of a k-gram: distinct (k+1)-grams it ends
+            level_counts = np.bincount(suffix[k + 1], minlength=len(keys[k]))
+        level_totals, level_types = _context_sums(level_counts, trie.children[k - 1])
+        counts.append(level_counts)
+        discounts.append(discount(level_counts[level_counts > 0]))
+        totals.append(level_totals)
+        types.append(level_types)
+
+    if top is not None:
+        keys[n] = _level_keys(top, n, base)[0]
+        counts[n] = np.asarray(top.counts[n], dtype=np.int64)
+        totals[n], types[n] = _context_sums(counts[n], top.children[n - 1])
+    return keys, counts, discounts, totals, types
+
+
+def build_kneser_ney(trie, path, ngram_type):
+    """
+    Save the continuation tables of orders 1..N-1 from kneser_ney_levels
+    and the discounts of every order for an NgramTrie of order N under `path`.
+    """
+    _, counts, discounts, _, _ = kneser_ney_levels(trie, trie.max_order)
+    raw_discounts = [discount(trie.counts[k]) for k in range(1, trie.max_order + 1)]
+    for k in range(1, trie.max_order):
+        ids, _ = trie.level_ngrams(k)
+        seen = counts[k] > 0
+        write_model(os.path.join(path, f"cont_{k}.model"), trie.vocab,
+                    arrays_from_ids(ids[seen], counts[k][seen], len(trie.vocab)), ngram_type)
+
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"max_order": trie.max_order, "raw_discounts": raw_discounts,
+                   "cont_discounts": discounts[1:trie.max_order]}, f)
+
+
+class _Level:
+    """One order of the mixture: a successor table, its discount and cached per-context nodes."""
+
+    __slots__ = ("table", "discount", "nodes")
+
+    def __init__(self, table, discount):
+        self.table = table
+        self.discount = discount
+        self.nodes = {}  # context -> (sampler over discounted counts, gamma) or None if unseen
+
+    def node(self, context):
+        if context in self.nodes:
+            return self.nodes[context]
+        successors = self.table.successors(context)
+        node = None
+        if successors is not None:
+            tokens, counts = successors
+            weights = [c - self.discount for c in counts]
+            node = (CumulativeSampler(tokens, weights), self.discount * len(tokens) / sum(counts))
+        self.nodes[context] = node
+        return node
+
+
+class KneserNey:
+    """
+    Interpolated Kneser-Ney sampler of order n on top of a raw-count table.
+
+    `top` is anything with successors(context) for n-grams of order n
+    (an NgramModel or NgramTrie); the lower orders are loaded from `path`.
+    """
+
+    def __init__(self, path, top, n):
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if n > meta["max_order"]:
+            raise ValueError(f"Kneser-Ney model at {path} only covers orders up to {meta['max_order']}")
+        self.n = n
+        # levels[k - 1] serves order k; the top order uses raw counts
+        self.levels = [_Level(NgramModel(os.path.join(path, f"cont_{k}.model")), meta["cont_discounts"][k - 1])
+                       for k in range(1, n)]
+        self.levels.append(_Level(top, meta["raw_discounts"][n - 1]))
+        self.vocab = self.levels[0].table.vocab
+
+    def sample(self, context, rng):
+        """Draw the next token after `context` (the last n-1 tokens, or fewer at the start)."""
+        context = tuple(context)[-(self.n - 1):] if self.n > 1 else ()
+        for k in range(len(context) + 1, 0, -1):
+            node = self.levels[k - 1].node(context[len(context) - k + 1:])
+            if node is not None:
+                sampler, gamma = node
+                if rng.random() >= gamma:
+                    return sampler.sample(rng)
+        # Uniform base of the unigram level, restricted to tokens that can be emitted
+        return self.vocab[min(int(rng.random() * len(self.vocab)), len(self.vocab) - 1)]
@@ -0,0 +1,159 @@
+"""
+zipf.py
+Zipf's law over the frequency tables and Heaps' law over the corpus
+
+Zipf: the count of the r-th most frequent n-gram falls off as r^-alpha.
+Counts are read straight from the binary models (counts.npy, falling back
+to the JSON tables), ranked with one NumPy sort and fitted by least squares
+on log10(rank) vs log10(count).
+
+Heaps: the vocabulary after N tokens grows as K * N^beta. HeapsTracker
+takes the token stream chunk by chunk, so it also works on analyze's
+streaming input, and records the growth curve at log-spaced checkpoints.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from starter_preprocess import TextPreprocessor
+from src.model_store import model_path_for
+
+AUTHORS = ["austen", "twain", "doyle"]
+TYPES = ["char", "word"]
+ORDERS = [1, 2, 3]
+
+
+def _fit_loglog(x, y):
+    # Least-squares line through (log10 x, log10 y): (slope, intercept, r^2)
+    lx, ly = np.log10(x), np.log10(y)
+    dx, dy = lx - lx.mean(), ly - ly.mean()
+    sxx, syy, sxy = dx @ dx, dy @ dy, dx @ dy
+    if sxx == 0:
+        return 0.0, float(ly.mean()), 0.0
+    slope = sxy / sxx
+    r_squared = sxy * sxy / (sxx * syy) if syy else 1.0
+    return float(slope), float(ly.mean() - slope * lx.mean()), float(r_squared)
+
+
+def fit_zipf(counts):
+    """Zipf exponent of a count (or frequency) vector: {"alpha", "r_squared", "intercept", "types", "tokens"}."""
+    counts = np.asarray(counts, dtype=np.float64)
+    counts = np.sort(counts[counts > 0])[::-1]
+    if len(counts) < 2:
+        return {"alpha": 0.0, "r_squared": 0.0, "intercept": 0.0,
+                "types": len(counts), "tokens": float(counts.sum())}
+    slope, intercept, r_squared = _fit_loglog(np.arange(1, len(counts) + 1), counts)
+    return {"alpha": -slope, "r_squared": r_squared, "intercept": intercept,
+            "types": len(counts), "tokens": float(counts.sum())}
+
+
+def load_counts(json_path):
+    """Count vector of one frequency table, from its binary model when there is one."""
+    model_path = model_path_for(json_path)
+    if os.path.exists(os.path.join(model_path, "counts.npy")):
+        with open(os.path.join(model_path, "meta.json"), "r", encoding="utf-8") as f:
+            codebook = json.load(f).get("codebook")
+        counts = np.load(os.path.join(model_path, "counts.npy"), mmap_mode="r")
+        # Quantized models store codes into the codebook
+        return counts if codebook is None else np.asarray(codebook)[counts]
+    with open(json_path, "r", encoding="utf-8") as f:
+        return np.fromiter(json.load(f).values(), dtype=np.int64)
+
+
+def zipf_tables(authors=AUTHORS, types=TYPES, orders=ORDERS, out_dir="data/freq_tables"):
+    """fit_zipf for every (author, type, order) table that exists."""
+    results = []
+    for author in authors:
+        for ngram_type in types:
+            for n in orders:
+                json_path = os.path.join(out_dir, f"{author}_{ngram_type}_{n}-gram.json")
+                if not os.path.exists(json_path) and not os.path.isdir(model_path_for(json_path)):
+                    continue
+                fit = fit_zipf(load_counts(json_path))
+                results.append({"author": author, "type": ngram_type, "order": n, **fit})
+    return results
+
+
+class HeapsTracker:
+    """Vocabulary growth of a token stream fed in chunks."""
+
+    def __init__(self, checkpoints_per_decade=10):
+        self.token_ids = {}
+        self.n_tokens = 0
+        self.step = 10 ** (1 / checkpoints_per_decade)
+        self.next_checkpoint = 1.0
+        self.points = []  # (tokens seen, vocabulary size)
+
+    def update(self, tokens):
+        token_ids = self.token_ids
+        prev_vocab = len(token_ids)
+        ids = np.fromiter((token_ids.setdefault(tok, len(token_ids)) for tok in tokens),
+                          dtype=np.int64, count=len(tokens))
+        # New tokens get the next id, so the vocabulary after each token is the running max id + 1
+        vocab_sizes = np.maximum(np.maximum.accumulate(ids) + 1, prev_vocab) if len(ids) else ids
+        end = self.n_tokens + len(ids)
+        while self.next_checkpoint <= end:
+            c = math.ceil(self.next_checkpoint)
+            if not self.points or c > self.points[-1][0]:
+                self.points.append((c, int(vocab_sizes[c - self.n_tokens - 1])))
+            self.next_checkpoint *= self.step
+        self.n_tokens = end
+
+    def fit(self):
+        """{"beta", "k", "r_squared", "tokens", "vocab"} for V = k * N^beta over the recorded curve."""
+        points = list(self.points)
+        if self.n_tokens and points[-1][0] != self.n_tokens:
+            points.append((self.n_tokens, len(self.token_ids)))
+        if len(points) < 2:
+            return {"beta": 0.0, "k": 0.0, "r_squared": 0.0, "tokens": self.n_tokens,
+                    "vocab": len(self.token_ids)}
+        n, v = np.array(points, dtype=np.float64).T
+        slope, intercept, r_squared = _fit_loglog(n, v)
+        return {"beta": slope, "k": 10 ** intercept, "r_squared": r_squared,
+                "tokens": self.n_tokens, "vocab": len(self.token_ids)}
+
+
+def heaps_streaming(input_path, ngram_type="word", chunk_size=None):
+    """Heaps' law fit over a book read chunk by chunk like analyze --stream."""
+    from src.analyze import iter_normalized_chunks, DEFAULT_CHUNK_SIZE
+
+    pre = TextPreprocessor()
+    tracker = HeapsTracker()
+    for k, chunk in enumerate(iter_normalized_chunks(input_path, pre, chunk_size or DEFAULT_CHUNK_SIZE)):
+        if ngram_type == "char":
+            tracker.update((" " if k else "") + chunk)
+        else:
+            tracker.update(pre.tokenize_words(chunk))
+    return tracker.fit()
+
+
+if __name__ == "__main__":
+    from src.analyze import AUTHOR_FILES
+
+    parser = argparse.ArgumentParser(description="Zipf fits of every frequency table and Heaps fits per book.")
+    parser.add_argument("--author", default=None, help="Only this author (default: all)")
+    parser.add_argument("--heaps", action="store_true", help="Also fit Heaps' law over each book")
+    args = parser.parse_args()
+    authors = [args.author] if args.author else AUTHORS
+
+    start = time.perf_counter()
+    results = zipf_tables(authors)
+    elapsed = time.perf_counter() - start
+    print(f"{'author':<8}{'table':<10}{'types':>9}{'alpha':>8}{'R^2':>7}")
+    for r in results:
+        print(f"{r['author']:<8}{r['type'] + '-' + str(r['order']):<10}{r['types']:>9}"
+              f"{r['alpha']:>8.3f}{r['r_squared']:>7.3f}")
+    print(f" {len(results)} tables fitted in {elapsed * 1e3:.1f} ms")
+
+    if args.heaps:
+        print(f"\n{'author':<8}{'type':<6}{'tokens':>9}{'vocab':>8}{'beta':>7}{'K':>8}{'R^2':>7}")
+        for author in authors:
+            for ngram_type in TYPES:
+                h = heaps_streaming(AUTHOR_FILES[author], ngram_type)
+                print(f"{author:<8}{ngram_type:<6}{h['tokens']:>9}{h['vocab']:>8}{h['beta']:>7.3f}"
+                      f"{h['k']:>8.2f}{h['r_squared']:>7.3f}")
@@ -5,10 +5,21 @@ Starter code for text preprocessing - focus on the statistics, not the regex!
 
 import re
 import json
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 from collections import Counter
+from itertools import islice
 import string
 
+# normalize_text blanks everything outside these classes in a single regex pass.
+# Curly quotes and long dashes are kept by the sentence pattern and folded afterwards;
+# “ ” and " would be blanked after folding anyway, so they are never folded.
+_SENTENCE_PUNCT = re.compile(r"[^\w\s.!?'’‘—–-]")
+_WORD_PUNCT = re.compile(r"[^\w\s]")
+_FOLDS = [('’', "'"), ('‘', "'"), ('—', '-'), ('–', '-')]
+_NEWLINE_RUNS = re.compile(r'\n{3,}')
+_SPACE_RUNS = re.compile(r' {2,}')
+
+
 class TextPreprocessor:
     """Handles all the annoying text cleaning so you can focus on the fun stuff"""
     
@@ -25,28 +36,55 @@ class TextPreprocessor:
     
     def clean_gutenberg_text(self, raw_text: str) -> str:
         """Remove Project Gutenberg headers/footers"""
-        lines = raw_text.split('\n')
+        # Only the lines holding a marker are inspected; the body is sliced out directly
+        hits = set()
+        for marker in self.gutenberg_markers[:4]:
+            pos = raw_text.find(marker)
+            while pos != -1:
+                hits.add(raw_text.rfind('\n', 0, pos) + 1)
+                pos = raw_text.find(marker, pos + 1)
         
         # Find start and end markers
-        start_idx = 0
-        end_idx = len(lines)
+        start_off, end_off = 0, len(raw_text)
+        for line_start in sorted(hits):
+            line_end = raw_text.find('\n', line_start)
+            if line_end == -1:
+                line_end = len(raw_text)
+            line = raw_text[line_start:line_end]
+            if "START" in line:
+                start_off = line_end + 1
+            elif "END" in line:
+                end_off = max(line_start - 1, 0)
+                break
+        
+        cleaned = raw_text[start_off:end_off]
+        
+        # Remove excessive whitespace (a substring check skips the regex scan when there is none)
+        if '\n\n\n' in cleaned:
+            cleaned = _NEWLINE_RUNS.sub('\n\n', cleaned)
+        if '  ' in cleaned:
+            cleaned = _SPACE_RUNS.sub(' ', cleaned)
+        
+        return cleaned.strip()
+    
+    def find_gutenberg_bounds(self, lines) -> Tuple[int, Optional[int]]:
+        """
+        Line range of the book body inside the Gutenberg header/footer
         
+        Args:
+            lines: Any iterable of lines, so a file can be scanned without loading it
+        
+        Returns:
+            (index of the first body line, index of the footer line or None)
+        """
+        start_idx = 0
         for i, line in enumerate(lines):
             if any(marker in line for marker in self.gutenberg_markers[:4]):
                 if "START" in line:
                     start_idx = i + 1
                 elif "END" in line:
-                    end_idx = i
-                    break
-        
-        # Join the cleaned lines
-        cleaned = '\n'.join(lines[start_idx:end_idx])
-        
-        # Remove excessive whitespace
-        cleaned = re.sub(r'\n{3,}', '\n\n', cleaned)
-        cleaned = re.sub(r' {2,}', ' ', cleaned)
-        
-        return cleaned.strip()
+                    return start_idx, i
+        return start_idx, None
     
     def normalize_text(self, text: str, preserve_sentences: bool = True) -> str:
         """
@@ -59,23 +97,20 @@ class TextPreprocessor:
         # Convert to lowercase
         text = text.lower()
         
-        # Standardize quotes and dashes
-        text = re.sub(r'[“”"]', '"', text)   # normalize all double quotes to "
-        text = re.sub(r"[’‘']", "'", text)   # normalize all single quotes to '
-        text = re.sub(r'[—–]', '-', text)    # normalize long dashes to -
-        
         if preserve_sentences:
-            # Keep sentence endings but remove other punctuation
-            # This regex keeps . ! ? but removes , ; : etc
-            text = re.sub(r'[^\w\s.!?\'-]', ' ', text)
+            # Keep sentence endings, apostrophes and dashes; blank other punctuation
+            text = _SENTENCE_PUNCT.sub(' ', text)
+            # Standardize quotes and dashes (plain substring passes, skipped when absent)
+            for fancy, plain in _FOLDS:
+                if fancy in text:
+                    text = text.replace(fancy, plain)
         else:
-            # Remove all punctuation except apostrophes in contractions
-            text = re.sub(r"(?<!\w)'(?!\w)|[^\w\s]", ' ', text)
+            # Only \w (letters, digits, underscore) and whitespace survive; all punctuation,
+            # apostrophes included, becomes a space
+            text = _WORD_PUNCT.sub(' ', text)
         
-        # Clean up whitespace
-        text = re.sub(r'\s+', ' ', text)
-        
-        return text.strip()
+        # Clean up whitespace (split() and \s agree on what whitespace is)
+        return ' '.join(text.split())
     
     def tokenize_sentences(self, text: str) -> List[str]:
         """Split text into sentences"""
@@ -107,13 +142,93 @@ class TextPreprocessor:
         else:
             return [c for c in text if c != ' ']
     
+    def encode_tokens(self, tokens: List[str]):
+        """
+        Integer-encode a token list
+        
+        Returns:
+            (vocab, ids): vocab lists tokens in first-occurrence order and
+            ids is an int32 numpy array with vocab[ids[i]] == tokens[i]
+        """
+        import numpy as np
+        
+        token_ids = {}
+        ids = np.fromiter((token_ids.setdefault(tok, len(token_ids)) for tok in tokens),
+                          dtype=np.int32, count=len(tokens))
+        return list(token_ids), ids
+    
+    def encode_chars(self, text: str):
+        """
+        Integer-encode the characters of already-normalized text
+        
+        Same result as encode_tokens(tokenize_chars(text)), but works on the
+        code points directly instead of building a list of characters.
+        """
+        import numpy as np
+        
+        text = re.sub(r'\s+', ' ', text)
+        code_points = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        m = len(code_points)
+        if m == 0:
+            return [], np.empty(0, dtype=np.int32)
+        
+        # Code points index a lookup table directly; np.minimum.at (unbuffered, so
+        # repeated code points are all compared) leaves each one's earliest position,
+        # which fixes the id order
+        first = np.full(int(code_points.max()) + 1, m, dtype=np.int64)
+        np.minimum.at(first, code_points, np.arange(m))
+        present = np.flatnonzero(first < m)
+        present = present[np.argsort(first[present])]
+        lookup = np.empty(len(first), dtype=np.int32)
+        lookup[present] = np.arange(len(present), dtype=np.int32)
+        return [chr(c) for c in present.tolist()], lookup[code_points]
+    
     def get_sentence_lengths(self, sentences: List[str]) -> List[int]:
         """Get word count for each sentence"""
         return [len(self.tokenize_words(sent)) for sent in sentences]
     
 
+class NgramCounter:
+    """
+    Counts several n-gram orders at once from tokens fed in order.
+
+    Only the last (max order - 1) tokens are carried between update() calls,
+    so counts over a sequence of chunks equal counts over their concatenation.
+    """
+
+    def __init__(self, orders=(1, 2, 3)):
+        self.orders = tuple(sorted(set(orders)))
+        if not self.orders or self.orders[0] < 1:
+            raise ValueError("n-gram orders must be positive integers")
+        self.counts = {n: Counter() for n in self.orders}
+        self._carry = self.orders[-1] - 1
+        self._tail = []
+
+    def update(self, tokens):
+        """Count every n-gram that ends inside `tokens`."""
+        tail_len = len(self._tail)
+        window = self._tail + list(tokens) if tail_len else tokens
+        for n in self.orders:
+            if n == 1:
+                # Unigrams stay plain strings, not 1-tuples
+                self.counts[n].update(islice(window, tail_len, None))
+            else:
+                start = max(0, tail_len - n + 1)
+                self.counts[n].update(zip(*(islice(window, start + i, None) for i in range(n))))
+        if self._carry:
+            self._tail = list(window[-self._carry:])
+
+    def results(self) -> Dict[int, Dict]:
+        return {n: dict(counter) for n, counter in self.counts.items()}
+
+
 class FrequencyAnalyzer:
     """Calculate n-gram frequencies from tokenized text"""
+
+    # Tokens per block in calculate_ngrams_multi
+    block_size = 1 << 16
+    # Largest code space counted with a dense bincount in calculate_ngrams_vectorized
+    bincount_limit = 1 << 24
     
     def calculate_ngrams(self, tokens: List[str], n: int) -> Dict[Tuple[str, ...], int]:
         """
@@ -130,12 +245,94 @@ class FrequencyAnalyzer:
             # Special case for unigrams (return as single strings, not tuples)
             return dict(Counter(tokens))
         
-        ngrams = []
-        for i in range(len(tokens) - n + 1):
-            ngram = tuple(tokens[i:i + n])
-            ngrams.append(ngram)
+        # Count straight from sliding-window views, no intermediate list of n-grams
+        return dict(Counter(zip(*(islice(tokens, i, None) for i in range(n)))))
+    
+    def calculate_ngrams_multi(self, tokens: List[str], orders=(1, 2, 3)) -> Dict[int, Dict]:
+        """
+        Count several n-gram orders in one sweep over the tokens
+        
+        Args:
+            tokens: List of tokens (words or characters)
+            orders: n-gram sizes to count
         
-        return dict(Counter(ngrams))
+        Returns:
+            Dictionary mapping each order to the same dict calculate_ngrams returns
+        """
+        counter = NgramCounter(orders)
+        for i in range(0, len(tokens), self.block_size):
+            counter.update(tokens[i:i + self.block_size])
+        return counter.results()
+    
+    def calculate_ngrams_vectorized(self, ids, vocab: List[str], n: int, as_arrays: bool = False):
+        """
+        Count n-grams over an integer-encoded token array with NumPy
+        
+        Each window of n ids is packed into one int64 code and the codes are
+        counted with bincount (small alphabets) or np.unique. First positions
+        come from np.minimum.at or np.unique's return_index, both documented
+        to handle repeated codes. By default the
+        result is the same dict calculate_ngrams returns, keys in
+        first-occurrence order.
+        
+        Args:
+            ids: Token ids as produced by TextPreprocessor.encode_tokens
+            vocab: Id -> token list from the same call
+            n: Size of n-gram
+            as_arrays: Return (ngram ids as an (m, n) array, counts) and skip
+                building the dict, which dominates the cost for word tables
+        """
+        import numpy as np
+        
+        ids = np.asarray(ids, dtype=np.int64)
+        size = max(len(vocab), 1)
+        m = len(ids) - n + 1
+        if m <= 0:
+            if as_arrays:
+                return np.empty((0, n), dtype=np.int64), np.empty(0, dtype=np.int64)
+            return {}
+        if size ** n >= 2 ** 63:
+            # Codes would overflow int64; fall back to tuple counting
+            return self.calculate_ngrams([vocab[i] for i in ids.tolist()], n)
+        
+        codes = ids[:m].copy()
+        for i in range(1, n):
+            codes *= size
+            codes += ids[i:m + i]
+        
+        if size ** n <= self.bincount_limit:
+            counts = np.bincount(codes, minlength=size ** n)
+            # ufunc.at is unbuffered, so every position of a repeated code is compared
+            first = np.full(size ** n, m, dtype=np.int64)
+            np.minimum.at(first, codes, np.arange(m))
+            uniq = np.flatnonzero(counts)
+            counts, first = counts[uniq], first[uniq]
+        else:
+            uniq, first, counts = np.unique(codes, return_index=True, return_counts=True)
+        
+        order = np.argsort(first, kind='stable')
+        uniq, counts = uniq[order], counts[order]
+        
+        # Unpack codes back into id columns
+        columns = []
+        for _ in range(n):
+            columns.append(uniq % size)
+            uniq = uniq // size
+        columns.reverse()
+        
+        if as_arrays:
+            return np.stack(columns, axis=1), counts
+        
+        tokens = np.array(vocab, dtype=object)
+        columns = [tokens[col].tolist() for col in columns]
+        if n == 1:
+            return dict(zip(columns[0], counts.tolist()))
+        return dict(zip(zip(*columns), counts.tolist()))
+    
+    def calculate_ngrams_vectorized_multi(self, ids, vocab: List[str], orders=(1, 2, 3),
+                                          as_arrays: bool = False) -> Dict[int, Dict]:
+        """calculate_ngrams_vectorized for several orders over the same ids"""
+        return {n: self.calculate_ngrams_vectorized(ids, vocab, n, as_arrays) for n in orders}
     
     def calculate_probabilities(self, ngram_counts: Dict, smoothing: float = 0.0) -> Dict:
         """
@@ -0,0 +1,28 @@
+"""
+CLI cold starts must not import modules their subcommand does not need:
+`generate` samples memory-mapped models without matplotlib or numpy, and
+`--help` loads neither (benchmarks/check_import_time.py lists the cases).
+
+Run from the repository root:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+import pytest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.check_import_time import CASES, import_times
+
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_no_forbidden_imports(name):
+    args, forbidden = CASES[name]
+    loaded = sorted(m.strip() for m in import_times(args)
+                    if any(m.strip() == f or m.strip().startswith(f + ".") for f in forbidden))
+    assert not loaded, f"{name} imports {', '.join(loaded[:5])}"
+
+
+def test_generate_path_samples():
+    # The check above is only meaningful if generate actually loaded a model and sampled from it
+    times = import_times(CASES["generate"][0])
+    assert "src.generator" in {m.strip() for m in times}
@@ -0,0 +1,66 @@
+"""
+Parallel n-gram counting (analyze.count_parallel) must equal serial counting,
+counts and key order, whatever the worker count and wherever the shard cuts fall.
+
+Run from the repository root:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+import pytest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from starter_preprocess import TextPreprocessor, FrequencyAnalyzer
+from src.analyze import count_parallel
+
+ORDERS = [1, 2, 3]
+
+TEXT = """
+It is a truth universally acknowledged, that a single man in possession
+of a good fortune, must be in want of a wife. However little known the
+feelings or views of such a man may be on his first entering a
+neighbourhood, this truth is so well fixed in the minds of the
+surrounding families, that he is considered the rightful property of
+some one or other of their daughters. My dear Mr. Bennet, said his lady
+to him one day, have you heard that Netherfield Park is let at last?
+"""
+
+
+def serial_and_streams(text):
+    pre = TextPreprocessor()
+    fa = FrequencyAnalyzer()
+    normalized = pre.normalize_text(text)
+    words = pre.tokenize_words(normalized)
+    chars = pre.tokenize_chars(normalized)
+    serial = {"char": fa.calculate_ngrams_multi(chars, ORDERS), "word": fa.calculate_ngrams_multi(words, ORDERS)}
+    streams = {"char": pre.encode_chars(normalized), "word": pre.encode_tokens(words)}
+    return serial, streams
+
+
+@pytest.mark.parametrize("workers", [1, 2, 3, 7])
+def test_parallel_equals_serial(workers):
+    serial, streams = serial_and_streams(TEXT)
+    parallel = count_parallel(streams, ORDERS, workers)
+    for name in streams:
+        for n in ORDERS:
+            assert parallel[name][n] == serial[name][n], (name, n)
+            assert list(parallel[name][n]) == list(serial[name][n]), (name, n)
+
+
+def test_cuts_inside_sentences():
+    # 3 shards over 13 words cut after words 4 and 8, both mid-sentence;
+    # the 2- and 3-grams spanning each cut must be counted exactly once
+    serial, streams = serial_and_streams("one two three four five six. seven eight nine ten one two three")
+    assert len(streams["word"][1]) == 13
+    parallel = count_parallel(streams, ORDERS, 3)
+    assert parallel["word"] == serial["word"]
+    assert parallel["word"][3][("four", "five", "six")] == 1
+    assert parallel["word"][2][("one", "two")] == 2
+    assert sum(parallel["word"][3].values()) == 11
+
+
+def test_stream_shorter_than_order():
+    serial, streams = serial_and_streams("hello there")
+    parallel = count_parallel(streams, ORDERS, 3)
+    assert parallel["word"] == serial["word"]
+    assert parallel["word"][3] == {}